@@ -1,26 +1,64 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response, JSONResponse
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from pydantic import BaseModel
-import requests
+import asyncio
+import json
 import os
 from app.services.opensubtitles import OpenSubtitlesClient
-from app.services.translator import TranslatorService
+from app.services.translator import TranslatorService, TranslationStats, TextDedup, PROMPT_VERSION
 from app.services.imdb import IMDBService
-from app.services.uploader import StremioUploader
+from app.services.uploader import StremioUploader, UploadResult
+from app.services.result_cache import ResultCache
+from app.services.source_store import SourceStore
+from app.services.jobs import JobQueue, QueueFullError, JobStateError
+from app.services.warmup import Warmup
+from app.utils.cache import SingleFlight
+from app.utils.http import HttpClient
+from app.utils.encoding import decode_subtitle
+from app.utils.languages import TARGET_LANGUAGE_CODE, UnknownLanguageError, language_name
+from app.utils.subtitles import iter_blocks
 from app.utils.logger import log
+from app.utils.metrics import track, CACHE_LOOKUPS, JOB_QUEUE_DEPTH, UPLOAD_QUEUE_DEPTH
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_client.start()
+    await asyncio.to_thread(imdb_service.load_history)
+    await translator.pool.start()
+    await job_queue.start()
+    # Load the model, log in and so on in the background, /readyz reports when done
+    warmup.start()
+    yield
+    await warmup.stop()
+    await job_queue.stop()
+    await asyncio.to_thread(imdb_service.save_history)
+    await uploader.close()
+    await translator.pool.stop()
+    await http_client.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Serve static files (frontend)
 app.mount("/static", StaticFiles(directory="static", html=True), name="static")
 # Temporary directory
 os.makedirs("temp", exist_ok=True)
 
-os_client = OpenSubtitlesClient()
+http_client = HttpClient()
+os_client = OpenSubtitlesClient(http_client)
 translator = TranslatorService()
-imdb_service = IMDBService()
+imdb_service = IMDBService(http_client)
 uploader = StremioUploader()
+result_cache = ResultCache()
+source_store = SourceStore()
+warmup = Warmup(translator, os_client, uploader)
+translations_in_flight = SingleFlight()
+downloads_in_flight = SingleFlight()
+
+# Episodes of a season pack downloaded and translated at the same time
+SEASON_CONCURRENCY = int(os.getenv("SEASON_CONCURRENCY", "4"))
 
 class SearchRequest(BaseModel):
     query: str
@@ -34,6 +72,18 @@ class ProcessRequest(BaseModel):
     content_type: str = "movie"  # "movie" or "series"
     season_number: int | None = None
     episode_number: int | None = None
+    # ISO 639-2 codes to translate to (TARGET_LANGUAGE_CODE if empty), each one is uploaded on its own
+    languages: list[str] | None = None
+
+class SeasonRequest(BaseModel):
+    imdb_id: str  # Series IMDb ID (parent_imdb_id of the episodes)
+    title: str | None = None
+    year: str | int | None = None
+    season_number: int | None = None
+    # Explicit episodes to process, otherwise the best subtitle of every episode of season_number
+    episodes: list[ProcessRequest] | None = None
+    # Languages of every episode that does not list its own
+    languages: list[str] | None = None
 
 def cleanup_file(path: str):
     try:
@@ -42,15 +92,24 @@ def cleanup_file(path: str):
     except Exception as e:
         log.error(f"Error deleting temp: {e}")
 
-async def run_upload_task(file_path: str, imdb_id: str, content_type: str = "movie", season: int = None, episode: int = None):
-    if imdb_id:
-        success = await uploader.upload_subtitle(file_path, imdb_id, content_type, season, episode)
-        if success:
-            log.success("Upload completed successfully", "🎉")
-        else:
-            log.warning("Upload failed")
-    # Cleanup file after attempt to upload
-    cleanup_file(file_path)
+async def run_upload_task(file_path: str, imdb_id: str, content_type: str = "movie", season: int = None, episode: int = None,
+                          language: str = TARGET_LANGUAGE_CODE):
+    result = None
+    try:
+        if imdb_id:
+            result = await uploader.upload_subtitle(file_path, imdb_id, content_type, season, episode, language)
+    except Exception as e:
+        # The translation is done, a failed upload is reported with it instead of failing the job
+        log.error(f"Upload error: {e}")
+        result = UploadResult(False, UploadResult.ERROR, detail=str(e))
+    finally:
+        # Cleanup file after attempt to upload
+        cleanup_file(file_path)
+    if result:
+        log.success("Upload completed successfully", "🎉")
+    elif result is not None:
+        log.warning(f"Upload failed ({result.reason})")
+    return result
 
 @app.get("/")
 async def read_root():
@@ -59,127 +118,531 @@ async def read_root():
 @app.get("/api/search_media")
 async def search_media(query: str):
     """Search movies/series on IMDb (Suggestion endpoint)"""
-    return imdb_service.search_content(query)
+    return await imdb_service.search_content(query)
 
 @app.get("/api/search_subtitles")
 async def search_subtitles(imdb_id: str, kind: str = "movie"):
     """Search subtitles on OpenSubtitles using IMDb ID"""
+    imdb_service.mark_selected(imdb_id)
     try:
         # If it is a series, use parent_imdb_id
         is_series = kind.lower() in ['tv series', 'tv mini-series', 'series']
         
         if is_series:
-            results = os_client.search(parent_imdb_id=imdb_id)
-        else:
-            results = os_client.search(imdb_id=imdb_id)
-            
-        # Simplify response for frontend
-        simplified = []
-        for item in results:
-            attrs = item.get('attributes', {})
-            files = attrs.get('files', [])
-            if files:
-                file_id = files[0].get('file_id')
-                file_name = files[0].get('file_name')
-                
-                # Extract season and episode from feature_details if they exist
-                feature_details = attrs.get('feature_details', {})
-                season_num = feature_details.get('season_number')
-                episode_num = feature_details.get('episode_number')
-                
-                # If not in feature_details, try to extract from filename (fallback)
-                if not season_num or not episode_num:
-                    import re
-                    # Regex for S01E01, 1x01, etc.
-                    match = re.search(r'[sS](\d+)[eE](\d+)', file_name)
-                    if match:
-                        season_num = int(match.group(1))
-                        episode_num = int(match.group(2))
-
-                simplified.append({
-                    "id": item.get('id'),
-                    "file_id": file_id,
-                    "file_name": file_name,
-                    "language": attrs.get('language'),
-                    "movie_name": feature_details.get('movie_name'),
-                    "year": feature_details.get('year'),
-                    "downloads": attrs.get('download_count'),
-                    "season_number": season_num,
-                    "episode_number": episode_num
-                })
-        return simplified
+            return await os_client.search(parent_imdb_id=imdb_id)
+        return await os_client.search(imdb_id=imdb_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/process")
-async def process_subtitle(request: ProcessRequest, background_tasks: BackgroundTasks):
-    try:
-        # 1. Get download link
-        download_link = os_client.download_url(request.file_id)
+async def fetch_source(file_id):
+    """Original subtitle file as text, from the source store or downloaded from OpenSubtitles"""
+    stored = await asyncio.to_thread(source_store.get, file_id)
+    if stored is not None:
+        CACHE_LOOKUPS.labels("sources", "hit").inc()
+        log.download(f"Using stored original of file {file_id}")
+        if stored["encoding"]:
+            return stored["data"].decode(stored["encoding"], errors="replace")
+        return (await asyncio.to_thread(decode_subtitle, stored["data"]))[0]
+    CACHE_LOOKUPS.labels("sources", "miss").inc()
+
+    async def download():
+        download_link = await os_client.download_url(file_id)
         if not download_link:
             raise HTTPException(status_code=404, detail="Could not get download link")
-        
-        # 2. Download original SRT content
+
         log.download(f"Downloading from {download_link}")
-        srt_response = requests.get(download_link)
-        srt_content = srt_response.text
-        
-        # 3. Translate
-        log.translate(f"Translating content for: {request.title or 'Unknown'}")
-        translated_content = await translator.translate_srt(srt_content, title=request.title)
-        
-        # 4. Save file temporarily for upload
-        # Use SRT_NAMING_FORMAT from environment or fallback to default
-        naming_format = os.getenv("SRT_NAMING_FORMAT", "{language}_{title}_{year}[{author}].srt")
-        target_lang_code = os.getenv("TARGET_LANGUAGE_CODE", "spa").upper()
-        
-        if request.title:
-            # Clean title: remove special chars and replace spaces with dots
-            safe_title = "".join([c for c in request.title if c.isalnum() or c in " ._-"])
-            safe_title = safe_title.strip().replace(" ", ".")
-            safe_year = str(request.year) if request.year else ""
-            
-            # Apply naming format
-            new_filename = naming_format.format(
-                language=target_lang_code,
-                title=safe_title,
-                year=safe_year,
-                author="davru.dev"
-            )
-        else:
-            new_filename = f"{target_lang_code}_{request.file_name}"
-
-        if not new_filename.lower().endswith('.srt'):
-            new_filename += '.srt'
-            
-        temp_path = os.path.join("temp", new_filename)
-        with open(temp_path, "w", encoding="utf-8") as f:
-            f.write(translated_content)
-
-        # 5. Schedule background upload
-        log.debug(str(request))
-        if request.imdb_id:
-            log.info(f"Scheduling automatic upload for: {request.imdb_id} (S{request.season_number}E{request.episode_number})", "📅")
-            background_tasks.add_task(
-                run_upload_task, 
-                temp_path, 
-                request.imdb_id, 
-                request.content_type, 
-                request.season_number, 
-                request.episode_number
+        with track("subtitle_download"):
+            response = await http_client.get(download_link)
+            response.raise_for_status()
+        # Decoded from the raw bytes, the Content-Type charset of subtitle files is rarely right
+        with track("subtitle_decode"):
+            srt_content, encoding = await asyncio.to_thread(decode_subtitle, response.content)
+        if encoding not in ("utf-8", "utf-8-sig"):
+            log.file(f"File {file_id} is encoded as {encoding}")
+        await asyncio.to_thread(source_store.put, file_id, response.content, encoding)
+        return srt_content
+
+    # Several jobs for the same file (e.g. other languages) share one download
+    return await downloads_in_flight.run(file_id, download)
+
+def target_languages(codes):
+    """(code, name) of every requested language, the configured one when none are given"""
+    codes = codes or [TARGET_LANGUAGE_CODE]
+    # Duplicates dropped, order kept
+    return [(code, language_name(code)) for code in dict.fromkeys(code.lower() for code in codes)]
+
+def output_filename(request: ProcessRequest, language_code, episode_code=None, tag_language=False):
+    """File name of a translation, from SRT_NAMING_FORMAT"""
+    # Use SRT_NAMING_FORMAT from environment or fallback to default
+    naming_format = os.getenv("SRT_NAMING_FORMAT", "{language}_{title}_{year}[{author}].srt")
+    target_lang_code = language_code.upper()
+
+    if request.title:
+        # Clean title: remove special chars and replace spaces with dots
+        safe_title = "".join([c for c in request.title if c.isalnum() or c in " ._-"])
+        safe_title = safe_title.strip().replace(" ", ".")
+        if episode_code and "{episode}" not in naming_format:
+            # Episodes of the same series would otherwise share a file name
+            safe_title = f"{safe_title}.{episode_code}"
+        if tag_language and "{language}" not in naming_format:
+            # So would the languages of one file
+            safe_title = f"{safe_title}.{target_lang_code}"
+        safe_year = str(request.year) if request.year else ""
+
+        # Apply naming format
+        new_filename = naming_format.format(
+            language=target_lang_code,
+            title=safe_title,
+            year=safe_year,
+            author="davru.dev",
+            season=f"{request.season_number:02d}" if request.season_number else "",
+            episode=f"{request.episode_number:02d}" if request.episode_number else ""
+        )
+    else:
+        new_filename = f"{target_lang_code}_{request.file_name}"
+
+    if not new_filename.lower().endswith('.srt'):
+        new_filename += '.srt'
+    return new_filename
+
+async def process_file(request: ProcessRequest, set_stage, on_progress=None, on_blocks=None, audit=None, dedup=None):
+    """
+    Download, translate, save and upload one subtitle file, reporting its stage through set_stage.
+    The file is downloaded and parsed once, then translated to every requested language at
+    the same time through the translator's shared scheduler, and each language is saved
+    and uploaded on its own. on_blocks(blocks, language_code) receives the translated blocks.
+    """
+    episode_code = None
+    if request.season_number and request.episode_number:
+        episode_code = f"S{request.season_number:02d}E{request.episode_number:02d}"
+    languages = target_languages(request.languages)
+    multiple = len(languages) > 1
+    try:
+        # 1-2. Get the original SRT content (stored, or downloaded through a download link)
+        set_stage("downloading")
+        srt_content = await fetch_source(request.file_id)
+        set_stage("translating")
+        source_hash = ResultCache.source_hash(srt_content)
+
+        # Parsed once, only if a language is missing from the result cache
+        parsed = []
+
+        def source_blocks():
+            if not parsed:
+                parsed.extend(iter_blocks(srt_content))
+                log.info(f"Parsed {len(parsed)} subtitle blocks", "🧩")
+            return parsed
+
+        # Overall progress is the sum of the batches of every language
+        progress = {code: (0, 0) for code, _ in languages}
+
+        def language_progress(code):
+            def report(done, total):
+                progress[code] = (done, total)
+                on_progress(sum(d for d, _ in progress.values()), sum(t for _, t in progress.values()))
+            return report if on_progress else None
+
+        async def translate_language(code, name):
+            # 3. Translate (reusing a stored result for the same file, language, model and prompt)
+            cache_key = ResultCache.make_key(
+                request.file_id, source_hash, code, translator.model_ollama, PROMPT_VERSION
             )
-        else:
-            log.warning("No IMDb ID, skipping automatic upload")
-        
-        # 6. Respond to user
-        if request.imdb_id:
-            return {"status": "success", "message": "Translation completed. Upload to Stremio is being processed in the background."}
-        else:
-            # If for some reason there's no ID, indicate it was generated but not uploaded (though current flow always asks for ID)
-            # In this case, clean up the file since the user won't download it
-            background_tasks.add_task(cleanup_file, temp_path)
-            return {"status": "warning", "message": "Translation completed, but no IMDb ID was provided for upload."}
+            translated_content = await asyncio.to_thread(result_cache.get, cache_key)
+            if translated_content is not None:
+                log.success(f"Using cached {name} translation for file {request.file_id}")
+                return translated_content, None
+            if translations_in_flight.is_running(cache_key):
+                log.info(f"{name} translation of file {request.file_id} already running, waiting for it", "⏳")
+
+            async def translate():
+                log.translate(f"Translating content for: {request.title or 'Unknown'} ({name})")
+                stats = TranslationStats()
+                content = await translator.translate_srt(
+                    srt_content,
+                    title=request.title,
+                    on_progress=language_progress(code),
+                    on_blocks=(lambda blocks: on_blocks(blocks, code)) if on_blocks else None,
+                    stats=stats,
+                    audit=audit,
+                    log_label=" ".join(filter(None, [episode_code, code if multiple else None])) or None,
+                    dedup=dedup,
+                    language=name,
+                    source_blocks=source_blocks(),
+                )
+                await asyncio.to_thread(
+                    result_cache.put,
+                    cache_key, request.file_id, source_hash, code, translator.model_ollama, PROMPT_VERSION, content,
+                )
+                return content, stats.to_dict()
+
+            with track("translation"):
+                return await translations_in_flight.run(cache_key, translate)
+
+        async def deliver(code, name):
+            translated_content, translation_stats = await translate_language(code, name)
+
+            # 4. Save file temporarily for upload
+            temp_path = os.path.join("temp", output_filename(request, code, episode_code, tag_language=multiple))
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(translated_content)
+
+            # 5. Upload as the last stage of the job
+            log.debug(str(request))
+            if request.imdb_id:
+                set_stage("uploading")
+                log.info(f"Starting automatic upload for: {request.imdb_id} (S{request.season_number}E{request.episode_number}, {code})", "📅")
+                uploaded = await run_upload_task(
+                    temp_path,
+                    request.imdb_id,
+                    request.content_type,
+                    request.season_number,
+                    request.episode_number,
+                    language=code,
+                )
+                if uploaded:
+                    return {"language": code, "status": "success", "message": "Translation completed and uploaded to Stremio.", "stats": translation_stats, "upload": uploaded.to_dict()}
+                return {"language": code, "status": "warning", "message": f"Translation completed, but the upload to Stremio failed ({uploaded.reason}).", "stats": translation_stats, "upload": uploaded.to_dict()}
+            else:
+                # If for some reason there's no ID, indicate it was generated but not uploaded (though current flow always asks for ID)
+                # In this case, clean up the file since the user won't download it
+                log.warning("No IMDb ID, skipping automatic upload")
+                cleanup_file(temp_path)
+                return {"language": code, "status": "warning", "message": "Translation completed, but no IMDb ID was provided for upload.", "stats": translation_stats}
+
+        if not multiple:
+            return await deliver(*languages[0])
+
+        # One language failing does not hold back the uploads of the others
+        results = await asyncio.gather(*(deliver(code, name) for code, name in languages), return_exceptions=True)
+        per_language = []
+        for (code, name), result in zip(languages, results):
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+            if isinstance(result, Exception):
+                log.error(f"Error processing {name}: {result}")
+                result = {"language": code, "status": "failed", "message": getattr(result, "detail", None) or str(result)}
+            per_language.append(result)
+        if all(r["status"] == "failed" for r in per_language):
+            raise results[0]
+        succeeded = sum(1 for r in per_language if r["status"] == "success")
+        return {
+            "status": "success" if succeeded == len(per_language) else "warning",
+            "message": f"{succeeded} of {len(per_language)} languages translated and uploaded to Stremio.",
+            "languages": per_language,
+        }
 
     except Exception as e:
         log.error(f"Error processing: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        raise
+
+async def run_process_job(job):
+    """Job handler for a single subtitle file"""
+    request = ProcessRequest(**job.payload)
+    return await process_file(
+        request,
+        job.set_stage,
+        on_progress=job.set_progress,
+        on_blocks=lambda blocks, language: job.publish("blocks", [
+            {"index": b.index, "time": b.time, "text": b.translated, "language": language} for b in blocks
+        ]),
+    )
+
+def pick_episodes(results, season_number, episodes):
+    # Results come sorted by download count, keep the first file of each episode
+    for item in results:
+        if item["season_number"] != season_number or not item["episode_number"]:
+            continue
+        episodes.setdefault(item["episode_number"], item)
+
+async def find_season_episodes(season: SeasonRequest):
+    """
+    Pick the most downloaded English subtitle of every episode of a season.
+    Returns the episode requests and the episode numbers no subtitle was found for.
+    """
+    results = await os_client.search(
+        parent_imdb_id=season.imdb_id, season_number=season.season_number, all_pages=True
+    )
+    episodes = {}
+    pick_episodes(results, season.season_number, episodes)
+
+    # Episodes missing before the last one found may just be past the pages read, ask for each of them
+    gaps = [n for n in range(1, max(episodes, default=0) + 1) if n not in episodes]
+    if gaps:
+        log.info(f"No subtitles found yet for episodes {gaps}, searching them one by one", "🔍")
+        searches = await asyncio.gather(*(
+            os_client.search(parent_imdb_id=season.imdb_id, season_number=season.season_number, episode_number=n)
+            for n in gaps
+        ))
+        for results in searches:
+            pick_episodes(results, season.season_number, episodes)
+    missing = [n for n in gaps if n not in episodes]
+
+    requests = [
+        ProcessRequest(
+            file_id=item["file_id"],
+            file_name=item["file_name"],
+            imdb_id=season.imdb_id,
+            title=season.title,
+            year=season.year,
+            content_type="series",
+            season_number=item["season_number"],
+            episode_number=item["episode_number"],
+        )
+        for _, item in sorted(episodes.items())
+    ]
+    return requests, missing
+
+async def run_season_job(job):
+    """
+    Job handler for a season pack: episodes are downloaded and translated
+    concurrently, so their batches compete for the translator's shared scheduler
+    and keep the GPU busy, and each episode is uploaded as soon as it is done.
+    """
+    season = SeasonRequest(**job.payload)
+    job.set_stage("searching")
+    missing = []
+    episodes = season.episodes
+    if not episodes:
+        episodes, missing = await find_season_episodes(season)
+    if not episodes:
+        raise HTTPException(status_code=404, detail="No subtitles found for this season")
+    for episode in episodes:
+        episode.imdb_id = episode.imdb_id or season.imdb_id
+        episode.title = episode.title or season.title
+        episode.languages = episode.languages or season.languages
+        # Episodes of a season are always uploaded as series
+        episode.content_type = "series"
+        episode.year = episode.year or season.year
+        if episode.season_number is None:
+            episode.season_number = season.season_number
+    log.info(f"Processing {len(episodes)} episodes of {season.title or season.imdb_id} S{season.season_number}", "📦")
+
+    # One readiness check and one log for the whole season, and lines repeated
+    # across episodes (intro, recaps, credits) are translated only once
+    await translator.pool.ensure_available()
+    audit = translator.open_log(f"{season.title or season.imdb_id} season {season.season_number or ''}")
+    dedup = TextDedup()
+
+    progress = [
+        {
+            "file_id": episode.file_id,
+            "season_number": episode.season_number,
+            "episode_number": episode.episode_number,
+            "stage": "queued",
+            "done": 0,
+            "total": 0,
+            "status": None,
+            "message": None,
+        }
+        for episode in episodes
+    ]
+
+    def publish(state):
+        # Overall progress is the sum of the batches of every episode
+        job.result = {"episodes": progress}
+        job.set_progress(sum(p["done"] for p in progress), sum(p["total"] for p in progress))
+        job.publish("episode", state)
+
+    limit = asyncio.Semaphore(SEASON_CONCURRENCY)
+
+    async def run_episode(episode, state):
+        def set_stage(stage):
+            state["stage"] = stage
+            publish(state)
+
+        def on_progress(done, total):
+            state["done"], state["total"] = done, total
+            publish(state)
+
+        async with limit:
+            try:
+                result = await process_file(episode, set_stage, on_progress=on_progress, audit=audit, dedup=dedup)
+                state["status"] = result["status"]
+                state["message"] = result["message"]
+            except Exception as e:
+                state["status"] = "failed"
+                state["message"] = getattr(e, "detail", None) or str(e)
+            state["stage"] = None
+            publish(state)
+
+    job.set_stage("processing")
+    try:
+        await asyncio.gather(*(run_episode(episode, state) for episode, state in zip(episodes, progress)))
+    finally:
+        await audit.aclose()
+
+    succeeded = sum(1 for p in progress if p["status"] == "success")
+    failed = sum(1 for p in progress if p["status"] == "failed")
+    log.success(f"Season finished: {succeeded}/{len(progress)} episodes uploaded, {failed} failed")
+    message = f"{succeeded} of {len(progress)} episodes translated and uploaded to Stremio."
+    if missing:
+        log.warning(f"No English subtitles found for episodes {missing}")
+        message += f" No subtitles found for episode(s) {', '.join(map(str, missing))}."
+    return {
+        "status": "success" if succeeded == len(progress) and not missing else "warning",
+        "message": message,
+        "episodes": progress,
+        "missing_episodes": missing,
+    }
+
+job_queue = JobQueue({"process": run_process_job, "season": run_season_job})
+JOB_QUEUE_DEPTH.set_function(job_queue.queue_depth)
+UPLOAD_QUEUE_DEPTH.set_function(uploader.queue_depth)
+
+def check_languages(codes):
+    try:
+        target_languages(codes)
+    except UnknownLanguageError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.post("/api/process")
+async def process_subtitle(request: ProcessRequest):
+    """Queue a subtitle for translation and upload, poll /api/jobs/{job_id} for its status"""
+    check_languages(request.languages)
+    try:
+        job = await job_queue.submit("process", request.model_dump())
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"status": "queued", "job_id": job.id}
+
+@app.post("/api/process_season")
+async def process_season(request: SeasonRequest):
+    """Queue every episode of a season (or the given episodes) as one job"""
+    if not request.episodes and request.season_number is None:
+        raise HTTPException(status_code=422, detail="Provide a season_number or a list of episodes")
+    check_languages(request.languages)
+    for episode in request.episodes or []:
+        check_languages(episode.languages)
+    try:
+        job = await job_queue.submit("season", request.model_dump())
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"status": "queued", "job_id": job.id}
+
+@app.get("/api/jobs")
+async def list_jobs(status: str | None = None, limit: int = 50):
+    """Recent jobs, e.g. ?status=failed for the ones that can be resumed with /retry"""
+    return [job.to_dict() for job in await job_queue.list(status=status, limit=limit)]
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and batch progress of a queued job"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Server-Sent Events with the job's progress and its translated blocks in index order"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        if job.finished:
+            # Already finished and no longer tracked in memory, only the outcome is left
+            yield f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n"
+            return
+        async for event, data in job.events():
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/jobs/{job_id}/retry")
+async def retry_job(job_id: str):
+    """Queue a finished job again, its translations resume from the blocks checkpointed so far"""
+    try:
+        job = await job_queue.retry(job_id)
+    except JobStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"status": "queued", "job_id": job.id}
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness from the startup checks and the background health monitor, nothing is probed here"""
+    ollama_ready = any(b.healthy for b in translator.pool.backends)
+    opensubtitles_ready = os_client.token is not None
+    ready = warmup.done and ollama_ready and opensubtitles_ready
+    body = {
+        "ready": ready,
+        "warmup": {"done": warmup.done, "checks": warmup.checks},
+        "ollama": ollama_ready,
+        "opensubtitles": opensubtitles_ready,
+        "uploader": uploader.running,
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms, Ollama throughput, uploads and queue depth"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/api/admin/ollama")
+async def ollama_backends():
+    """Health and load of every Ollama backend"""
+    return translator.pool.stats()
+
+@app.get("/api/admin/opensubtitles")
+async def opensubtitles_state():
+    """Login token, download quota and requests waiting for the rate limiter"""
+    return os_client.stats()
+
+@app.get("/api/admin/caches")
+async def cache_stats():
+    """Hit rates of the in-process caches"""
+    return {
+        "imdb": imdb_service.stats(),
+        "opensubtitles_search": os_client.search_cache.stats(),
+        "sources": await asyncio.to_thread(source_store.stats),
+    }
+
+@app.get("/api/admin/results")
+async def list_cached_results():
+    """Inspect the translated result cache"""
+    return {
+        "stats": await asyncio.to_thread(result_cache.stats),
+        "entries": await asyncio.to_thread(result_cache.entries),
+    }
+
+@app.delete("/api/admin/results")
+async def purge_cached_results(key: str | None = None, file_id: int | None = None):
+    """Purge one cached result, every result of a file, or the whole cache"""
+    deleted = await asyncio.to_thread(result_cache.purge, key=key, file_id=file_id)
+    log.info(f"Purged {deleted} cached results", "🧹")
+    return {"deleted": deleted}
+
+@app.get("/api/admin/checkpoints")
+async def list_checkpoints():
+    """Partially translated files and how many of their blocks are done"""
+    return {
+        "stats": await asyncio.to_thread(translator.checkpoints.stats),
+        "runs": await asyncio.to_thread(translator.checkpoints.runs),
+    }
+
+@app.delete("/api/admin/checkpoints")
+async def purge_checkpoints(key: str | None = None):
+    """Drop one checkpoint, or all of them, so the next run starts from scratch"""
+    deleted = await asyncio.to_thread(translator.checkpoints.purge, key=key)
+    log.info(f"Purged {deleted} translation checkpoints", "🧹")
+    return {"deleted": deleted}
+
+@app.delete("/api/admin/sources")
+async def purge_sources(file_id: int | None = None):
+    """Purge one stored original subtitle file, or all of them"""
+    deleted = await asyncio.to_thread(source_store.purge, file_id=file_id)
+    log.info(f"Purged {deleted} stored originals", "🧹")
+    return {"deleted": deleted}
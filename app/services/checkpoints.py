@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from app.utils.logger import log
+
+CHECKPOINTS_PATH = os.getenv("CHECKPOINTS_PATH", "cache/checkpoints.db")
+CHECKPOINT_MAX_AGE_DAYS = float(os.getenv("CHECKPOINT_MAX_AGE_DAYS", "14"))
+
+
+class CheckpointStore:
+    """
+    Translated blocks of unfinished translations, saved after every batch.
+    A run is keyed by source hash, target language, model and prompt version,
+    so a retried or restarted job only sends the blocks still missing to the LLM.
+    Runs are dropped once their file is fully translated, or after
+    CHECKPOINT_MAX_AGE_DAYS without progress.
+    """
+
+    def __init__(self, path=CHECKPOINTS_PATH, max_age_days=CHECKPOINT_MAX_AGE_DAYS):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.resumed = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                key TEXT PRIMARY KEY,
+                language TEXT NOT NULL,
+                model TEXT NOT NULL,
+                title TEXT,
+                label TEXT,
+                total INTEGER NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blocks (
+                key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                translated TEXT NOT NULL,
+                PRIMARY KEY (key, position)
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_updated_at ON runs(updated_at);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(srt_content, language, model, prompt_version):
+        source_hash = hashlib.sha256(srt_content.encode("utf-8")).hexdigest()
+        raw = f"{source_hash}\x00{language}\x00{model}\x00{prompt_version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _expire(self):
+        cutoff = time.time() - self.max_age
+        stale = [row[0] for row in self._conn.execute("SELECT key FROM runs WHERE updated_at < ?", (cutoff,))]
+        for key in stale:
+            self._conn.execute("DELETE FROM blocks WHERE key = ?", (key,))
+            self._conn.execute("DELETE FROM runs WHERE key = ?", (key,))
+        if stale:
+            log.info(f"Dropped {len(stale)} stale translation checkpoints", "🧹")
+
+    def open(self, key, total, language, model, title=None, label=None):
+        """Start or resume a run, returning {position: translation} of the blocks already done."""
+        now = time.time()
+        with self._lock:
+            self._expire()
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (key, language, model, title, label, total, done, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                (key, language, model, title, label, total, now, now),
+            )
+            self._conn.execute(
+                "UPDATE runs SET title = ?, label = ?, total = ?, updated_at = ? WHERE key = ?",
+                (title, label, total, now, key),
+            )
+            self._conn.commit()
+            rows = self._conn.execute("SELECT position, translated FROM blocks WHERE key = ?", (key,)).fetchall()
+        if rows:
+            self.resumed += len(rows)
+        return dict(rows)
+
+    def save(self, key, translations):
+        """Checkpoint the (position, translation) pairs of a finished batch."""
+        if not translations:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blocks (key, position, translated) VALUES (?, ?, ?)",
+                [(key, position, translated) for position, translated in translations],
+            )
+            self._conn.execute(
+                "UPDATE runs SET done = (SELECT COUNT(*) FROM blocks WHERE key = ?), updated_at = ? WHERE key = ?",
+                (key, time.time(), key),
+            )
+            self._conn.commit()
+
+    def complete(self, key):
+        """The file is fully translated, its checkpoint is no longer needed."""
+        self.purge(key)
+
+    def runs(self):
+        """Unfinished runs, most recently active first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, language, model, title, label, total, done, created_at, updated_at "
+                "FROM runs ORDER BY updated_at DESC"
+            ).fetchall()
+        return [
+            {
+                "key": row[0],
+                "language": row[1],
+                "model": row[2],
+                "title": row[3],
+                "label": row[4],
+                "progress": {"done": row[6], "total": row[5]},
+                "created_at": row[7],
+                "updated_at": row[8],
+            }
+            for row in rows
+        ]
+
+    def purge(self, key=None):
+        with self._lock:
+            if key:
+                self._conn.execute("DELETE FROM blocks WHERE key = ?", (key,))
+                deleted = self._conn.execute("DELETE FROM runs WHERE key = ?", (key,)).rowcount
+            else:
+                self._conn.execute("DELETE FROM blocks")
+                deleted = self._conn.execute("DELETE FROM runs").rowcount
+            self._conn.commit()
+        return deleted
+
+    def stats(self):
+        with self._lock:
+            runs = self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            blocks = self._conn.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+        return {"runs": runs, "blocks": blocks, "resumed_blocks": self.resumed}
@@ -1,58 +1,225 @@
-import requests
+import os
+import re
+import json
+import bisect
+import threading
+import unicodedata
+from urllib.parse import quote
 from app.utils.logger import log
+from app.utils.cache import TTLCache
+from app.utils.metrics import track, CACHE_LOOKUPS
+
+SUGGESTION_URL = os.getenv("IMDB_SUGGESTION_URL", "https://v2.sg.media-imdb.com/suggestion")
+IMDB_CACHE_TTL = float(os.getenv("IMDB_CACHE_TTL", "21600"))
+IMDB_CACHE_MAX_ENTRIES = int(os.getenv("IMDB_CACHE_MAX_ENTRIES", "5000"))
+# Most searched queries and most selected titles, reloaded on start
+IMDB_HISTORY_PATH = os.getenv("IMDB_HISTORY_PATH", "cache/imdb_history.json")
+IMDB_WARM_QUERIES = int(os.getenv("IMDB_WARM_QUERIES", "500"))
+
+# The suggestion endpoint returns at most this many items, a shorter answer holds every match
+SUGGESTION_PAGE_SIZE = 8
+
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize_query(text):
+    """Lowercase, strip accents and collapse whitespace so 'Amélie ' and 'amelie' share a cache entry."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.split())
+
+
+def title_words(text):
+    return WORD_RE.findall(normalize_query(text))
+
+
+def matches_query(query, title):
+    """Suggestion-style match: every word of the query starts a word of the title."""
+    words = title_words(title)
+    return all(any(w.startswith(q) for w in words) for q in title_words(query))
+
+
+class TitleIndex:
+    """
+    Prefix index of every title seen in a suggestion answer: a sorted array of
+    (word, imdb_id) pairs searched with bisect. Answers queries locally when the
+    suggestion endpoint cannot be reached.
+    """
 
-class IMDBService:
     def __init__(self):
-        pass
+        self.items = {}
+        self.popularity = {}
+        self._words = []
 
-    def search_content(self, query):
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        imdb_id = item["imdb_id"]
+        known = imdb_id in self.items
+        self.items[imdb_id] = item
+        if not known:
+            for word in set(title_words(item["title"])):
+                bisect.insort(self._words, (word, imdb_id))
+
+    def search(self, query, limit=SUGGESTION_PAGE_SIZE):
+        found = None
+        for prefix in title_words(query):
+            ids = set()
+            i = bisect.bisect_left(self._words, (prefix,))
+            while i < len(self._words) and self._words[i][0].startswith(prefix):
+                ids.add(self._words[i][1])
+                i += 1
+            found = ids if found is None else found & ids
+            if not found:
+                return []
+        ranked = sorted(found or (), key=lambda imdb_id: -self.popularity.get(imdb_id, 0))
+        return [self.items[imdb_id] for imdb_id in ranked[:limit]]
+
+
+class IMDBService:
+    def __init__(self, http, history_path=IMDB_HISTORY_PATH):
+        self.http = http
+        self.history_path = history_path
+        # normalized query -> (results, complete)
+        self.cache = TTLCache(IMDB_CACHE_MAX_ENTRIES, IMDB_CACHE_TTL)
+        self.index = TitleIndex()
+        self.query_hits = {}
+        self._file_lock = threading.Lock()
+
+    def _cached_answer(self, key):
+        cached = self.cache.get(key)
+        if cached is not None:
+            CACHE_LOOKUPS.labels("imdb", "hit").inc()
+            return cached[0]
+
+        # Typing 'breaking b' after 'breakin': a complete answer for a shorter prefix holds every match
+        for end in range(len(key) - 1, 0, -1):
+            shorter = self.cache.peek(key[:end])
+            if shorter is not None and shorter[1]:
+                results = [item for item in shorter[0] if matches_query(key, item["title"])]
+                self.cache.put(key, (results, True))
+                CACHE_LOOKUPS.labels("imdb", "local").inc()
+                return results
+
+        CACHE_LOOKUPS.labels("imdb", "miss").inc()
+        return None
+
+    async def search_content(self, query):
         """
         Search movies or series using IMDb suggestion endpoint (unofficial but fast).
+        Answers are cached, and a query extending a cached one is answered locally when possible.
         """
-        if not query:
+        if not query or not query.strip():
             return []
-            
+
+        key = normalize_query(query)
+        self.query_hits[key] = self.query_hits.get(key, 0) + 1
+        if len(self.query_hits) > 2 * self.cache.max_entries:
+            # Only counts of cached queries are worth keeping
+            self.query_hits = {k: n for k, n in self.query_hits.items() if self.cache.peek(k) is not None}
+        results = self._cached_answer(key)
+        if results is not None:
+            return results
+
+        try:
+            results, complete = await self._fetch(query)
+        except Exception as e:
+            log.error(f"Error searching on IMDb (Suggestion API): {e}")
+            # Better some known titles than nothing
+            return self.index.search(key)
+
+        self.cache.put(key, (results, complete))
+        for item in results:
+            self.index.add(item)
+        return results
+
+    async def _fetch(self, query):
+        """Call the suggestion endpoint, returning (results, complete)."""
         # Endpoint needs the first letter for the path
-        first_char = query[0].lower()
+        first_char = query.strip()[0].lower()
         # Clean query for url
-        clean_query = requests.utils.quote(query.lower())
-        
-        url = f"https://v2.sg.media-imdb.com/suggestion/{first_char}/{clean_query}.json"
-        
-        try:
-            # We need a browser User-Agent to avoid blocking
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
-            }
-            response = requests.get(url, headers=headers)
+        clean_query = quote(query.strip().lower())
+
+        url = f"{SUGGESTION_URL}/{first_char}/{clean_query}.json"
+
+        # We need a browser User-Agent to avoid blocking
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
+        }
+        with track("imdb_suggestion"):
+            response = await self.http.get(url, headers=headers)
             data = response.json()
-            
-            results = []
-            if 'd' in data:
-                for item in data['d']:
-                    # extract relevant data
-                    # id is usually 'tt1234567'
-                    imdb_id = item.get('id')
-                    title = item.get('l')
-                    year = item.get('y')
-                    kind = item.get('q') # feature, TV series, etc.
-                    cover = item.get('i', {}).get('imageUrl')
-                    
-                    # Filter only items that look like movies or series (have year and title)
-                    if imdb_id and title:
-                        # OpenSubtitles requires ID, user indicates keeping 'tt'
-                        
-                        results.append({
-                            "imdb_id": imdb_id, # 'tt1234567'
-                            "display_id": imdb_id,
-                            "title": title,
-                            "year": year,
-                            "kind": kind,
-                            "cover": cover
-                        })
-            
-            return results
-            
+
+        results = []
+        items = data.get('d', [])
+        for item in items:
+            # extract relevant data
+            # id is usually 'tt1234567'
+            imdb_id = item.get('id')
+            title = item.get('l')
+            year = item.get('y')
+            kind = item.get('q') # feature, TV series, etc.
+            cover = item.get('i', {}).get('imageUrl')
+
+            # Filter only items that look like movies or series (have year and title)
+            if imdb_id and title:
+                # OpenSubtitles requires ID, user indicates keeping 'tt'
+
+                results.append({
+                    "imdb_id": imdb_id, # 'tt1234567'
+                    "display_id": imdb_id,
+                    "title": title,
+                    "year": year,
+                    "kind": kind,
+                    "cover": cover
+                })
+
+        return results, len(items) < SUGGESTION_PAGE_SIZE
+
+    def mark_selected(self, imdb_id):
+        """Count a title picked from the results, popular titles rank first in local answers."""
+        self.index.popularity[imdb_id] = self.index.popularity.get(imdb_id, 0) + 1
+
+    def load_history(self):
+        """Warm the cache and the title index with the most searched queries of previous runs."""
+        try:
+            with open(self.history_path, encoding="utf-8") as f:
+                history = json.load(f)
+        except FileNotFoundError:
+            return
         except Exception as e:
-            log.error(f"Error searching on IMDb (Suggestion API): {e}")
-            return []
+            log.warning(f"Could not read IMDb history: {e}")
+            return
+
+        self.index.popularity.update(history.get("popularity", {}))
+        # Most searched last, so they are the last to be evicted
+        for entry in reversed(history.get("queries", [])):
+            key = entry["query"]
+            self.query_hits[key] = entry.get("hits", 0)
+            self.cache.put(key, (entry["results"], entry.get("complete", False)))
+            for item in entry["results"]:
+                self.index.add(item)
+        log.search(f"IMDb cache warmed with {len(self.cache)} queries and {len(self.index)} titles")
+
+    def save_history(self):
+        """Persist the most searched queries with their answers, and title popularity."""
+        cached = {key: value for key, _, value in self.cache.items()}
+        popular = sorted(cached, key=lambda key: -self.query_hits.get(key, 0))[:IMDB_WARM_QUERIES]
+        history = {
+            "queries": [
+                {"query": key, "hits": self.query_hits.get(key, 0), "results": cached[key][0], "complete": cached[key][1]}
+                for key in popular
+            ],
+            "popularity": self.index.popularity,
+        }
+        with self._file_lock:
+            if os.path.dirname(self.history_path):
+                os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+            tmp_path = f"{self.history_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(history, f)
+            os.replace(tmp_path, self.history_path)
+
+    def stats(self):
+        return {**self.cache.stats(), "titles": len(self.index)}
@@ -0,0 +1,340 @@
+import os
+import json
+import sqlite3
+import asyncio
+import threading
+import time
+import uuid
+from app.utils.logger import log
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "cache/jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+# Progress updates are written at most this often, stages and final states right away
+JOB_PROGRESS_SAVE_INTERVAL = float(os.getenv("JOB_PROGRESS_SAVE_INTERVAL", "2"))
+# Finished jobs older than this are deleted
+JOBS_MAX_AGE_DAYS = float(os.getenv("JOBS_MAX_AGE_DAYS", "30"))
+PRUNE_INTERVAL = 3600
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobStateError(Exception):
+    pass
+
+
+class Job:
+    """A unit of work tracked by the JobQueue."""
+
+    def __init__(self, queue, id, kind, payload, status="queued", stage=None, done=0, total=0,
+                 result=None, error=None, created_at=None, updated_at=None):
+        self._queue = queue
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.status = status
+        self.stage = stage
+        self.done = done
+        self.total = total
+        self.result = result
+        self.error = error
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+        self._events = []
+        self._wakeup = asyncio.Event()
+
+    def set_stage(self, stage):
+        self.stage = stage
+        self._queue._schedule_save(self)
+        self.publish("stage", {"stage": stage})
+
+    def set_progress(self, done, total):
+        self.done = done
+        self.total = total
+        self._queue._schedule_save(self, delay=JOB_PROGRESS_SAVE_INTERVAL)
+        self.publish("progress", {"done": done, "total": total})
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def publish(self, event, data):
+        """Record an event and wake up every stream waiting on this job."""
+        self._events.append((event, data))
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    async def events(self):
+        """Yield every (event, data) published so far, then new ones until the job finishes."""
+        sent = 0
+        while True:
+            while sent < len(self._events):
+                yield self._events[sent]
+                sent += 1
+            if self.finished:
+                return
+            await self._wakeup.wait()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": {"done": self.done, "total": self.total},
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobQueue:
+    """
+    Bounded worker pool with SQLite persistence.
+    Jobs that were queued or running when the process stopped are re-queued on start.
+    Jobs are written and read off the event loop, the progress of running jobs at
+    most every JOB_PROGRESS_SAVE_INTERVAL seconds. Finished jobs are kept JOBS_MAX_AGE_DAYS.
+    """
+
+    def __init__(self, handlers, path=JOBS_DB_PATH, workers=JOB_WORKERS, max_pending=JOB_QUEUE_MAX,
+                 max_age_days=JOBS_MAX_AGE_DAYS):
+        self.handlers = handlers
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_age = max_age_days * 86400
+        self._jobs = {}
+        self._pending = None
+        self._tasks = []
+        self._lock = threading.Lock()
+        # Jobs changed since their last write, and the tasks writing them
+        self._dirty = {}
+        self._flush_lock = asyncio.Lock()
+        self._flushes = set()
+        self._last_prune = 0.0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                done INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+            CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _row(job):
+        return (
+            job.id, job.kind, json.dumps(job.payload), job.status, job.stage, job.done, job.total,
+            json.dumps(job.result) if job.result is not None else None, job.error,
+            job.created_at, job.updated_at,
+        )
+
+    def _write(self, rows):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO jobs "
+                "(id, kind, payload, status, stage, done, total, result, error, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def _query(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    async def _save(self, job):
+        """Write job now, in order with the background writes."""
+        job.updated_at = time.time()
+        self._dirty[job.id] = job
+        await self._flush()
+
+    def _schedule_save(self, job, delay=0.0):
+        """Write job from a background task, after delay seconds (changes made meanwhile share the write)."""
+        job.updated_at = time.time()
+        if job.id in self._dirty and delay:
+            # A write is already coming
+            return
+        self._dirty[job.id] = job
+        task = asyncio.create_task(self._flush(delay))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, delay=0.0):
+        if delay:
+            await asyncio.sleep(delay)
+        # One write at a time, each with the state of the jobs when it starts, so a write never goes back in time
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            rows = [self._row(job) for job in self._dirty.values()]
+            self._dirty.clear()
+            await asyncio.to_thread(self._write, rows)
+
+    def _prune(self):
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,)
+            ).rowcount
+            self._conn.commit()
+        if deleted:
+            log.info(f"Deleted {deleted} finished jobs older than {self.max_age / 86400:g} days", "🧹")
+        return deleted
+
+    async def _prune_if_due(self):
+        if time.time() - self._last_prune >= PRUNE_INTERVAL:
+            self._last_prune = time.time()
+            await asyncio.to_thread(self._prune)
+
+    def _load(self, row):
+        return Job(
+            self, row[0], row[1], json.loads(row[2]), status=row[3], stage=row[4], done=row[5], total=row[6],
+            result=json.loads(row[7]) if row[7] else None, error=row[8], created_at=row[9], updated_at=row[10],
+        )
+
+    async def start(self):
+        self._pending = asyncio.Queue()
+        await self._prune_if_due()
+
+        # Restore jobs interrupted by a restart
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT id, kind, payload, status, stage, done, total, result, error, created_at, updated_at "
+            "FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at",
+        )
+        restored = []
+        for row in rows:
+            job = self._load(row)
+            job.status = "queued"
+            job.stage = None
+            job.updated_at = time.time()
+            self._jobs[job.id] = job
+            restored.append(self._row(job))
+            self._pending.put_nowait(job.id)
+        if restored:
+            await asyncio.to_thread(self._write, restored)
+        if rows:
+            log.info(f"Restored {len(rows)} pending jobs", "♻️")
+
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        log.process(f"Job queue started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Write the progress still waiting for its interval
+        for task in list(self._flushes):
+            task.cancel()
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self._flush()
+
+    async def submit(self, kind, payload):
+        if self._pending.qsize() >= self.max_pending:
+            raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+        job = Job(self, uuid.uuid4().hex, kind, payload)
+        self._jobs[job.id] = job
+        self._pending.put_nowait(job.id)
+        await self._save(job)
+        log.info(f"Queued {kind} job {job.id} ({self._pending.qsize()} pending)", "📅")
+        return job
+
+    async def retry(self, job_id):
+        """
+        Queue a finished job again under the same id. Files it already translated
+        come from the result cache and interrupted ones resume from their checkpoint.
+        """
+        job = await self.get(job_id)
+        if job is None:
+            return None
+        # Another retry may have queued it while the job was read
+        job = self._jobs.get(job_id, job)
+        if not job.finished:
+            raise JobStateError(f"Job {job_id} is still {job.status}")
+        if self._pending.qsize() >= self.max_pending:
+            raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+        # A fresh object, so streams of the previous attempt are not mixed with this one
+        job = Job(self, job.id, job.kind, job.payload, created_at=job.created_at)
+        self._jobs[job.id] = job
+        self._pending.put_nowait(job.id)
+        await self._save(job)
+        log.info(f"Re-queued {job.kind} job {job.id} ({self._pending.qsize()} pending)", "♻️")
+        return job
+
+    async def list(self, status=None, limit=50):
+        """Most recently updated jobs, optionally only those with the given status."""
+        query = (
+            "SELECT id, kind, payload, status, stage, done, total, result, error, created_at, updated_at FROM jobs"
+        )
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY updated_at DESC LIMIT ?"
+        rows = await asyncio.to_thread(self._query, query, params + (limit,))
+        # Jobs still tracked in memory have the freshest state
+        return [self._jobs.get(row[0]) or self._load(row) for row in rows]
+
+    async def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job:
+            return job
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT id, kind, payload, status, stage, done, total, result, error, created_at, updated_at "
+            "FROM jobs WHERE id = ?", (job_id,),
+        )
+        return self._load(rows[0]) if rows else None
+
+    def queue_depth(self):
+        return self._pending.qsize() if self._pending else 0
+
+    async def _worker(self, n):
+        while True:
+            job_id = await self._pending.get()
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            job.status = "running"
+            self._schedule_save(job)
+            log.process(f"Worker {n} running {job.kind} job {job.id}")
+            try:
+                job.result = await self.handlers[job.kind](job)
+                job.status = "done"
+                log.success(f"Job {job.id} finished")
+            except asyncio.CancelledError:
+                # Leave it as running so it is re-queued on the next start
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = getattr(e, "detail", None) or str(e)
+                log.error(f"Job {job.id} failed: {job.error}")
+            finally:
+                if job.status != "running":
+                    job.stage = None
+                    await self._save(job)
+                    job.publish(job.status, job.to_dict())
+                    # Finished jobs are served from SQLite from now on (unless a retry already replaced this one)
+                    if self._jobs.get(job.id) is job:
+                        del self._jobs[job.id]
+                    await self._prune_if_due()
@@ -0,0 +1,205 @@
+import os
+import asyncio
+import time
+from contextlib import asynccontextmanager
+import httpx
+from ollama import AsyncClient, ResponseError
+from app.utils.logger import log
+
+# Comma separated list of Ollama endpoints, each optionally followed by |<max concurrent requests>
+# e.g. "http://gpu1:11434|4,http://gpu2:11434|2". Empty uses the default Ollama host (OLLAMA_HOST).
+OLLAMA_HOSTS = os.getenv("OLLAMA_HOSTS", "")
+OLLAMA_BACKEND_CONCURRENCY = int(os.getenv("OLLAMA_BACKEND_CONCURRENCY", "8"))
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "30"))
+
+
+class NoHealthyBackendError(Exception):
+    pass
+
+
+def is_backend_failure(error):
+    """Connection errors, timeouts and 5xx answers say the backend is in trouble, a 4xx or a bad answer does not."""
+    if isinstance(error, ResponseError):
+        return error.status_code >= 500
+    return isinstance(error, (NoHealthyBackendError, ConnectionError, TimeoutError, httpx.TransportError))
+
+
+def parse_hosts(spec, default_concurrency=OLLAMA_BACKEND_CONCURRENCY):
+    """Parse OLLAMA_HOSTS into a list of (host, max_concurrency)."""
+    hosts = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, limit = entry.partition("|")
+        hosts.append((host.strip(), int(limit) if limit else default_concurrency))
+    return hosts
+
+
+class OllamaBackend:
+    """One Ollama endpoint with its own concurrency limit and health state."""
+
+    def __init__(self, host, max_concurrency):
+        self.host = host
+        self.name = host or "default"
+        self.max_concurrency = max_concurrency
+        self.client = AsyncClient(host=host) if host else AsyncClient()
+        self.inflight = 0
+        self.healthy = True
+        self.last_check = 0.0
+        self.last_error = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def load(self):
+        return self.inflight / self.max_concurrency
+
+    @asynccontextmanager
+    async def slot(self):
+        self.inflight += 1
+        try:
+            async with self._semaphore:
+                yield self.client
+        finally:
+            self.inflight -= 1
+
+    def to_dict(self):
+        return {
+            "host": self.name,
+            "healthy": self.healthy,
+            "inflight": self.inflight,
+            "max_concurrency": self.max_concurrency,
+            "last_check": self.last_check,
+            "last_error": self.last_error,
+        }
+
+
+class OllamaPool:
+    """
+    Dispatches chat requests to the least-loaded healthy backend and retries
+    them on another one when a backend fails (connection error, timeout or 5xx).
+    A background task probes every backend with client.show(model) every
+    OLLAMA_HEALTH_INTERVAL seconds.
+    """
+
+    def __init__(self, model, hosts=OLLAMA_HOSTS, health_interval=OLLAMA_HEALTH_INTERVAL):
+        self.model = model
+        self.health_interval = health_interval
+        parsed = parse_hosts(hosts) if hosts else [(None, OLLAMA_BACKEND_CONCURRENCY)]
+        self.backends = [OllamaBackend(host, limit) for host, limit in parsed]
+        self._health_task = None
+
+    @property
+    def capacity(self):
+        return sum(b.max_concurrency for b in self.backends)
+
+    def _pick(self, exclude):
+        candidates = [b for b in self.backends if b not in exclude]
+        healthy = [b for b in candidates if b.healthy]
+        # If every backend looks down, still try one: it may have recovered since the last probe
+        pool = healthy or candidates
+        if not pool:
+            return None
+        return min(pool, key=lambda b: b.load)
+
+    async def chat(self, **kwargs):
+        tried = set()
+        last_error = None
+        while True:
+            backend = self._pick(tried)
+            if backend is None:
+                break
+            tried.add(backend)
+            try:
+                async with backend.slot() as client:
+                    response = await client.chat(**kwargs)
+                backend.healthy = True
+                backend.last_error = None
+                return response
+            except Exception as e:
+                if not is_backend_failure(e):
+                    # The request itself was refused, another backend would answer the same
+                    raise
+                last_error = e
+                backend.healthy = False
+                backend.last_error = str(e)
+                if len(tried) < len(self.backends):
+                    log.warning(f"Ollama backend {backend.name} failed ({e}), retrying on another backend")
+        raise last_error or NoHealthyBackendError("No Ollama backend available")
+
+    async def probe(self, backend):
+        try:
+            await backend.client.show(self.model)
+            if not backend.healthy:
+                log.success(f"Ollama backend {backend.name} is healthy again")
+            backend.healthy = True
+            backend.last_error = None
+        except Exception as e:
+            if backend.healthy:
+                log.warning(f"Ollama backend {backend.name} is unhealthy: {e}")
+            backend.healthy = False
+            backend.last_error = str(e)
+        backend.last_check = time.time()
+        return backend.healthy
+
+    async def check_health(self):
+        results = await asyncio.gather(*(self.probe(b) for b in self.backends))
+        return any(results)
+
+    @property
+    def monitored(self):
+        return self._health_task is not None and not self._health_task.done()
+
+    async def ensure_available(self):
+        """
+        Raise NoHealthyBackendError unless a backend is healthy. While the health
+        monitor runs a healthy answer is used as is, otherwise (or when every backend
+        looks down, e.g. after one failed call) the backends are probed now.
+        """
+        now = time.time()
+        if any(b.healthy and (self.monitored or now - b.last_check < self.health_interval) for b in self.backends):
+            return
+        if not await self.check_health():
+            errors = ", ".join(f"{b.name}: {b.last_error}" for b in self.backends)
+            raise NoHealthyBackendError(f"No healthy Ollama backend for {self.model} ({errors})")
+
+    async def warm_up(self, request):
+        """Send request (a tiny generation) to every backend so the model is loaded, returning how many answered."""
+        async def load(backend):
+            try:
+                async with backend.slot() as client:
+                    await client.chat(**request)
+                backend.healthy = True
+                backend.last_error = None
+                return True
+            except Exception as e:
+                backend.healthy = False
+                backend.last_error = str(e)
+                log.warning(f"Ollama backend {backend.name} could not load {self.model}: {e}")
+                return False
+            finally:
+                backend.last_check = time.time()
+
+        loaded = sum(await asyncio.gather(*(load(b) for b in self.backends)))
+        if not loaded:
+            raise NoHealthyBackendError(f"No Ollama backend could load {self.model}")
+        return loaded
+
+    async def _health_loop(self):
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_interval)
+
+    async def start(self):
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+            log.ai(f"Ollama pool: {', '.join(f'{b.name} (x{b.max_concurrency})' for b in self.backends)}")
+
+    async def stop(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    def stats(self):
+        return {"model": self.model, "backends": [b.to_dict() for b in self.backends]}
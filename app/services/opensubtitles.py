@@ -1,39 +1,241 @@
 import os
-import requests
+import re
+import json
+import time
+import base64
+import asyncio
+from datetime import datetime
+import httpx
 from dotenv import load_dotenv
 from app.utils.logger import log
+from app.utils.cache import SingleFlight, TTLCache
+from app.utils.ratelimit import TokenBucket, retry_delay
+from app.utils.metrics import track, CACHE_LOOKUPS, UPSTREAM_RETRIES
 
 load_dotenv()
 
-BASE_URL = "https://api.opensubtitles.com/api/v1"
+BASE_URL = os.getenv("OPENSUBTITLES_BASE_URL", "https://api.opensubtitles.com/api/v1")
 API_KEY = os.getenv("OPENSUBTITLES_API_KEY")
 USERNAME = os.getenv("OPENSUBTITLES_USERNAME")
 PASSWORD = os.getenv("OPENSUBTITLES_PASSWORD")
 
+# Client-side pacing matched to the API limits (5 requests per second per IP)
+OPENSUBTITLES_RATE = float(os.getenv("OPENSUBTITLES_RATE", "5"))
+OPENSUBTITLES_MAX_RETRIES = int(os.getenv("OPENSUBTITLES_MAX_RETRIES", "4"))
+OPENSUBTITLES_BACKOFF = float(os.getenv("OPENSUBTITLES_BACKOFF", "1"))
+# A download waits this long at most for the daily download quota to reset before failing
+OPENSUBTITLES_MAX_QUOTA_WAIT = float(os.getenv("OPENSUBTITLES_MAX_QUOTA_WAIT", "60"))
+
+# Tokens are JWTs, when their expiry cannot be read assume they last this long
+TOKEN_DEFAULT_TTL = 23 * 3600
+# Log in again this many seconds before the token expires
+TOKEN_REFRESH_MARGIN = 300
+
+# Answers worth retrying after a pause
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Search results are reused for SEARCH_CACHE_TTL seconds, then served stale for up to
+# SEARCH_CACHE_STALE_TTL more while a background search refreshes them
+SEARCH_CACHE_TTL = float(os.getenv("OPENSUBTITLES_SEARCH_CACHE_TTL", "3600"))
+SEARCH_CACHE_STALE_TTL = float(os.getenv("OPENSUBTITLES_SEARCH_CACHE_STALE_TTL", "86400"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("OPENSUBTITLES_SEARCH_CACHE_MAX_ENTRIES", "1000"))
+# Result pages read by searches that need every result (a whole season), 60 results per page
+SEARCH_MAX_PAGES = int(os.getenv("OPENSUBTITLES_SEARCH_MAX_PAGES", "10"))
+
+# Season and episode in file names: S01E01, s1e1, 1x01
+EPISODE_PATTERNS = (
+    re.compile(r'[sS](\d+)[eE](\d+)'),
+    re.compile(r'\b(\d{1,2})[xX](\d{2})\b'),
+)
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+def token_expiry(token):
+    """Expiry timestamp in the payload of a JWT, or None if it cannot be read."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+def parse_reset_time(value):
+    """Timestamp of an ISO 8601 date such as '2024-01-01T00:00:00.000Z', or None."""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def simplify_subtitle(item):
+    """Flatten a search result for the frontend (None when it has no file)"""
+    attrs = item.get('attributes', {})
+    files = attrs.get('files', [])
+    if not files:
+        return None
+    file_id = files[0].get('file_id')
+    file_name = files[0].get('file_name') or ""
+
+    # Extract season and episode from feature_details if they exist
+    feature_details = attrs.get('feature_details', {})
+    season_num = feature_details.get('season_number')
+    episode_num = feature_details.get('episode_number')
+
+    # If not in feature_details, try to extract from filename (fallback)
+    if not season_num or not episode_num:
+        for pattern in EPISODE_PATTERNS:
+            match = pattern.search(file_name)
+            if match:
+                season_num = int(match.group(1))
+                episode_num = int(match.group(2))
+                break
+
+    return {
+        "id": item.get('id'),
+        "file_id": file_id,
+        "file_name": file_name,
+        "language": attrs.get('language'),
+        "movie_name": feature_details.get('movie_name'),
+        "year": feature_details.get('year'),
+        "downloads": attrs.get('download_count'),
+        "season_number": season_num,
+        "episode_number": episode_num
+    }
+
+
 class OpenSubtitlesClient:
-    def __init__(self):
+    """
+    Every request goes through a token bucket and is retried on 429/5xx after the
+    Retry-After the server asks for (or exponential backoff), so bursts turn into
+    latency instead of errors. The login token is renewed before it expires and
+    the download quota reported by the API is tracked.
+    """
+
+    def __init__(self, http, rate=OPENSUBTITLES_RATE, max_retries=OPENSUBTITLES_MAX_RETRIES):
+        self.http = http
+        self.bucket = TokenBucket(rate)
+        self.max_retries = max_retries
         self.headers = {
             "Api-Key": API_KEY,
             "Content-Type": "application/json",
             "User-Agent": "TemporaryUserAgent" # For development/testing
         }
         self.token = None
+        self.token_expires_at = 0.0
+        self.remaining_downloads = None
+        self.quota_reset_at = None
+        self._login_lock = asyncio.Lock()
+        self.search_cache = TTLCache(SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_TTL, SEARCH_CACHE_STALE_TTL)
+        self._searches = SingleFlight()
+
+    async def _request(self, method, path, auth=False, **kwargs):
+        """Send a paced request, retrying rate limits, server errors and expired tokens."""
+        attempt = 0
+        while True:
+            if auth:
+                await self.ensure_token()
+            await self.bucket.acquire()
+            try:
+                response = await self.http.request(method, f"{BASE_URL}{path}", headers=self.headers, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                UPSTREAM_RETRIES.labels("opensubtitles", "network").inc()
+                delay = retry_delay(None, attempt, OPENSUBTITLES_BACKOFF)
+                log.warning(f"OpenSubtitles unreachable ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
 
-    def login(self):
+            self._note_rate_limit(response)
+            if attempt >= self.max_retries:
+                return response
+            if response.status_code == 401 and auth:
+                # Token expired or revoked on the server side: log in again
+                UPSTREAM_RETRIES.labels("opensubtitles", "token").inc()
+                self.token = None
+                self.token_expires_at = 0.0
+            elif response.status_code in RETRY_STATUSES:
+                UPSTREAM_RETRIES.labels("opensubtitles", str(response.status_code)).inc()
+                delay = retry_delay(response, attempt, OPENSUBTITLES_BACKOFF)
+                log.warning(f"OpenSubtitles answered {response.status_code} on {path}, retrying in {delay:.1f}s")
+                # Hold back every queued request, not just this one
+                self.bucket.pause(delay)
+            else:
+                return response
+            attempt += 1
+
+    def _note_rate_limit(self, response):
+        # The API reports its window, stop before hitting the limit rather than after
+        remaining = response.headers.get("ratelimit-remaining")
+        reset = response.headers.get("ratelimit-reset")
+        if remaining == "0" and reset:
+            try:
+                self.bucket.pause(float(reset))
+            except ValueError:
+                pass
+
+    async def ensure_token(self):
+        """Log in unless the current token is valid for a while longer."""
+        async with self._login_lock:
+            if self.token and time.time() < self.token_expires_at - TOKEN_REFRESH_MARGIN:
+                return
+            if not await self.login():
+                raise Exception("OpenSubtitles login failed")
+
+    def _note_quota(self, remaining, reset_time=None):
+        if remaining is not None:
+            self.remaining_downloads = int(remaining)
+        if reset_time:
+            self.quota_reset_at = parse_reset_time(reset_time) or self.quota_reset_at
+
+    async def _wait_for_quota(self):
+        if self.remaining_downloads is None or self.remaining_downloads > 0:
+            return
+        wait = (self.quota_reset_at or 0) - time.time()
+        if wait <= 0:
+            # The quota has reset, the next answer tells the new count
+            self.remaining_downloads = None
+            return
+        if wait > OPENSUBTITLES_MAX_QUOTA_WAIT:
+            reset = datetime.fromtimestamp(self.quota_reset_at).strftime("%Y-%m-%d %H:%M")
+            raise QuotaExceededError(f"OpenSubtitles download quota exhausted until {reset}")
+        log.warning(f"OpenSubtitles download quota exhausted, waiting {wait:.0f}s for the reset")
+        await asyncio.sleep(wait)
+        self.remaining_downloads = None
+
+    async def login(self):
         if not USERNAME or not PASSWORD:
             raise Exception("OpenSubtitles credentials not configured")
             
         payload = {"username": USERNAME, "password": PASSWORD}
-        response = requests.post(f"{BASE_URL}/login", json=payload, headers=self.headers)
+        self.headers.pop("Authorization", None)
+        with track("opensubtitles_login"):
+            response = await self._request("POST", "/login", json=payload)
         if response.status_code == 200:
-            self.token = response.json().get("token")
+            data = response.json()
+            self.token = data.get("token")
+            self.token_expires_at = token_expiry(self.token) or time.time() + TOKEN_DEFAULT_TTL
             self.headers["Authorization"] = f"Bearer {self.token}"
+            self._note_quota(data.get("user", {}).get("remaining_downloads"))
+            log.auth(f"Logged in to OpenSubtitles ({self.remaining_downloads} downloads left)")
             return True
         else:
             log.error(f"Login error: {response.text}")
             return False
 
-    def search(self, imdb_id=None, parent_imdb_id=None, query=None):
+    async def search(self, imdb_id=None, parent_imdb_id=None, query=None, season_number=None,
+                     episode_number=None, all_pages=False):
+        """
+        Search English subtitles, returning simplified results (see simplify_subtitle).
+        Only the first page is read unless all_pages is set (up to SEARCH_MAX_PAGES).
+        Results are cached, identical concurrent searches share one request, and
+        expired results are served while they are refreshed in the background.
+        """
         # Search endpoint does not strictly require user token, only API Key.
         
         params = {
@@ -52,40 +254,96 @@ class OpenSubtitlesClient:
             params["query"] = query
         else:
             return []
-        
+
+        if season_number is not None:
+            params["season_number"] = season_number
+        if episode_number is not None:
+            params["episode_number"] = episode_number
+
+        key = tuple(sorted(params.items())) + (("all_pages", all_pages),)
+        results = self.search_cache.get(key)
+        if results is not None:
+            CACHE_LOOKUPS.labels("opensubtitles_search", "hit").inc()
+            return results
+
+        results = self.search_cache.get_stale(key)
+        if results is not None:
+            CACHE_LOOKUPS.labels("opensubtitles_search", "stale").inc()
+            if not self._searches.is_running(key):
+                asyncio.ensure_future(self._searches.run(key, lambda: self._search(key, params, all_pages)))
+            return results
+
+        CACHE_LOOKUPS.labels("opensubtitles_search", "miss").inc()
+        return await self._searches.run(key, lambda: self._search(key, params, all_pages))
+
+    async def _search(self, key, params, all_pages=False):
+        data = []
+        page = 1
         try:
-            response = requests.get(f"{BASE_URL}/subtitles", params=params, headers=self.headers)
-            response.raise_for_status()
-            return response.json().get("data", [])
+            while True:
+                with track("opensubtitles_search"):
+                    response = await self._request("GET", "/subtitles", params={**params, "page": page})
+                    response.raise_for_status()
+                body = response.json()
+                data.extend(body.get("data", []))
+                total_pages = body.get("total_pages") or 1
+                if not all_pages or page >= total_pages:
+                    break
+                if page >= SEARCH_MAX_PAGES:
+                    log.warning(f"Search has {total_pages} pages, only the first {SEARCH_MAX_PAGES} were read")
+                    break
+                page += 1
         except Exception as e:
             log.error(f"Error searching subtitles: {e}")
             if 'response' in locals():
                 log.debug(f"Response: {response.text}")
-            return []
+            # Keep serving what we had rather than caching the failure
+            return self.search_cache.get_stale(key) or []
 
-    def search_features(self, query):
+        results = [simplified for simplified in map(simplify_subtitle, data) if simplified]
+        self.search_cache.put(key, results)
+        return results
+
+    async def search_features(self, query):
         """
         Search metadata for movies/series on OpenSubtitles (not subtitles, just info).
         """
         params = {"query": query}
         try:
-            response = requests.get(f"{BASE_URL}/features", params=params, headers=self.headers)
+            response = await self._request("GET", "/features", params=params)
             response.raise_for_status()
             return response.json().get("data", [])
         except Exception as e:
             log.error(f"Error searching features: {e}")
             return []
 
-    def download_url(self, file_id):
-        if not self.token:
-            self.login()
-            
+    async def download_url(self, file_id):
+        await self._wait_for_quota()
+
         payload = {"file_id": int(file_id)}
-        response = requests.post(f"{BASE_URL}/download", json=payload, headers=self.headers)
+        with track("opensubtitles_download_link"):
+            response = await self._request("POST", "/download", auth=True, json=payload)
         if response.status_code == 200:
-            return response.json().get("link")
+            data = response.json()
+            self._note_quota(data.get("remaining"), data.get("reset_time_utc"))
+            return data.get("link")
+        if response.status_code == 406:
+            # Daily download quota used up
+            data = response.json() if response.content else {}
+            self._note_quota(0, data.get("reset_time_utc"))
+            raise QuotaExceededError(data.get("message") or "OpenSubtitles download quota exhausted")
+        log.error(f"Download link error ({response.status_code}): {response.text}")
         return None
 
+    def stats(self):
+        return {
+            "logged_in": self.token is not None,
+            "token_expires_at": self.token_expires_at or None,
+            "remaining_downloads": self.remaining_downloads,
+            "quota_reset_at": self.quota_reset_at,
+            "queued_requests": self.bucket.waiting,
+        }
+
     # Note: Upload is complex and usually requires video hash.
     # For now we leave a placeholder or basic upload implementation if you have the file.
     # OpenSubtitles requires video hash to upload, which is hard if we only search by text.
@@ -0,0 +1,86 @@
+import os
+import re
+import functools
+
+# How long Ollama keeps the model loaded after a call: a duration ("30m", "2h") or seconds
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Keep the model loaded for as long as Ollama runs (overrides OLLAMA_KEEP_ALIVE)
+OLLAMA_PIN_MODEL = os.getenv("OLLAMA_PIN_MODEL", "false").lower() in ("1", "true", "yes")
+OLLAMA_TEMPERATURE = float(os.getenv("OLLAMA_TEMPERATURE", "0.1"))
+
+ITEM_RE = re.compile(r'ITEM_(\d+):\s*(.*)')
+
+
+def parse_keep_alive(value, pin=False):
+    """keep_alive as Ollama expects it: -1 when pinned, seconds when numeric, else the duration string."""
+    if pin:
+        return -1
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+@functools.lru_cache(maxsize=256)
+def system_prompt(language, title=None):
+    """
+    The system message of every call for language and title. Batch and single-line
+    calls share it byte for byte, so Ollama reuses its evaluated prefix between calls.
+    """
+    context = f"Context: Subtitles for '{title}'." if title else "Context: Subtitles."
+    return (
+        f"You are a professional subtitle translator. Your TASK is to translate subtitle lines from ENGLISH to {language.upper()}.\n"
+        f"{context}\n"
+        "RULES:\n"
+        "1. Lines come as 'ITEM_N: text'. Answer every line as 'ITEM_N: [Translation]', one per line, in the same order.\n"
+        f"2. You MUST translate every item to {language}. Do not leave English text.\n"
+        "3. Output ONLY the translated items, nothing else.\n"
+        "4. Preserve tags: [BR], <i>, <b>, ♫.\n"
+        "5. Example:\n"
+        "   Input:\n"
+        "     ITEM_0: Hello friend\n"
+        "     ITEM_1: How are you?\n"
+        "   Output:\n"
+        f"     ITEM_0: [Translation in {language}]\n"
+        f"     ITEM_1: [Translation in {language}]\n"
+    )
+
+
+class PromptBuilder:
+    """
+    Chat requests for one model and target language. Every call carries the same
+    options and keep_alive (a different num_ctx would make Ollama reload the model)
+    and only the user message after the shared system prompt changes.
+    """
+
+    def __init__(self, model, language, num_ctx, keep_alive=OLLAMA_KEEP_ALIVE, pin=OLLAMA_PIN_MODEL):
+        self.model = model
+        self.language = language
+        self.options = {'temperature': OLLAMA_TEMPERATURE, 'num_ctx': num_ctx}
+        self.keep_alive = parse_keep_alive(keep_alive, pin)
+
+    def request(self, texts, title=None):
+        """Keyword arguments of the chat call translating texts (one or many lines)."""
+        items = "".join(f"ITEM_{i}: {text}\n" for i, text in enumerate(texts))
+        return {
+            'model': self.model,
+            'messages': [
+                {'role': 'system', 'content': system_prompt(self.language, title)},
+                {'role': 'user', 'content': f"Translate this list to {self.language}:\n\n{items}"},
+            ],
+            'options': self.options,
+            'keep_alive': self.keep_alive,
+        }
+
+    @staticmethod
+    def parse(content, count):
+        """Translations by item number, None for the ones missing from the answer."""
+        translated = {}
+        for line in content.split('\n'):
+            match = ITEM_RE.match(line.strip())
+            if match:
+                translated[int(match.group(1))] = match.group(2).strip()
+        if count == 1 and not translated and content.strip():
+            # A single line answered without its ITEM_0 prefix
+            translated[0] = content.strip()
+        return [translated.get(i) or None for i in range(count)]
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from app.utils.logger import log
+
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "cache/results.db")
+RESULT_CACHE_TTL_HOURS = float(os.getenv("RESULT_CACHE_TTL_HOURS", "720"))
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "512"))
+
+
+class ResultCache:
+    """
+    Durable store of translated SRT files.
+    Entries expire after RESULT_CACHE_TTL_HOURS and the least recently used
+    ones are evicted once the store grows past RESULT_CACHE_MAX_MB.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, ttl_hours=RESULT_CACHE_TTL_HOURS, max_mb=RESULT_CACHE_MAX_MB):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                file_id INTEGER NOT NULL,
+                language TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                source_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_last_access ON results(last_access);
+            CREATE INDEX IF NOT EXISTS idx_results_file_id ON results(file_id);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def source_hash(srt_content):
+        return hashlib.sha256(srt_content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(file_id, source_hash, language, model, prompt_version):
+        raw = f"{file_id}\x00{source_hash}\x00{language}\x00{model}\x00{prompt_version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the stored translation for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, file_id, source_hash, language, model, prompt_version, content):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(key, file_id, language, model, prompt_version, source_hash, content, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, int(file_id), language, model, prompt_version, source_hash, content, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        # Drop expired entries first, then the least recently used until under budget
+        self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        log.info(f"Result cache over budget, evicted {evicted} entries", "🧹")
+
+    def entries(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, file_id, language, model, prompt_version, source_hash, size, created_at, last_access "
+                "FROM results ORDER BY last_access DESC"
+            ).fetchall()
+        return [
+            {
+                "key": r[0],
+                "file_id": r[1],
+                "language": r[2],
+                "model": r[3],
+                "prompt_version": r[4],
+                "source_hash": r[5],
+                "size": r[6],
+                "created_at": r[7],
+                "last_access": r[8],
+            }
+            for r in rows
+        ]
+
+    def purge(self, key=None, file_id=None):
+        """Remove one entry, every entry of a file, or the whole store."""
+        with self._lock:
+            if key:
+                deleted = self._conn.execute("DELETE FROM results WHERE key = ?", (key,)).rowcount
+            elif file_id is not None:
+                deleted = self._conn.execute("DELETE FROM results WHERE file_id = ?", (int(file_id),)).rowcount
+            else:
+                deleted = self._conn.execute("DELETE FROM results").rowcount
+            self._conn.commit()
+        return deleted
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            "entries": count,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl_hours": self.ttl / 3600,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
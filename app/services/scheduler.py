@@ -0,0 +1,178 @@
+import os
+import json
+import asyncio
+import threading
+from app.utils.logger import log
+
+SCHEDULER_STATE_PATH = os.getenv("SCHEDULER_STATE_PATH", "cache/scheduler_state.json")
+SCHEDULER_MAX_BATCH_ITEMS = int(os.getenv("SCHEDULER_MAX_BATCH_ITEMS", "40"))
+
+# Starting point for a model we have never seen (roughly the old 10 items x 4 workers)
+DEFAULT_TOKEN_BUDGET = 300
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 8
+MIN_TOKEN_BUDGET = 40
+
+# Tokens reserved for the system prompt and instructions
+PROMPT_OVERHEAD_TOKENS = 400
+
+# Exponentially weighted averages react to the last ~5 batches
+EWMA_ALPHA = 0.2
+# Back off when more than this share of batches fails ITEM_N validation
+FAILURE_HIGH = 0.2
+# Only grow while failures stay below this share
+FAILURE_LOW = 0.05
+# Per-token latency above this multiple of the best seen means the server is queueing
+LATENCY_SLOWDOWN = 1.5
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for Latin scripts)."""
+    return len(text) // 4 + 1
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter whose limit can be changed while tasks are waiting."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    async def set_limit(self, limit):
+        async with self._cond:
+            self.limit = limit
+            self._cond.notify_all()
+
+
+class ModelProfile:
+    """Settings learned for one model."""
+
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET, concurrency=DEFAULT_CONCURRENCY,
+                 failure_rate=0.0, best_latency_per_token=None, batches=0):
+        self.token_budget = token_budget
+        self.concurrency = concurrency
+        self.failure_rate = failure_rate
+        self.best_latency_per_token = best_latency_per_token
+        self.batches = batches
+
+    def to_dict(self):
+        return {
+            "token_budget": self.token_budget,
+            "concurrency": self.concurrency,
+            "failure_rate": round(self.failure_rate, 4),
+            "best_latency_per_token": self.best_latency_per_token,
+            "batches": self.batches,
+        }
+
+
+class AdaptiveScheduler:
+    """
+    Sizes batches by token budget and adjusts concurrency from observed batch
+    latency and validation failures. Settings are learned and persisted per model,
+    and the limiter is shared by every translation running on that model.
+    """
+
+    def __init__(self, model, num_ctx=4096, path=SCHEDULER_STATE_PATH,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, max_batch_items=SCHEDULER_MAX_BATCH_ITEMS):
+        self.model = model
+        self.path = path
+        self.max_concurrency = max_concurrency
+        self.max_batch_items = max_batch_items
+        # The translation is about as long as the input, both must fit in the context
+        self.max_token_budget = max(MIN_TOKEN_BUDGET, (num_ctx - PROMPT_OVERHEAD_TOKENS) // 2)
+        self._file_lock = threading.Lock()
+
+        self.profile = ModelProfile(**self._load_state().get(model, {}))
+        self.profile.token_budget = min(self.profile.token_budget, self.max_token_budget)
+        self.profile.concurrency = min(self.profile.concurrency, self.max_concurrency)
+        self.limiter = AdaptiveLimiter(self.profile.concurrency)
+        log.ai(
+            f"Scheduler for {model}: {self.profile.token_budget} tokens/batch, "
+            f"{self.profile.concurrency} concurrent batches"
+        )
+
+    def _load_state(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(f"Could not read scheduler state: {e}")
+            return {}
+
+    def save(self):
+        """Persist the learned settings of this model next to those of other models."""
+        with self._file_lock:
+            state = self._load_state()
+            state[self.model] = self.profile.to_dict()
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def make_batches(self, items, text_of):
+        """Group items greedily so each batch stays within the current token budget."""
+        budget = self.profile.token_budget
+        batches = []
+        current = []
+        current_tokens = 0
+        for item in items:
+            tokens = estimate_tokens(text_of(item))
+            if current and (current_tokens + tokens > budget or len(current) >= self.max_batch_items):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(item)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def record(self, latency, tokens, failed):
+        """Feed back the outcome of one batch and adapt budget and concurrency."""
+        p = self.profile
+        p.batches += 1
+        p.failure_rate = (1 - EWMA_ALPHA) * p.failure_rate + EWMA_ALPHA * (1.0 if failed else 0.0)
+
+        latency_per_token = latency / max(tokens, 1)
+        if not failed and (p.best_latency_per_token is None or latency_per_token < p.best_latency_per_token):
+            p.best_latency_per_token = latency_per_token
+        slowed_down = (
+            p.best_latency_per_token is not None
+            and latency_per_token > p.best_latency_per_token * LATENCY_SLOWDOWN
+        )
+
+        concurrency = p.concurrency
+        if p.failure_rate > FAILURE_HIGH:
+            # The model is struggling with the ITEM_N format: smaller batches, fewer at once
+            p.token_budget = max(MIN_TOKEN_BUDGET, int(p.token_budget * 0.75))
+            concurrency = max(1, concurrency - 1)
+        elif slowed_down:
+            # Batches queue on the server, more concurrency only adds latency
+            concurrency = max(1, concurrency - 1)
+        elif p.failure_rate < FAILURE_LOW:
+            p.token_budget = min(self.max_token_budget, int(p.token_budget * 1.1) + 1)
+            if self.limiter.active >= concurrency:
+                concurrency = min(self.max_concurrency, concurrency + 1)
+
+        if concurrency != p.concurrency:
+            log.ai(f"Scheduler: concurrency {p.concurrency} -> {concurrency} (failure rate {p.failure_rate:.2f})")
+            p.concurrency = concurrency
+            await self.limiter.set_limit(concurrency)
+
+    def stats(self):
+        return {"model": self.model, **self.profile.to_dict()}
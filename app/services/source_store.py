@@ -0,0 +1,147 @@
+import os
+import zlib
+import sqlite3
+import hashlib
+import threading
+import time
+from app.utils.logger import log
+
+SOURCE_STORE_PATH = os.getenv("SOURCE_STORE_PATH", "cache/sources.db")
+SOURCE_STORE_MAX_MB = float(os.getenv("SOURCE_STORE_MAX_MB", "256"))
+
+
+class SourceStore:
+    """
+    Original subtitle files as downloaded from OpenSubtitles, so processing the
+    same file again costs neither a download-quota unit nor a fetch.
+    Contents are stored once per SHA-256 (zlib-compressed) and files point at
+    them with the encoding they were decoded with. The least recently used files
+    are evicted once the compressed contents grow past SOURCE_STORE_MAX_MB.
+    """
+
+    def __init__(self, path=SOURCE_STORE_PATH, max_mb=SOURCE_STORE_MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS contents (
+                content_hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                file_id INTEGER PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                encoding TEXT,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_last_access ON files(last_access);
+            CREATE INDEX IF NOT EXISTS idx_files_content_hash ON files(content_hash);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def content_hash(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, file_id):
+        """Return {"data", "encoding", "content_hash"} for file_id, or None if it is not stored."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT f.content_hash, f.encoding, c.data FROM files f "
+                "JOIN contents c ON c.content_hash = f.content_hash WHERE f.file_id = ?",
+                (int(file_id),),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE files SET last_access = ? WHERE file_id = ?", (now, int(file_id)))
+            self._conn.commit()
+            self.hits += 1
+        return {"data": zlib.decompress(row[2]), "encoding": row[1], "content_hash": row[0]}
+
+    def put(self, file_id, data, encoding=None):
+        """Store the raw bytes of file_id, returning their content hash."""
+        now = time.time()
+        content_hash = self.content_hash(data)
+        compressed = zlib.compress(data, 6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO contents (content_hash, data, size, stored_size) VALUES (?, ?, ?, ?)",
+                (content_hash, compressed, len(data), len(compressed)),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (file_id, content_hash, encoding, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (int(file_id), content_hash, encoding, now, now),
+            )
+            self._drop_orphans()
+            self._evict()
+            self._conn.commit()
+        return content_hash
+
+    def _drop_orphans(self):
+        self._conn.execute("DELETE FROM contents WHERE content_hash NOT IN (SELECT content_hash FROM files)")
+
+    def _evict(self):
+        # Least recently used files first, a content goes once no file points at it
+        total = self._conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM contents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for (file_id,) in self._conn.execute("SELECT file_id FROM files ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            content_hash = self._conn.execute(
+                "SELECT content_hash FROM files WHERE file_id = ?", (file_id,)
+            ).fetchone()[0]
+            self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+            evicted += 1
+            still_used = self._conn.execute(
+                "SELECT 1 FROM files WHERE content_hash = ? LIMIT 1", (content_hash,)
+            ).fetchone()
+            if not still_used:
+                size = self._conn.execute(
+                    "SELECT stored_size FROM contents WHERE content_hash = ?", (content_hash,)
+                ).fetchone()[0]
+                self._conn.execute("DELETE FROM contents WHERE content_hash = ?", (content_hash,))
+                total -= size
+        log.info(f"Source store over budget, evicted {evicted} files", "🧹")
+
+    def purge(self, file_id=None):
+        """Remove one file or the whole store."""
+        with self._lock:
+            if file_id is not None:
+                deleted = self._conn.execute("DELETE FROM files WHERE file_id = ?", (int(file_id),)).rowcount
+            else:
+                deleted = self._conn.execute("DELETE FROM files").rowcount
+            self._drop_orphans()
+            self._conn.commit()
+        return deleted
+
+    def stats(self):
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            contents, size, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM contents"
+            ).fetchone()
+        return {
+            "files": files,
+            "contents": contents,
+            "size_bytes": size,
+            "stored_bytes": stored,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
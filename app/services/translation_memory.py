@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from app.utils.logger import log
+
+MEMORY_PATH = os.getenv("TRANSLATION_MEMORY_PATH", "cache/translation_memory.db")
+MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "200000"))
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different lines share one entry."""
+    return " ".join(text.split())
+
+
+class TranslationMemory:
+    """
+    Persistent translation memory backed by SQLite.
+    Entries are keyed by normalized source text, target language and model,
+    and evicted least-recently-used once MEMORY_MAX_ENTRIES is exceeded.
+    """
+
+    def __init__(self, path=MEMORY_PATH, max_entries=MEMORY_MAX_ENTRIES, model=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS memory (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                language TEXT NOT NULL,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_memory_last_used ON memory(last_used);
+            CREATE INDEX IF NOT EXISTS idx_memory_model ON memory(model);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self._conn.commit()
+
+        if model:
+            self._check_model(model)
+
+    @staticmethod
+    def _key(text, language, model):
+        raw = f"{model}\x00{language}\x00{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _check_model(self, model):
+        # Drop entries of the previous model when OLLAMA_MODEL changes
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'model'").fetchone()
+            previous = row[0] if row else None
+            if previous and previous != model:
+                deleted = self._conn.execute("DELETE FROM memory WHERE model = ?", (previous,)).rowcount
+                log.info(f"Model changed ({previous} -> {model}), invalidated {deleted} memory entries", "🧠")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('model', ?)", (model,))
+            self._conn.commit()
+
+    def lookup_many(self, texts, language, model):
+        """Return a {text: translation} dict for every text found in memory."""
+        found = {}
+        if not texts:
+            return found
+
+        keys = {}
+        for t in texts:
+            keys.setdefault(self._key(t, language, model), []).append(t)
+        now = time.time()
+        with self._lock:
+            key_list = list(keys)
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM memory WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, translation in rows:
+                    for t in keys[key]:
+                        found[t] = translation
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE memory SET last_used = ? WHERE key = ?", [(now, key) for key, _ in rows]
+                    )
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def store_many(self, pairs, language, model):
+        """Store (source, translation) pairs and evict the oldest entries if over capacity."""
+        if not pairs:
+            return
+        now = time.time()
+        rows = [
+            (self._key(source, language, model), model, language, normalize_text(source), translation, now)
+            for source, translation in pairs
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO memory (key, model, language, source, translation, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM memory WHERE key IN (SELECT key FROM memory ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def invalidate(self, model=None):
+        """Remove all entries, or only those produced by the given model."""
+        with self._lock:
+            if model:
+                deleted = self._conn.execute("DELETE FROM memory WHERE model = ?", (model,)).rowcount
+            else:
+                deleted = self._conn.execute("DELETE FROM memory").rowcount
+            self._conn.commit()
+        return deleted
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -1,268 +1,565 @@
 import re
 import os
-from ollama import AsyncClient
 import asyncio
 import time
-from app.utils.logger import log
+from app.utils.logger import log, AuditLog
+from app.services.translation_memory import TranslationMemory, normalize_text
+from app.services.checkpoints import CheckpointStore
+from app.services.scheduler import AdaptiveScheduler, estimate_tokens
+from app.services.ollama_pool import OllamaPool, is_backend_failure
+from app.services.prompts import PromptBuilder
+from app.utils.subtitles import SubtitleBlock, iter_blocks, format_srt
+from app.utils.languages import TARGET_LANGUAGE, TARGET_LANGUAGE_CODE
+from app.utils.metrics import track, observe_ollama, BATCH_VALIDATION_FAILURES, SINGLE_LINE_FALLBACKS
+
+# Bump whenever the prompts change so cached results are not reused
+PROMPT_VERSION = "2"
+
+# Batch attempts (the first one included) before falling back to one call per line
+MAX_BATCH_ATTEMPTS = 3
+
+
+class OllamaTiming:
+    """Where the time of some Ollama calls went, as reported in their responses."""
+
+    def __init__(self):
+        self.calls = 0
+        self.load_seconds = 0.0
+        self.prompt_tokens = 0
+        self.prompt_eval_seconds = 0.0
+        self.generated_tokens = 0
+        self.generation_seconds = 0.0
+
+    def add(self, response):
+        self.calls += 1
+        self.load_seconds += (response.get("load_duration") or 0) / 1e9
+        self.prompt_tokens += response.get("prompt_eval_count") or 0
+        self.prompt_eval_seconds += (response.get("prompt_eval_duration") or 0) / 1e9
+        self.generated_tokens += response.get("eval_count") or 0
+        self.generation_seconds += (response.get("eval_duration") or 0) / 1e9
+
+    def merge(self, other):
+        for name, value in vars(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self):
+        return {name: round(value, 3) if isinstance(value, float) else value for name, value in vars(self).items()}
+
+    def __str__(self):
+        text = (
+            f"prompt eval {self.prompt_eval_seconds:.2f}s for {self.prompt_tokens} tokens, "
+            f"generation {self.generation_seconds:.2f}s for {self.generated_tokens} tokens"
+        )
+        if self.load_seconds >= 0.01:
+            text += f", model load {self.load_seconds:.2f}s"
+        return text
+
+
+class TranslationStats:
+    """LLM usage of one translate_srt run."""
+
+    def __init__(self):
+        self.blocks = 0
+        # Blocks restored from the checkpoint of an earlier, unfinished run
+        self.resumed = 0
+        self.memory_hits = 0
+        self.batch_calls = 0
+        self.retry_calls = 0
+        self.single_calls = 0
+        self.retried_items = 0
+        # Blocks that reused the translation of an identical text in the same run
+        self.deduplicated = 0
+        # Blocks left untranslated because their Ollama calls failed
+        self.failed = 0
+        # Blocks kept in the source language because the model refused them or its answer was unreadable
+        self.kept_source = 0
+        self.timing = OllamaTiming()
+
+    @property
+    def dedup_ratio(self):
+        # Share of the blocks missing from translation memory that needed no LLM call of their own
+        pending = self.blocks - self.resumed - self.memory_hits
+        return self.deduplicated / pending if pending else 0.0
+
+    @property
+    def llm_calls(self):
+        return self.batch_calls + self.retry_calls + self.single_calls
+
+    def to_dict(self):
+        return {
+            "blocks": self.blocks,
+            "resumed": self.resumed,
+            "memory_hits": self.memory_hits,
+            "deduplicated": self.deduplicated,
+            "llm_calls": self.llm_calls,
+            "batch_calls": self.batch_calls,
+            "retry_calls": self.retry_calls,
+            "single_calls": self.single_calls,
+            "retried_items": self.retried_items,
+            "failed": self.failed,
+            "kept_source": self.kept_source,
+            "llm_calls_per_block": round(self.llm_calls / self.blocks, 3) if self.blocks else 0.0,
+            "dedup_ratio": round(self.dedup_ratio, 3),
+            "ollama": self.timing.to_dict(),
+        }
+
+
+class IncompleteTranslationError(Exception):
+    pass
+
+
+class ReorderBuffer:
+    """
+    Releases translated blocks in index order.
+    Blocks of batches that finish early are held until every block before them is done.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.cursor = 0
+
+    def release(self):
+        start = self.cursor
+        while self.cursor < len(self.blocks) and self.blocks[self.cursor].translated is not None:
+            self.cursor += 1
+        return self.blocks[start:self.cursor]
+
+
+class TextDedup:
+    """
+    Identical source texts of one run, which may span several files (a season pack).
+    The first translation that needs a text claims it and every other one waits
+    for its result instead of sending the text to the LLM again.
+    """
+
+    def __init__(self):
+        self._results = {}
+
+    def claim(self, key):
+        """Return None when the caller now owns key, otherwise the future of its translation."""
+        future = self._results.get(key)
+        if future is not None:
+            return future
+        self._results[key] = asyncio.get_running_loop().create_future()
+        return None
+
+    def resolve(self, key, translation):
+        future = self._results.get(key)
+        if future is not None and not future.done():
+            future.set_result(translation)
+        if translation is None:
+            # The owner failed: waiting files get None and the next file claims the text again
+            self._results.pop(key, None)
+
 
 class TranslatorService:
     def __init__(self):
-        # Get target language from environment
-        self.target_language = os.getenv("TARGET_LANGUAGE", "Spanish")
-        self.target_language_code = os.getenv("TARGET_LANGUAGE_CODE", "spa")
+        # Default target language, requests can ask for others
+        self.target_language = TARGET_LANGUAGE
+        self.target_language_code = TARGET_LANGUAGE_CODE
         
         # Configure Ollama
         self.model_ollama = os.getenv("OLLAMA_MODEL", "llama3.2:latest")
-        self.client = AsyncClient()
-        log.ai(f"Using Local Ollama ({self.model_ollama})")
+        self.num_ctx = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+        self.pool = OllamaPool(self.model_ollama)
+        # Same system prompt, options and keep_alive for every call of a title
+        self.prompts = PromptBuilder(self.model_ollama, self.target_language, self.num_ctx)
+        self._prompts = {self.target_language: self.prompts}
+        log.ai(
+            f"Using Ollama ({self.model_ollama}) on {len(self.pool.backends)} backend(s), "
+            f"keep_alive={self.prompts.keep_alive}"
+        )
         log.translate(f"Target language: {self.target_language} ({self.target_language_code})")
 
-    async def _translate_batch(self, texts, title=None):
-        # STRATEGY: Numbered list (More robust than JSON for small models like Llama 3 3B)
-        
-        # 1. Build numbered input
-        input_formatted = ""
-        for i, text in enumerate(texts):
-            input_formatted += f"ITEM_{i}: {text}\n"
-
-        context_instruction = f"Context: Subtitles for '{title}'." if title else "Context: Subtitles."
-
-        system_prompt = (
-            f"You are a professional subtitle translator. Your TASK is to translate the provided text list from ENGLISH to {self.target_language.upper()}.\n"
-            f"{context_instruction}\n"
-            "RULES:\n"
-            f"1. You MUST translate every item to {self.target_language}. Do not leave English text.\n"
-            "2. Keep the exact format 'ITEM_N: [Translation]'.\n"
-            "3. Preserve tags: [BR], <i>, <b>, ♫.\n"
-            "4. Example:\n"
-            "   Input:\n"
-            "     ITEM_0: Hello friend\n"
-            "     ITEM_1: How are you?\n"
-            "   Output:\n"
-            "     ITEM_0: [Translation in target language ({{self.target_language}})]\n"
-            "     ITEM_1: [Translation in target language ({{self.target_language}})]\n"
-        )
-        
-        user_prompt = (
-            f"Translate this list to {self.target_language}:\n\n"
-            f"{input_formatted}"
+        # Translation memory shared across files (invalidated when the model changes)
+        self.memory = TranslationMemory(model=self.model_ollama)
+        # Translated blocks of every unfinished file, so interrupted jobs resume where they stopped
+        self.checkpoints = CheckpointStore()
+
+        # Batch size and concurrency learned per model, shared by every translation
+        self.scheduler = AdaptiveScheduler(
+            self.model_ollama, num_ctx=self.num_ctx, max_concurrency=self.pool.capacity
         )
-        
-        try:
-             # We use format='' (plain text) because JSON fails a lot on small models
-             response = await self.client.chat(
-                model=self.model_ollama, 
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ],
-                options={'temperature': 0.1, 'num_ctx': 4096} # Increase context window if possible
-             )
-             content = response['message']['content'].strip()
-             
-             # Parse output
-             translated_map = {}
-             lines = content.split('\n')
-             for line in lines:
-                 match = re.match(r'ITEM_(\d+):\s*(.*)', line)
-                 if match:
-                     idx = int(match.group(1))
-                     text = match.group(2).strip()
-                     translated_map[idx] = text
-            
-             # Reconstruct ordered list
-             result_list = []
-             for i in range(len(texts)):
-                 # If a line is missing, use original as fallback instead of failing the whole batch
-                 result_list.append(translated_map.get(i, texts[i]))
-                 
-             return result_list
 
-        except Exception as e:
-             log.error(f"Ollama batch error: {e}")
-             return None
+    def prompts_for(self, language):
+        """PromptBuilder of a target language, with the same options as every other language."""
+        if language not in self._prompts:
+            self._prompts[language] = PromptBuilder(self.model_ollama, language, self.num_ctx)
+        return self._prompts[language]
 
-    async def _translate_single(self, text, title=None):
-        context_instruction = f"Context: Subtitles for '{title}'." if title else ""
-        
-        system_prompt = (
-            f"You are a professional translator. Translate the text from ENGLISH to {self.target_language.upper()}.\n"
-            "Output ONLY the translation, nothing else."
-        )
-        
-        user_prompt = (
-            f"{context_instruction}\n"
-            f"Translate this text to {self.target_language}:\n"
-            f"{text}"
-        )
-        
+    async def _translate_batch(self, texts, title=None, timing=None, prompts=None):
+        # STRATEGY: Numbered list (More robust than JSON for small models like Llama 3 3B)
+        prompts = prompts or self.prompts
         try:
-            response = await self.client.chat(
-                model=self.model_ollama, 
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ]
-            )
-            return response['message']['content'].strip()
-        except:
-            return text 
-
-    def _parse_srt(self, content):
-        # Normalize line breaks
-        content = content.replace('\r\n', '\n').replace('\r', '\n')
-        lines = [l.strip() for l in content.split('\n')]
-        
-        blocks = []
-        current_block = None
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            
-            # Robust heuristic: If we find a single number on a line...
-            # AND the NEXT line contains '-->', then it is a block header.
-            # Handle potential BOM or whitespace issues in 'line'
-            clean_line = line.strip().replace('\ufeff', '')
-            
-            is_header = False
-            if clean_line.isdigit() and (i + 1 < len(lines)):
-                if '-->' in lines[i+1]:
-                    is_header = True
-            
-            if is_header:
-                # If a block was open, close and save it
-                if current_block:
-                    # Parse text list to string
-                    current_block['original_text'] = "\n".join(current_block['text_lines'])
-                    del current_block['text_lines'] # Clean up
-                    blocks.append(current_block)
-                
-                # Start new block
-                current_block = {
-                    'index': clean_line,
-                    'time': lines[i+1],
-                    'text_lines': []
-                }
-                i += 2 # Skip index and timestamp lines
-                continue
-            
-            # If inside a block, accumulate text
-            if current_block is not None:
-                # If line is not empty, it is text.
-                # Ignore empty lines inside block to avoid noise.
-                if line:
-                    current_block['text_lines'].append(line)
-            
-            i += 1
-            
-        # Add the last pending block
-        if current_block:
-            current_block['original_text'] = "\n".join(current_block['text_lines'])
-            if 'text_lines' in current_block: del current_block['text_lines']
-            blocks.append(current_block)
-            
-        return blocks
-
-    def _reconstruct_srt(self, blocks):
-        output = []
-        for b in blocks:
-            text = b.get('translated_text', b['original_text'])
-            output.append(f"{b['index']}\n{b['time']}\n{text}")
-        return "\n\n".join(output)
+            # We use format='' (plain text) because JSON fails a lot on small models
+            with track("ollama_batch"):
+                response = await self.pool.chat(**prompts.request(texts, title))
+            observe_ollama(response)
+            if timing is not None:
+                timing.add(response)
+            # Missing items are None so only those get retried
+            return prompts.parse(response['message']['content'], len(texts))
+        except Exception as e:
+            log.error(f"Ollama batch error: {e}")
+            return None
 
-    async def translate_srt(self, srt_content, title=None):
-        # Check Ollama availability
+    async def _translate_single(self, text, title=None, timing=None, prompts=None):
+        # A batch of one: same prompt prefix and options as the batches
+        prompts = prompts or self.prompts
         try:
-            await self.client.show(self.model_ollama)
+            with track("ollama_single"):
+                response = await self.pool.chat(**prompts.request([text], title))
+            observe_ollama(response)
+            if timing is not None:
+                timing.add(response)
+            return prompts.parse(response['message']['content'], 1)[0] or text
         except Exception as e:
-            log.error(f"Error connecting to Ollama ({self.model_ollama}). Ensure Ollama is running.")
-            raise e
+            log.error(f"Ollama single-line error: {e}")
+            if is_backend_failure(e):
+                # None tells Ollama being unavailable apart from a line the model left as it was
+                return None
+            # Refused or unreadable: retrying later would fail the same way
+            raise
 
-        blocks = self._parse_srt(srt_content)
-        log.info(f"Parsed {len(blocks)} subtitle blocks", "🧩")
-        
-        # Setup Log File in logs/ folder
-        os.makedirs("logs", exist_ok=True)
+    def open_log(self, title=None):
+        """Start a translation log in logs/, written in the background. Close it with aclose()."""
         safe_title = re.sub(r'[^\w\s-]', '', title).strip().replace(' ', '_') if title else "subtitle"
         log_filename = f"logs/translation_{safe_title}_{int(time.time())}.log"
         log.file(f"Live logging to: {log_filename}")
+
+        audit = AuditLog(log_filename)
+        audit.write(f"Subtitle Translation Log\nTitle: {title}\nDate: {time.ctime()}\n")
+        audit.write("="*50 + "\n\n")
+        return audit
+
+    async def translate_srt(self, srt_content, title=None, on_progress=None, on_blocks=None, stats=None,
+                            audit=None, log_label=None, dedup=None, language=None, source_blocks=None):
+        """
+        Translate an SRT file. If given, on_progress(done, total) is called
+        every time a batch finishes and on_blocks(blocks) receives the
+        translated blocks as soon as they can be emitted in index order.
+        A TranslationStats passed as stats is filled with the LLM usage of the run.
+        Several translations can share one log by passing the AuditLog from open_log()
+        and a log_label that tells their entries apart, and share the translation
+        of repeated lines by passing the same TextDedup.
+        Every finished batch is checkpointed: a later run of the same file,
+        language and model only translates the blocks still missing. When
+        Ollama calls fail for good the checkpoint is kept and
+        IncompleteTranslationError is raised instead of returning source lines.
+        language is the target language name (TARGET_LANGUAGE by default). A file
+        translated to several languages can be parsed once and its blocks passed
+        as source_blocks to every translation, each one works on its own copy.
+        """
+        language = language or self.target_language
+        prompts = self.prompts_for(language)
+        stats = stats if stats is not None else TranslationStats()
+        # Check Ollama availability (answered from the pool's background health monitor)
+        try:
+            await self.pool.ensure_available()
+        except Exception as e:
+            log.error(f"Error connecting to Ollama ({self.model_ollama}). Ensure Ollama is running.")
+            raise e
+
+        if source_blocks is None:
+            blocks = list(iter_blocks(srt_content))
+            log.info(f"Parsed {len(blocks)} subtitle blocks", "🧩")
+        else:
+            blocks = [SubtitleBlock(b.index, b.start_ms, b.end_ms, b.text, timing=b.timing) for b in source_blocks]
+        # Checkpoints address blocks by position, SRT numbers may repeat or skip
+        position = {id(b): n for n, b in enumerate(blocks)}
+
+        # Restore what an interrupted run of this file already translated
+        checkpoint = CheckpointStore.make_key(srt_content, language, self.model_ollama, PROMPT_VERSION)
+        saved = await asyncio.to_thread(
+            self.checkpoints.open, checkpoint, len(blocks), language, self.model_ollama,
+            title=title, label=log_label,
+        )
+        for n, translated in saved.items():
+            if n < len(blocks):
+                blocks[n].translated = translated
+        stats.resumed = len(saved)
+        if saved:
+            log.info(f"Resuming from checkpoint: {len(saved)}/{len(blocks)} blocks already translated", "♻️")
+
+        # Look up translation memory before batching, only misses go to the LLM
+        sources = list({b.text.replace('\n', ' [BR] ') for b in blocks if b.text and b.translated is None})
+        remembered = await asyncio.to_thread(
+            self.memory.lookup_many, sources, language, self.model_ollama
+        )
+        pending_blocks = []
+        for b in blocks:
+            safe_text = b.text.replace('\n', ' [BR] ')
+            if b.translated is not None:
+                continue
+            if not safe_text:
+                # Nothing to translate in empty cues
+                b.translated = ""
+            elif safe_text in remembered:
+                b.translated = remembered[safe_text]
+            else:
+                pending_blocks.append(b)
+        stats.blocks = len(blocks)
+        stats.memory_hits = len(blocks) - stats.resumed - len(pending_blocks)
+        log.info(f"Translation memory: {stats.memory_hits}/{len(blocks)} blocks reused", "🧠")
+
+        # Group identical texts so each one is translated once, here or by another file of the run
+        dedup = dedup if dedup is not None else TextDedup()
+        dedup_key = lambda text: normalize_text(text.replace('\n', ' [BR] '))
+        groups = {}
+        for b in pending_blocks:
+            groups.setdefault(dedup_key(b.text), []).append(b)
+        owned = {}
+        borrowed = {}
+        # Every key claimed from here on is resolved in the finally below, whatever fails
+        try:
+            for key, group in groups.items():
+                # Namespaced by language, a shared TextDedup may serve several of them
+                future = dedup.claim((language, key))
+                if future is None:
+                    owned[key] = group
+                else:
+                    borrowed[key] = (future, group)
+            unique_blocks = [group[0] for group in owned.values()]
+            stats.deduplicated = len(pending_blocks) - len(unique_blocks)
+            log.info(
+                f"Dedup: {len(unique_blocks)} unique texts to translate for {len(pending_blocks)} blocks "
+                f"({len(borrowed)} shared with other files, {stats.dedup_ratio:.0%} saved)", "🧬"
+            )
         
-        with open(log_filename, "w", encoding="utf-8") as f:
-            f.write(f"Subtitle Translation Log\nTitle: {title}\nDate: {time.ctime()}\n")
-            f.write("="*50 + "\n\n")
-
-        # Group by item count
-        # Reduce batch size for small models (Llama 3.2 3B)
-        # Batch of 10 is a good speed/stability balance 
-        BATCH_SIZE = 10
-        
-        batches = [blocks[i:i + BATCH_SIZE] for i in range(0, len(blocks), BATCH_SIZE)]
+            # Setup Log File in logs/ folder, unless the caller shares one across files
+            own_audit = audit is None
+            if own_audit:
+                audit = self.open_log(title)
+            log_suffix = f" ({log_label})" if log_label else ""
+
+            # Group by token budget, the scheduler shrinks it for models that fail on large batches
+            batches = self.scheduler.make_batches(unique_blocks, lambda b: b.text)
 
-        log.batch(f"Created {len(batches)} batches for translation via Ollama ({self.model_ollama})")
+            log.batch(f"Created {len(batches)} batches for translation via Ollama ({self.model_ollama})")
         
-        total_batches = len(batches)
+            total_batches = len(batches)
+            completed = 0
+            if on_progress:
+                on_progress(0, total_batches)
+
+            reorder = ReorderBuffer(blocks)
+
+            def emit_ready():
+                if on_blocks:
+                    ready = reorder.release()
+                    if ready:
+                        on_blocks(ready)
+
+            # Texts whose Ollama calls failed, their blocks stay untranslated (and unsaved) for the retry pass
+            failed_keys = set()
+
+            def fan_out(rep):
+                # Copy the translation to the repeats of the text and to other files waiting for it
+                key = dedup_key(rep.text)
+                for other in owned[key][1:]:
+                    other.translated = rep.translated
+                if rep.translated is not None:
+                    dedup.resolve((language, key), rep.translated)
+
+            # Blocks served from translation memory may already be ready
+            emit_ready()
         
-        log.process(f"Starting translation with 4 concurrent workers", "🚀")
-        semaphore = asyncio.Semaphore(4)
+            log.process(f"Starting translation with up to {self.scheduler.profile.concurrency} concurrent batches", "🚀")
 
-        async def process_batch(i, batch):
-            async with semaphore:
-                log.batch(f"Processing {len(batch)} items", i+1, total_batches)
-                start_time = time.time()
+            async def process_batch(i, batch):
+                nonlocal completed
+                async with self.scheduler.limiter:
+                    log.batch(f"Processing {len(batch)} items", i+1, total_batches)
+                    start_time = time.time()
+                    timing = OllamaTiming()
                 
-                try:
-                    # Prepare text list
-                    texts_to_translate = [b['original_text'].replace('\n', ' [BR] ') for b in batch]
-                    
-                    # Try batch
-                    translated_list = await self._translate_batch(texts_to_translate, title=title)
-                    
-                    batch_success = False
-                    if translated_list and len(translated_list) == len(batch):
-                        batch_success = True
-                        for j, res in enumerate(translated_list):
-                            clean_res = re.sub(r'\s*\[br\]\s*', '\n', res, flags=re.IGNORECASE).strip()
-                            if clean_res:
-                                batch[j]['translated_text'] = clean_res
+                    try:
+                        # Prepare text list
+                        texts_to_translate = [b.text.replace('\n', ' [BR] ') for b in batch]
+                        learned = []
+
+                        # Try batch, then re-send only the items that came back missing or empty
+                        pending = list(range(len(batch)))
+                        attempt = 0
+                        errors = 0
+                        while pending and attempt < MAX_BATCH_ATTEMPTS:
+                            texts = [texts_to_translate[j] for j in pending]
+                            translated_list = await self._translate_batch(texts, title=title, timing=timing, prompts=prompts)
+                            errors += translated_list is None
+                            if attempt == 0:
+                                stats.batch_calls += 1
                             else:
-                                batch_success = False
-                                break
+                                stats.retry_calls += 1
+                                stats.retried_items += len(pending)
+
+                            invalid = []
+                            for k, j in enumerate(pending):
+                                res = translated_list[k] if translated_list else None
+                                clean_res = re.sub(r'\s*\[br\]\s*', '\n', res, flags=re.IGNORECASE).strip() if res else ""
+                                if clean_res:
+                                    batch[j].translated = clean_res
+                                    # A line the model echoed is kept as is, but not remembered
+                                    if res != texts_to_translate[j]:
+                                        learned.append((texts_to_translate[j], clean_res))
+                                else:
+                                    invalid.append(j)
+
+                            # Only answers teach the scheduler about the model, a failed call (Ollama down,
+                            # timeout) says nothing about how well it handles this batch size
+                            if attempt == 0 and translated_list is not None:
+                                await self.scheduler.record(
+                                    time.time() - start_time,
+                                    sum(estimate_tokens(t) for t in texts_to_translate),
+                                    failed=bool(invalid),
+                                )
+                            if invalid and translated_list is None:
+                                log.warning(f"[Batch {i+1}] Ollama call failed for {len(invalid)} items. Retrying")
+                            elif invalid:
+                                BATCH_VALIDATION_FAILURES.inc(len(invalid))
+                                log.warning(f"[Batch {i+1}] Validation failed for {len(invalid)}/{len(pending)} items. Retrying only those")
+                            pending = invalid
+                            attempt += 1
                     
-                    if not batch_success:
-                        log.warning(f"[Batch {i+1}] Validation failed. Retrying items individually")
-                        for block in batch:
-                            safe_text = block['original_text'].replace('\n', ' [BR] ')
-                            try:
-                                await asyncio.sleep(0.2) 
-                                res = await self._translate_single(safe_text, title=title)
-                                block['translated_text'] = re.sub(r'\s*\[br\]\s*', '\n', res, flags=re.IGNORECASE).strip()
-                            except Exception as e_single:
-                                block['translated_text'] = block['original_text']
+                        if pending and errors == attempt and not any(b.healthy for b in self.pool.backends):
+                            # Every call failed and no backend is up (Ollama down or restarting), single calls would too
+                            log.warning(f"[Batch {i+1}] Ollama unavailable, {len(pending)} items left for a later run")
+                            failed_keys.update(dedup_key(batch[j].text) for j in pending)
+                            pending = []
+
+                        if pending:
+                            # Last resort: one call per remaining line
+                            log.warning(f"[Batch {i+1}] Retrying {len(pending)} items individually")
+                            for j in pending:
+                                block = batch[j]
+                                safe_text = texts_to_translate[j]
+                                try:
+                                    res = await self._translate_single(safe_text, title=title, timing=timing, prompts=prompts)
+                                    stats.single_calls += 1
+                                    SINGLE_LINE_FALLBACKS.inc()
+                                    if res is None:
+                                        failed_keys.add(dedup_key(block.text))
+                                        continue
+                                    block.translated = re.sub(r'\s*\[br\]\s*', '\n', res, flags=re.IGNORECASE).strip()
+                                    # A line the model echoed is kept as is, but not remembered
+                                    if res != safe_text and block.translated:
+                                        learned.append((safe_text, block.translated))
+                                    else:
+                                        block.translated = block.translated or block.text
+                                except Exception as e_single:
+                                    block.translated = block.text
+                                    stats.kept_source += 1
+
+                        await asyncio.to_thread(
+                            self.memory.store_many, learned, language, self.model_ollama
+                        )
+                        await asyncio.to_thread(self.checkpoints.save, checkpoint, [
+                            (position[id(b)], rep.translated)
+                            for rep in batch if rep.translated is not None
+                            for b in owned[dedup_key(rep.text)]
+                        ])
                     
-                    elapsed = time.time() - start_time
-                    log.success(f"[Batch {i+1}] Finished in {elapsed:.1f}s")
+                        elapsed = time.time() - start_time
+                        log.success(f"[Batch {i+1}] Finished in {elapsed:.1f}s ({timing})")
                     
-                    # LOGGING
-                    try:
-                        with open(log_filename, "a", encoding="utf-8") as f:
-                            log_chunk = f"\n--- Batch {i+1} ---\n"
-                            for b in batch:
-                                t_text = b.get('translated_text', 'N/A')
-                                log_chunk += f"[{b['index']}] {b['time']} => {t_text}\n"
-                            f.write(log_chunk)
-                    except Exception as log_err:
-                        log.warning(f"Log write error: {log_err}")
+                        # LOGGING
+                        log_chunk = f"\n--- Batch {i+1}{log_suffix} ---\nOllama: {timing}\n"
+                        for rep in batch:
+                            t_text = rep.translated if rep.translated is not None else 'N/A'
+                            for b in owned[dedup_key(rep.text)]:
+                                log_chunk += f"[{b.index}] {b.time} => {t_text}\n"
+                        audit.write(log_chunk)
 
+                    except Exception as e:
+                        log.error(f"[Batch {i+1}] Error: {e}")
+                        for block in batch:
+                            if block.translated is None:
+                                if is_backend_failure(e):
+                                    failed_keys.add(dedup_key(block.text))
+                                else:
+                                    block.translated = block.text
+                                    stats.kept_source += 1
+
+                    stats.timing.merge(timing)
+                    for rep in batch:
+                        fan_out(rep)
+
+                    completed += 1
+                    if on_progress:
+                        on_progress(completed, total_batches)
+                    emit_ready()
+
+            async def wait_borrowed(future, group):
+                # Translated by another file of the same run (None if it could not be)
+                translation = await future
+                if translation is None:
+                    return
+                await asyncio.to_thread(self.checkpoints.save, checkpoint, [(position[id(b)], translation) for b in group])
+                for b in group:
+                    b.translated = translation
+                emit_ready()
+
+            # Run tasks concurrently
+            tasks = [process_batch(i, batch) for i, batch in enumerate(batches)]
+            tasks += [wait_borrowed(future, group) for future, group in borrowed.values()]
+            # Use return_exceptions=True to ensure one crash doesn't stop others
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            if failed_keys:
+                # One more pass for the texts whose Ollama calls failed, once a backend answers again
+                try:
+                    await self.pool.ensure_available()
                 except Exception as e:
-                    log.error(f"[Batch {i+1}] Error: {e}")
-                    for block in batch:
-                        if 'translated_text' not in block:
-                             block['translated_text'] = block['original_text']
+                    log.warning(f"Ollama still unavailable, {len(failed_keys)} texts left for a later run ({e})")
+                else:
+                    retry = [owned[key][0] for key in failed_keys]
+                    failed_keys.clear()
+                    retry_batches = self.scheduler.make_batches(retry, lambda b: b.text)
+                    log.process(f"Retrying {len(retry)} texts whose Ollama calls failed", "🔁")
+                    first = total_batches
+                    total_batches += len(retry_batches)
+                    await asyncio.gather(
+                        *(process_batch(first + i, batch) for i, batch in enumerate(retry_batches)),
+                        return_exceptions=True,
+                    )
+        finally:
+            # Never leave other files waiting on a text this one claimed (None lets them know it failed)
+            for key, group in owned.items():
+                dedup.resolve((language, key), group[0].translated)
+        await asyncio.to_thread(self.scheduler.save)
+
+        # Still missing: Ollama failed for good, their blocks keep the source text
+        missing = [b for b in blocks if b.translated is None]
+        stats.failed = len(missing)
+        for b in missing:
+            b.translated = b.text
+
+        if borrowed:
+            log_chunk = f"\n--- Shared with other files{log_suffix} ---\n"
+            for _, group in borrowed.values():
+                for b in group:
+                    log_chunk += f"[{b.index}] {b.time} => {b.translated}\n"
+            audit.write(log_chunk)
 
-        # Run tasks concurrently
-        tasks = [process_batch(i, batch) for i, batch in enumerate(batches)]
-        # Use return_exceptions=True to ensure one crash doesn't stop others
-        await asyncio.gather(*tasks, return_exceptions=True)
+        memory_stats = self.memory.stats()
+        log.info(f"Translation memory: {memory_stats['hits']} hits / {memory_stats['misses']} misses ({memory_stats['entries']} entries)", "🧠")
 
-        return self._reconstruct_srt(blocks)
+        run_stats = stats.to_dict()
+        log.ai(
+            f"LLM calls: {run_stats['llm_calls']} for {run_stats['blocks']} blocks "
+            f"({run_stats['llm_calls_per_block']} per block, {stats.retry_calls} retries, {stats.single_calls} single-line)"
+        )
+        log.ai(f"Ollama time: {stats.timing}")
+        audit.write(f"\n--- Stats{log_suffix} ---\n{run_stats}\n")
+        if own_audit:
+            await audit.aclose()
+
+        if stats.kept_source:
+            log.warning(f"{stats.kept_source}/{len(blocks)} blocks kept in the source language, the model could not translate them")
+        if stats.failed:
+            log.warning(f"{stats.failed}/{len(blocks)} blocks could not be translated, checkpoint kept to resume later")
+            raise IncompleteTranslationError(
+                f"{stats.failed} of {len(blocks)} blocks could not be translated (Ollama unavailable), "
+                f"retry the job to resume from its checkpoint"
+            )
+        await asyncio.to_thread(self.checkpoints.complete, checkpoint)
+        return format_srt(blocks)
@@ -1,127 +1,421 @@
 import os
+import json
 import time
-from playwright.async_api import async_playwright
+import uuid
+import asyncio
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from app.utils.logger import log
+from app.utils.metrics import STAGE_SECONDS, UPLOADS
+from app.utils.languages import TARGET_LANGUAGE_CODE
 
 STREMIO_EMAIL = os.getenv("STREMIO_EMAIL")
 STREMIO_PASSWORD = os.getenv("STREMIO_PASSWORD")
+STREMIO_BASE_URL = os.getenv("STREMIO_BASE_URL", "https://stremio-community-subtitles.top").rstrip("/")
+
+# Browser contexts kept logged in, i.e. how many uploads run at the same time
+UPLOAD_CONTEXTS = int(os.getenv("UPLOAD_CONTEXTS", "2"))
+# Uploads waiting for a context, further callers wait for room in the queue
+UPLOAD_QUEUE_MAX = int(os.getenv("UPLOAD_QUEUE_MAX", "20"))
+# Cookies and local storage of the logged in session, reused across restarts
+STREMIO_SESSION_PATH = os.getenv("STREMIO_SESSION_PATH", "cache/stremio_session.json")
+# Seconds to wait for the form POST response and then for the outcome on the resulting page
+UPLOAD_CONFIRM_TIMEOUT = float(os.getenv("UPLOAD_CONFIRM_TIMEOUT", "15"))
+UPLOAD_OUTCOME_TIMEOUT = float(os.getenv("UPLOAD_OUTCOME_TIMEOUT", "5"))
+# Seconds a caller waits for its upload, time in the queue included
+UPLOAD_WAIT_TIMEOUT = float(os.getenv("UPLOAD_WAIT_TIMEOUT", "600"))
+# Longest pause between restarts of a crashed upload worker
+UPLOAD_RESTART_MAX_DELAY = 60
+
+# Flash messages shown by the site after submitting the form
+SUCCESS_SELECTOR = '.alert-success, .flash-success, .notification.is-success'
+ERROR_SELECTOR = '.alert-danger, .alert-error, .flash-error, .notification.is-danger, .invalid-feedback'
+
+
+def is_form_response(response, action):
+    """True for the response to the POST of a form to action (query string and fragment ignored)."""
+    return response.request.method == "POST" and urlsplit(response.url)[:3] == urlsplit(action)[:3]
+
+
+class UploadResult:
+    """Outcome of one upload. Truthy when the subtitle was accepted."""
+
+    # Reason codes
+    UPLOADED = "uploaded"
+    REJECTED = "rejected"
+    SERVER_ERROR = "server_error"
+    TIMEOUT = "timeout"
+    SESSION_EXPIRED = "session_expired"
+    LOGIN_FAILED = "login_failed"
+    MISSING_CREDENTIALS = "missing_credentials"
+    UNCONFIRMED = "unconfirmed"
+    ERROR = "error"
+
+    def __init__(self, ok, reason, status=None, detail=None, elapsed=None):
+        self.ok = ok
+        self.reason = reason
+        self.status = status
+        self.detail = detail
+        self.elapsed = elapsed
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f"UploadResult(ok={self.ok}, reason={self.reason!r}, status={self.status})"
+
+    def to_dict(self):
+        return {
+            "ok": self.ok,
+            "reason": self.reason,
+            "status": self.status,
+            "detail": self.detail,
+            "elapsed": round(self.elapsed, 2) if self.elapsed is not None else None,
+        }
 
 class StremioUploader:
-    async def upload_subtitle(self, file_path, imdb_id, content_type="movie", season=None, episode=None):
+    """
+    Uploads subtitles with one long-lived Chromium.
+    A small pool of browser contexts keeps the login session and uploads are
+    served from a bounded queue, so a burst of translations never spawns more
+    than UPLOAD_CONTEXTS pages. Workers that die are restarted (relaunching the
+    browser if it went away) and callers never wait longer than UPLOAD_WAIT_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._queue = None
+        self._workers = []
+        self._start_lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._start_lock:
+            await self._ensure_browser()
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_MAX)
+            if not self._workers:
+                self._workers = [asyncio.create_task(self._supervise(n)) for n in range(UPLOAD_CONTEXTS)]
+                log.web(f"Upload browser started with {UPLOAD_CONTEXTS} contexts")
+
+    async def _ensure_browser(self):
+        # Called with _start_lock held: (re)launch Chromium unless it is up
+        if self._browser is not None and self._browser.is_connected():
+            return
+        if self._browser is not None:
+            log.warning("Upload browser disconnected, relaunching it")
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True) # Headless by default
+
+    @property
+    def running(self):
+        return self._browser is not None and self._browser.is_connected()
+
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue else 0
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._fail_pending("uploader closed")
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def upload_subtitle(self, file_path, imdb_id, content_type="movie", season=None, episode=None,
+                              language=TARGET_LANGUAGE_CODE):
         if not STREMIO_EMAIL or not STREMIO_PASSWORD:
             log.error("STREMIO_EMAIL or STREMIO_PASSWORD configuration missing")
-            return False
+            return UploadResult(False, UploadResult.MISSING_CREDENTIALS)
 
-        log.upload(f"Starting upload for {imdb_id} (Type: {content_type}, S:{season} E:{episode})")
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True) # Headless by default
-            context = await browser.new_context()
-            page = await context.new_page()
+        start_time = time.time()
+        try:
+            await self.start()
+        except Exception as e:
+            log.error(f"Upload browser could not be started: {e}")
+            return UploadResult(False, UploadResult.ERROR, detail=str(e))
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(
+                self._queue.put(((file_path, imdb_id, content_type, season, episode, language), future)),
+                UPLOAD_WAIT_TIMEOUT,
+            )
+            log.upload(f"Upload for {imdb_id} ({language}) queued ({self._queue.qsize()} waiting)")
+            # The worker skips the upload if we stop waiting before it starts
+            return await asyncio.wait_for(future, max(0.0, UPLOAD_WAIT_TIMEOUT - (time.time() - start_time)))
+        except asyncio.TimeoutError:
+            log.warning(f"Upload for {imdb_id} ({language}) timed out after {UPLOAD_WAIT_TIMEOUT:.0f}s")
+            UPLOADS.labels(UploadResult.TIMEOUT).inc()
+            return UploadResult(False, UploadResult.TIMEOUT, detail="no upload worker answered in time",
+                                elapsed=time.time() - start_time)
 
+    async def _new_context(self):
+        if os.path.exists(STREMIO_SESSION_PATH):
+            try:
+                with open(STREMIO_SESSION_PATH, encoding="utf-8") as f:
+                    json.load(f)
+            except (OSError, ValueError) as e:
+                # A broken session file would fail every context, log in again instead
+                log.warning(f"Ignoring unreadable session file {STREMIO_SESSION_PATH}: {e}")
+                try:
+                    os.remove(STREMIO_SESSION_PATH)
+                except OSError:
+                    pass
+            else:
+                return await self._browser.new_context(storage_state=STREMIO_SESSION_PATH)
+        return await self._browser.new_context()
+
+    @staticmethod
+    async def _close_context(context):
+        if context is None:
+            return
+        try:
+            await context.close()
+        except Exception:
+            # Already gone with its browser
+            pass
+
+    def _fail_pending(self, detail):
+        """Answer every queued upload with an error, e.g. when the browser cannot be relaunched."""
+        failed = 0
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_result(UploadResult(False, UploadResult.ERROR, detail=detail))
+                failed += 1
+        if failed:
+            log.error(f"Failed {failed} queued uploads: {detail}")
+
+    async def _supervise(self, n):
+        """Run worker n, restarting it (and the browser when it went away) every time it dies."""
+        delay = 1
+        while True:
+            started = time.time()
+            try:
+                await self._worker(n)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Upload worker {n} died: {e}")
+            if time.time() - started > UPLOAD_RESTART_MAX_DELAY:
+                # It worked for a while, this is not a crash loop
+                delay = 1
+            log.info(f"Restarting upload worker {n} in {delay}s", "♻️")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, UPLOAD_RESTART_MAX_DELAY)
             try:
-                # 1. Login
-                log.auth("Logging in")
-                await page.goto("https://stremio-community-subtitles.top/login")
-                
-                # Try filling login form
-                await page.fill('input[name="email"], input[type="email"]', STREMIO_EMAIL)
-                await page.fill('input[name="password"], input[type="password"]', STREMIO_PASSWORD)
-                
-                # Click submit button (search by type or text)
-                await page.click('button[type="submit"], input[type="submit"], button:has-text("Sign In"), button:has-text("Login")')
-                
-                # Wait for navigation using networkidle (more reliable than exact url)
-                # This waits for no network traffic for 500ms, indicating page loaded
-                await page.wait_for_load_state("networkidle")
-                
-                if "/login" in page.url:
-                    log.warning("URL still contains '/login'. Check credentials")
-                
-                log.success(f"Login completed (Current URL: {page.url})")
-
-                # 2. Go to Upload
-                log.web("Navigating to upload page")
-                await page.goto("https://stremio-community-subtitles.top/content/upload")
-                
-                # 3. Fill upload form
-                # Note: This is tentative as I don't see source code. 
-                # Assuming standard inputs.
-                
-                # IMDb ID
-                # Looking for input with 'imdb' in name or id, or first text input
-                # If site asks for "tt12345", ensure we have 'tt'.
-                full_imdb_id = imdb_id if str(imdb_id).startswith("tt") else f"tt{imdb_id}"
-                
-                log.info(f"Filling ID: {full_imdb_id}", "📝")
-                await page.fill('input[name*="content_id"], input[id*="content_id"]', full_imdb_id)
-
-                # Content type
-                log.info("Selecting content type", "🗣")
-                select = await page.query_selector('select#content_type')
-                if select:
-                    # Simple mapping: if "episode" or "series", search Episode or Series
-                    target_type = "series" if content_type.lower() in ["series", "episode", "tv show"] else "movie"
-                    
+                async with self._start_lock:
+                    await self._ensure_browser()
+            except Exception as e:
+                log.error(f"Upload browser relaunch failed: {e}")
+                self._fail_pending(f"upload browser unavailable: {e}")
+
+    async def _worker(self, n):
+        context = None
+        future = None
+        try:
+            context = await self._new_context()
+            while True:
+                args, future = await self._queue.get()
+                if future.done():
+                    # The caller stopped waiting
+                    future = None
+                    continue
+                broken = False
+                try:
+                    result = await self._upload(context, *args)
+                except Exception as e:
+                    log.error(f"Upload worker {n} error: {e}")
+                    result = UploadResult(False, UploadResult.ERROR, detail=str(e))
+                    broken = True
+                UPLOADS.labels(result.reason).inc()
+                if result.elapsed is not None:
+                    STAGE_SECONDS.labels("upload").observe(result.elapsed)
+                if not future.done():
+                    future.set_result(result)
+                future = None
+                if broken:
+                    # Start over with a fresh context in case this one is broken
+                    await self._close_context(context)
+                    context = None
+                    context = await self._new_context()
+        finally:
+            # Never leave the caller of the upload in progress waiting
+            if future is not None and not future.done():
+                future.set_result(UploadResult(False, UploadResult.ERROR, detail="upload worker stopped"))
+            await self._close_context(context)
+
+    async def _login(self, page):
+        log.auth("Logging in")
+        await page.goto(f"{STREMIO_BASE_URL}/login")
+
+        # Try filling login form
+        await page.fill('input[name="email"], input[type="email"]', STREMIO_EMAIL)
+        await page.fill('input[name="password"], input[type="password"]', STREMIO_PASSWORD)
+
+        # Click submit button (search by type or text)
+        await page.click('button[type="submit"], input[type="submit"], button:has-text("Sign In"), button:has-text("Login")')
+
+        # Wait for navigation using networkidle (more reliable than exact url)
+        # This waits for no network traffic for 500ms, indicating page loaded
+        await page.wait_for_load_state("networkidle")
+
+        if "/login" in page.url:
+            log.warning("URL still contains '/login'. Check credentials")
+            return False
+
+        # Share the session with the other contexts and the next start
+        # Written to a temp file and renamed: contexts logging in at once must not interleave their writes
+        os.makedirs(os.path.dirname(STREMIO_SESSION_PATH) or ".", exist_ok=True)
+        temp_path = f"{STREMIO_SESSION_PATH}.{uuid.uuid4().hex}.tmp"
+        await page.context.storage_state(path=temp_path)
+        os.replace(temp_path, STREMIO_SESSION_PATH)
+        log.success(f"Login completed (Current URL: {page.url})")
+        return True
+
+    async def _upload(self, context, file_path, imdb_id, content_type="movie", season=None, episode=None,
+                      language=TARGET_LANGUAGE_CODE):
+        log.upload(f"Starting upload for {imdb_id} (Type: {content_type}, S:{season} E:{episode}, {language})")
+        page = await context.new_page()
+        start_time = time.time()
+
+        try:
+            # 1. Go to Upload, logging in only when the saved session is no longer valid
+            log.web("Navigating to upload page")
+            await page.goto(f"{STREMIO_BASE_URL}/content/upload")
+            if "/login" in page.url:
+                if not await self._login(page):
+                    return UploadResult(False, UploadResult.LOGIN_FAILED, elapsed=time.time() - start_time)
+                await page.goto(f"{STREMIO_BASE_URL}/content/upload")
+
+            # 2. Fill upload form
+            # Note: This is tentative as I don't see source code.
+            # Assuming standard inputs.
+
+            # IMDb ID
+            # Looking for input with 'imdb' in name or id, or first text input
+            # If site asks for "tt12345", ensure we have 'tt'.
+            full_imdb_id = imdb_id if str(imdb_id).startswith("tt") else f"tt{imdb_id}"
+
+            log.info(f"Filling ID: {full_imdb_id}", "📝")
+            await page.fill('input[name*="content_id"], input[id*="content_id"]', full_imdb_id)
+
+            # Content type
+            log.info("Selecting content type", "🗣")
+            select = await page.query_selector('select#content_type')
+            if select:
+                # Simple mapping: if "episode" or "series", search Episode or Series
+                target_type = "series" if content_type.lower() in ["series", "episode", "tv show"] else "movie"
+
+                options = await select.query_selector_all('option')
+                for opt in options:
+                    text = await opt.text_content()
+                    if target_type.lower() in text.lower():
+                        val = await opt.get_attribute('value')
+                        await select.select_option(val)
+                        break
+
+            # Fill Season and Episode if applicable
+            if season and episode:
+                log.info(f"Filling Season {season} and Episode {episode}", "🔢")
+                # Attempt 1: Suggested IDs/Names
+                await page.fill('input[name="season_number"], input[id="season_number"]', str(season))
+                await page.fill('input[name="episode_number"], input[id="episode_number"]', str(episode))
+
+            # Language (ISO 639-2 code of the translation)
+            target_lang_code = language
+            log.info(f"Selecting language: {target_lang_code}", "🗣")
+
+            select = await page.query_selector('select#language')
+            if select:
+                # Try to select by value directly first
+                try:
+                    await select.select_option(target_lang_code)
+                    log.success(f"Selected language code: {target_lang_code}")
+                except:
+                    # Fallback: search through options if direct selection fails
                     options = await select.query_selector_all('option')
                     for opt in options:
-                        text = await opt.text_content()
-                        if target_type.lower() in text.lower():
-                            val = await opt.get_attribute('value')
+                        val = await opt.get_attribute('value')
+                        if val and target_lang_code.lower() in val.lower():
                             await select.select_option(val)
+                            log.success(f"Selected language: {val}")
                             break
 
-                # Fill Season and Episode if applicable
-                if season and episode:
-                    log.info(f"Filling Season {season} and Episode {episode}", "🔢")
-                    # Attempt 1: Suggested IDs/Names
-                    await page.fill('input[name="season_number"], input[id="season_number"]', str(season))
-                    await page.fill('input[name="episode_number"], input[id="episode_number"]', str(episode))
-                
-                # Language
-                # Get target language code from environment (default: spa for Spanish)
-                target_lang_code = os.getenv("TARGET_LANGUAGE_CODE", "spa")
-                log.info(f"Selecting language: {target_lang_code}", "🗣")
-                
-                select = await page.query_selector('select#language')
-                if select:
-                    # Try to select by value directly first
-                    try:
-                        await select.select_option(target_lang_code)
-                        log.success(f"Selected language code: {target_lang_code}")
-                    except:
-                        # Fallback: search through options if direct selection fails
-                        options = await select.query_selector_all('option')
-                        for opt in options:
-                            val = await opt.get_attribute('value')
-                            if val and target_lang_code.lower() in val.lower():
-                                await select.select_option(val)
-                                log.success(f"Selected language: {val}")
-                                break
-                
-                # File
-                log.file(f"Attaching file: {file_path}")
-                await page.set_input_files('input#subtitle_file', file_path)
-                
-                # 4. Send
-                log.upload("Sending form")
-                # Search for "Upload", "Save", "Submit" button
-                await page.click('button:has-text("Upload"), button:has-text("Save"), input[type="submit"]')
-                
-                # Wait for confirmation
-                # Wait a bit or search for success message
-                await page.wait_for_timeout(5000)
-                
-                log.success("Upload completed")
-                return True
+            # File
+            log.file(f"Attaching file: {file_path}")
+            await page.set_input_files('input#subtitle_file', file_path)
 
-            except Exception as e:
-                log.error(f"Error during automatic upload: {e}")
-                # Take screenshot on error for debugging
-                os.makedirs("errors", exist_ok=True)
-                error_filename = f"errors/upload_error_{int(time.time())}.png"
-                await page.screenshot(path=error_filename)
-                log.info(f"Error capture saved to {error_filename}", "📸")
-                return False
-            finally:
-                await browser.close()
+            # 3. Send
+            log.upload("Sending form")
+            # The page may POST other things (analytics, CSRF refresh), only the form's own action counts
+            action = await page.eval_on_selector(
+                'input#subtitle_file', 'el => el.form && el.form.action'
+            ) or f"{STREMIO_BASE_URL}/content/upload"
+            # Search for "Upload", "Save", "Submit" button, and wait for the response to the form POST
+            try:
+                async with page.expect_response(
+                    lambda r: is_form_response(r, action), timeout=UPLOAD_CONFIRM_TIMEOUT * 1000
+                ) as response_info:
+                    await page.click('button:has-text("Upload"), button:has-text("Save"), input[type="submit"]')
+                response = await response_info.value
+            except PlaywrightTimeoutError:
+                log.warning("No response to the upload form")
+                return UploadResult(False, UploadResult.TIMEOUT, elapsed=time.time() - start_time)
+
+            # 4. Read the outcome
+            result = await self._read_outcome(page, response.status)
+            result.elapsed = time.time() - start_time
+            if result:
+                log.success(f"Upload completed in {result.elapsed:.1f}s")
+            else:
+                log.warning(f"Upload not confirmed: {result.reason} {result.detail or ''}")
+            return result
+
+        except Exception as e:
+            log.error(f"Error during automatic upload: {e}")
+            # Take screenshot on error for debugging
+            os.makedirs("errors", exist_ok=True)
+            error_filename = f"errors/upload_error_{int(time.time())}.png"
+            await page.screenshot(path=error_filename)
+            log.info(f"Error capture saved to {error_filename}", "📸")
+            return UploadResult(False, UploadResult.ERROR, detail=str(e), elapsed=time.time() - start_time)
+        finally:
+            await page.close()
+
+    async def _read_outcome(self, page, status):
+        """Turn the form response and the page it leads to into an UploadResult."""
+        if status >= 500:
+            return UploadResult(False, UploadResult.SERVER_ERROR, status=status)
+        if status >= 400:
+            return UploadResult(False, UploadResult.REJECTED, status=status)
+
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=UPLOAD_OUTCOME_TIMEOUT * 1000)
+            element = await page.wait_for_selector(
+                f"{SUCCESS_SELECTOR}, {ERROR_SELECTOR}", timeout=UPLOAD_OUTCOME_TIMEOUT * 1000
+            )
+            message = (await element.text_content() or "").strip()
+            if await element.evaluate("(el, selector) => el.matches(selector)", SUCCESS_SELECTOR):
+                return UploadResult(True, UploadResult.UPLOADED, status=status, detail=message)
+            return UploadResult(False, UploadResult.REJECTED, status=status, detail=message)
+        except PlaywrightTimeoutError:
+            pass
+
+        # No message on the page: judge by where the form sent us
+        if "/login" in page.url:
+            return UploadResult(False, UploadResult.SESSION_EXPIRED, status=status)
+        if "/content/upload" in page.url:
+            return UploadResult(False, UploadResult.UNCONFIRMED, status=status, detail="Still on the upload form")
+        return UploadResult(True, UploadResult.UPLOADED, status=status, detail=f"Redirected to {page.url}")
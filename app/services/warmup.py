@@ -0,0 +1,68 @@
+import os
+import time
+import asyncio
+from app.utils.logger import log
+
+# Launch the upload browser on start instead of on the first upload
+UPLOAD_PRELAUNCH = os.getenv("UPLOAD_PRELAUNCH", "false").lower() in ("1", "true", "yes")
+# Seconds each startup check may take (loading a large model from disk is slow)
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "180"))
+
+
+class Warmup:
+    """
+    Startup checks run in the background once the app is up: load the Ollama
+    model with a tiny generation, log in to OpenSubtitles and optionally launch
+    the upload browser. Their outcome feeds /readyz.
+    """
+
+    def __init__(self, translator, os_client, uploader):
+        self.translator = translator
+        self.os_client = os_client
+        self.uploader = uploader
+        self.checks = {}
+        self.done = False
+        self._task = None
+
+    async def _check(self, name, coro):
+        start = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(coro, WARMUP_TIMEOUT)
+            self.checks[name] = {"ok": True, "detail": detail}
+            log.success(f"Warmup: {name} ready in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            self.checks[name] = {"ok": False, "detail": str(e) or type(e).__name__}
+            log.warning(f"Warmup: {name} failed ({self.checks[name]['detail']})")
+        self.checks[name]["seconds"] = round(time.perf_counter() - start, 2)
+
+    async def _ollama(self):
+        # One short generation per backend through the regular prompt: loads the model with the
+        # same options and keep_alive as the batches, so the first batch does not reload it
+        request = self.translator.prompts.request(["Hello"])
+        request["options"] = {**request["options"], "num_predict": 8}
+        loaded = await self.translator.pool.warm_up(request)
+        return f"{self.translator.model_ollama} loaded on {loaded}/{len(self.translator.pool.backends)} backend(s)"
+
+    async def _opensubtitles(self):
+        await self.os_client.ensure_token()
+        return f"logged in, {self.os_client.remaining_downloads} downloads left"
+
+    async def _uploader(self):
+        await self.uploader.start()
+        return "browser running"
+
+    async def run(self):
+        checks = [self._check("ollama", self._ollama()), self._check("opensubtitles", self._opensubtitles())]
+        if UPLOAD_PRELAUNCH:
+            checks.append(self._check("uploader", self._uploader()))
+        await asyncio.gather(*checks)
+        self.done = True
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
@@ -0,0 +1,86 @@
+"""
+Small caching primitives shared by the services.
+"""
+import time
+import asyncio
+from collections import OrderedDict
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing a key so only one of them runs."""
+
+    def __init__(self):
+        self._inflight = {}
+
+    def is_running(self, key):
+        return key in self._inflight
+
+    async def run(self, key, factory):
+        """Await the in-flight call for key, or start factory() if there is none."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            # Forget the call once it finishes, even if every waiter was cancelled
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+
+class TTLCache:
+    """
+    In-memory LRU cache whose entries expire ttl seconds after they were stored.
+    With stale_ttl, expired entries are kept that much longer for get_stale().
+    """
+
+    def __init__(self, max_entries, ttl, stale_ttl=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def peek(self, key):
+        """Return the fresh value for key without touching LRU order or hit counts."""
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def get(self, key):
+        value = self.peek(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_stale(self, key):
+        """Return an expired value still within stale_ttl, to serve while it is refreshed."""
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl + self.stale_ttl:
+            return None
+        return entry[1]
+
+    def put(self, key, value, stored_at=None):
+        self._entries[key] = (stored_at or time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def items(self):
+        """(key, stored_at, value) of every entry, least recently used first."""
+        return [(key, stored_at, value) for key, (stored_at, value) in self._entries.items()]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
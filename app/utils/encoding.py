@@ -0,0 +1,167 @@
+"""
+Decoding of downloaded subtitle files.
+
+Subtitles come in whatever encoding their author's editor used. The bytes are
+checked for a BOM first, then for valid UTF-8 (one C-speed pass, the common
+case), and only then handed to a small detector that scores legacy codepages
+on a bounded sample: the bytes around the first non-ASCII runs.
+"""
+import re
+import codecs
+import functools
+from collections import Counter
+import unicodedata
+
+# Longest first: the UTF-32 LE BOM starts with the UTF-16 LE one.
+# These codecs drop the BOM while decoding.
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Tried in this order, the first wins a tie
+LEGACY_ENCODINGS = ("cp1252", "cp1250", "cp1251", "koi8-r", "cp1253", "cp1254", "cp1255", "cp1256", "cp874")
+
+# Frequent letters of the languages written in each codepage. They tip the balance between
+# codepages that map the same bytes to plausible letters (0xE8: 'è' in cp1252, 'č' in cp1250)
+COMMON_LETTERS = {
+    "cp1252": set("éèàáíóúñüöäçãõêâôîïëœßÉÀÇÑÜÖÄ"),
+    "cp1250": set("ąćęłńóśźżčďěňřšťůžőűáéíýĄĆĘŁŃŚŹŻČĎĚŇŘŠŤŮŽŐŰ"),
+    "cp1251": set("оеаинтсрвлкмдпуя"),
+    "koi8-r": set("оеаинтсрвлкмдпуя"),
+    "cp1253": set("αοιετσνηυρπκμλάέίόύήώ"),
+    "cp1254": set("çğışöüÇĞİŞÖÜ"),
+    "cp1255": set("יוהאלמרבנתשע"),
+    "cp1256": set("ايلمونرتبةعد"),
+    "cp874": set("านรอกเมงยดท่้"),
+}
+
+NON_ASCII_RUN_RE = re.compile(rb"[\x80-\xff]+")
+WORD_RE = re.compile(r"\w+")
+
+# Detection looks at this many non-ASCII runs, each with some context around it
+SAMPLE_RUNS = 256
+SAMPLE_CONTEXT = 16
+# UTF-8 with a few broken bytes is still UTF-8
+MAX_UTF8_ERROR_RATIO = 0.05
+
+
+@functools.lru_cache(maxsize=4096)
+def _script(char):
+    name = unicodedata.name(char, "")
+    return name.split(" ", 1)[0] if name else ""
+
+
+def sample_non_ascii(data, runs=SAMPLE_RUNS, context=SAMPLE_CONTEXT):
+    """The first runs non-ASCII byte runs with context bytes on each side, joined by newlines."""
+    parts = []
+    for n, match in enumerate(NON_ASCII_RUN_RE.finditer(data)):
+        if n >= runs:
+            break
+        parts.append(data[max(0, match.start() - context):match.end() + context])
+    return b"\n".join(parts)
+
+
+def _score_token(token, common):
+    score = 0
+    for i, char in enumerate(token):
+        if char < "\x80" or char.isalpha():
+            continue
+        category = unicodedata.category(char)
+        if category[0] == "C":
+            score -= 5
+        elif category not in ("Pi", "Pf", "Pd") and 0 < i < len(token) - 1 and token[i - 1].isalpha() and token[i + 1].isalpha():
+            # Symbols inside a word (other than quotes and dashes) are usually a misread letter ('wa¿ne')
+            score -= 2
+        elif category[0] == "S":
+            score -= 1
+    for word in WORD_RE.findall(token):
+        if word.isascii():
+            continue
+        letters = [c for c in word if c.isalpha() and c >= "\x80"]
+        scripts = {_script(c) for c in word if c.isalpha()}
+        if len(scripts) > 1:
+            # A Latin word with a Cyrillic letter in it
+            score -= 3
+        elif scripts == {"LATIN"} and len(word) > 2 and len(letters) == len(word):
+            # Latin words have some ASCII letters, a word of accented letters only is another script misread
+            score -= len(letters)
+        else:
+            score += sum(2 if c in common else 1 for c in letters)
+        if any(c.islower() for c in word) and any(c.isupper() for c in word[1:]):
+            # Capitals inside a lower case word, e.g. KOI8-R read as cp1251
+            score -= 2
+    return score
+
+
+def score_text(text, encoding):
+    """How plausible text is as natural language written in encoding, higher is better."""
+    common = COMMON_LETTERS.get(encoding, ())
+    # Subtitles repeat themselves, each distinct token is scored once
+    tokens = Counter(token for token in text.split() if not token.isascii())
+    return sum(_score_token(token, common) * count for token, count in tokens.items())
+
+
+def detect_legacy(data):
+    """Best scoring legacy codepage for data, judged on a sample of its non-ASCII bytes."""
+    sample = sample_non_ascii(data)
+    best, best_score = None, None
+    for encoding in LEGACY_ENCODINGS:
+        try:
+            text = sample.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        score = score_text(text, encoding)
+        if best_score is None or score > best_score:
+            best, best_score = encoding, score
+    # latin-1 decodes anything
+    return best or "latin-1"
+
+
+def _looks_like_utf16(data):
+    # UTF-16 without a BOM: the ASCII digits and timings of a subtitle file leave
+    # a zero in every other byte, text never has zeros in the other column
+    sample = data[:4096]
+    half = len(sample) // 2
+    if half < 8:
+        return None
+    even_zeros = sample[0::2].count(0)
+    odd_zeros = sample[1::2].count(0)
+    if odd_zeros > 0.2 * half and even_zeros < 0.02 * half:
+        return "utf-16-le"
+    if even_zeros > 0.2 * half and odd_zeros < 0.02 * half:
+        return "utf-16-be"
+    return None
+
+
+def detect_encoding(data):
+    """Name of the codec that decodes data (a Python codec name)."""
+    for bom, encoding in BOMS:
+        if data.startswith(bom):
+            return encoding
+    # Zero bytes are valid UTF-8 but never appear in a UTF-8 text file
+    if b"\x00" in data[:4096]:
+        utf16 = _looks_like_utf16(data)
+        if utf16:
+            return utf16
+    try:
+        data.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    # Mostly valid UTF-8 with the odd broken byte, e.g. a file edited in two tools
+    sample = sample_non_ascii(data)
+    decoded = sample.decode("utf-8", errors="replace")
+    non_ascii = sum(1 for c in decoded if c >= "\x80")
+    if non_ascii and decoded.count("\ufffd") / non_ascii <= MAX_UTF8_ERROR_RATIO:
+        return "utf-8"
+    return detect_legacy(data)
+
+
+def decode_subtitle(data):
+    """Decode downloaded subtitle bytes, returning (text, encoding)."""
+    encoding = detect_encoding(data)
+    return data.decode(encoding, errors="replace"), encoding
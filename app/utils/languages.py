@@ -0,0 +1,35 @@
+"""
+Target languages: ISO 639-2 codes as the Stremio upload form expects them, and
+the language names the prompts use.
+"""
+import os
+
+# Used when a request does not ask for specific languages
+TARGET_LANGUAGE = os.getenv("TARGET_LANGUAGE", "Spanish")
+TARGET_LANGUAGE_CODE = os.getenv("TARGET_LANGUAGE_CODE", "spa")
+
+LANGUAGE_NAMES = {
+    "eng": "English", "pol": "Polish", "spa": "Spanish", "fra": "French", "deu": "German", "ita": "Italian",
+    "por": "Portuguese", "pob": "Brazilian Portuguese", "rus": "Russian", "jpn": "Japanese", "zho": "Chinese",
+    "kor": "Korean", "ara": "Arabic", "hin": "Hindi", "tur": "Turkish", "nld": "Dutch", "swe": "Swedish",
+    "nor": "Norwegian", "dan": "Danish", "fin": "Finnish", "ces": "Czech", "slk": "Slovak", "hun": "Hungarian",
+    "ron": "Romanian", "bul": "Bulgarian", "ell": "Greek", "heb": "Hebrew", "tha": "Thai", "vie": "Vietnamese",
+    "ind": "Indonesian", "msa": "Malay", "ukr": "Ukrainian", "srp": "Serbian", "hrv": "Croatian",
+    "slv": "Slovenian", "est": "Estonian", "lav": "Latvian", "lit": "Lithuanian", "fas": "Persian", "urd": "Urdu",
+    "ben": "Bengali", "mya": "Burmese", "cat": "Catalan", "eus": "Basque", "epo": "Esperanto",
+    "mkd": "Macedonian", "tel": "Telugu", "sqi": "Albanian",
+}
+# The configured language keeps the name it was configured with
+LANGUAGE_NAMES[TARGET_LANGUAGE_CODE.lower()] = TARGET_LANGUAGE
+
+
+class UnknownLanguageError(ValueError):
+    pass
+
+
+def language_name(code):
+    """Prompt name of an ISO 639-2 code."""
+    name = LANGUAGE_NAMES.get(code.lower())
+    if name is None:
+        raise UnknownLanguageError(f"Unknown language code '{code}', use an ISO 639-2 code such as '{TARGET_LANGUAGE_CODE}'")
+    return name
@@ -1,10 +1,98 @@
 """
 Centralized logging utility for consistent console output across the application.
+
+Records go through a queue to a background thread that owns the sink, so logging
+never blocks the event loop. Configured with:
+    LOG_LEVEL   DEBUG, INFO, WARNING or ERROR
+    LOG_FORMAT  text (coloured lines) or json (one object per line)
+    LOG_SINK    stdout or file (rotating, at LOG_FILE)
 """
+import os
+import sys
+import json
+import queue
+import atexit
+import asyncio
+import logging
+import logging.handlers
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_SINK = os.getenv("LOG_SINK", "stdout").lower()
+LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+LOG_FILE_MAX_BYTES = int(os.getenv("LOG_FILE_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_FILE_BACKUPS = int(os.getenv("LOG_FILE_BACKUPS", "5"))
+
+SUCCESS = 25
+logging.addLevelName(SUCCESS, "SUCCESS")
+
+
+class TextFormatter(logging.Formatter):
+    """The classic 'LABEL:   emoji message' lines, coloured when writing to a terminal."""
+
+    def __init__(self, colors=True):
+        super().__init__()
+        self.colors = colors
+
+    def format(self, record):
+        label = f"{record.label}:".ljust(9)
+        if self.colors:
+            label = f"{record.color}{label}{Logger.RESET}"
+        return f"{label} {record.emoji} {record.getMessage()}"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log collectors."""
+
+    def format(self, record):
+        return json.dumps({
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "label": record.label,
+            "emoji": record.emoji,
+            "message": record.getMessage(),
+        }, ensure_ascii=False)
+
+
+def _build_handler():
+    if LOG_SINK == "file":
+        os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8"
+        )
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter(colors=LOG_SINK != "file"))
+    return handler
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Formatting is left to the listener thread, only make the record safe to hand over
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+_queue = queue.SimpleQueue()
+_listener = logging.handlers.QueueListener(_queue, _build_handler(), respect_handler_level=False)
+_listener.start()
+# Flush what is still queued when the process exits
+atexit.register(_listener.stop)
+
+_logger = logging.getLogger("stremio_ai_subs")
+_logger.setLevel(getattr(logging, LOG_LEVEL, logging.DEBUG))
+_logger.addHandler(_QueueHandler(_queue))
+_logger.propagate = False
+
 
 class Logger:
     """Standardized logger with emoji prefixes and severity levels."""
-    
+
     # Color codes for terminal output
     RESET = "\033[0m"
     BOLD = "\033[1m"
@@ -13,86 +101,127 @@ class Logger:
     GREEN = "\033[92m"
     BLUE = "\033[94m"
     CYAN = "\033[96m"
-    
+
+    @staticmethod
+    def _emit(level, label, color, emoji, message):
+        if _logger.isEnabledFor(level):
+            _logger.log(level, message, extra={"label": label, "color": color, "emoji": emoji})
+
     @staticmethod
     def info(message: str, emoji: str = "ℹ️"):
         """Log informational message."""
-        print(f"{Logger.CYAN}INFO:    {Logger.RESET} {emoji} {message}")
-    
+        Logger._emit(logging.INFO, "INFO", Logger.CYAN, emoji, message)
+
     @staticmethod
     def success(message: str, emoji: str = "✅"):
         """Log success message."""
-        print(f"{Logger.GREEN}SUCCESS: {Logger.RESET} {emoji} {message}")
-    
+        Logger._emit(SUCCESS, "SUCCESS", Logger.GREEN, emoji, message)
+
     @staticmethod
     def warning(message: str, emoji: str = "⚠️"):
         """Log warning message."""
-        print(f"{Logger.YELLOW}WARNING: {Logger.RESET} {emoji} {message}")
-    
+        Logger._emit(logging.WARNING, "WARNING", Logger.YELLOW, emoji, message)
+
     @staticmethod
     def error(message: str, emoji: str = "❌"):
         """Log error message."""
-        print(f"{Logger.RED}ERROR:   {Logger.RESET} {emoji} {message}")
-    
+        Logger._emit(logging.ERROR, "ERROR", Logger.RED, emoji, message)
+
     @staticmethod
     def debug(message: str, emoji: str = "🔍"):
         """Log debug message."""
-        print(f"{Logger.BLUE}DEBUG:   {Logger.RESET} {emoji} {message}")
-    
+        Logger._emit(logging.DEBUG, "DEBUG", Logger.BLUE, emoji, message)
+
     @staticmethod
     def process(message: str, emoji: str = "🔄"):
         """Log process/progress message."""
-        print(f"{Logger.CYAN}PROCESS: {Logger.RESET} {emoji} {message}")
-    
+        Logger._emit(logging.INFO, "PROCESS", Logger.CYAN, emoji, message)
+
     # Specific domain loggers with custom emojis
     @staticmethod
     def search(message: str):
         """Log search operations."""
         Logger.info(message, "🔍")
-    
+
     @staticmethod
     def download(message: str):
         """Log download operations."""
         Logger.info(message, "📥")
-    
+
     @staticmethod
     def upload(message: str):
         """Log upload operations."""
         Logger.info(message, "📤")
-    
+
     @staticmethod
     def translate(message: str):
         """Log translation operations."""
         Logger.info(message, "🌍")
-    
+
     @staticmethod
     def auth(message: str):
         """Log authentication operations."""
         Logger.info(message, "🔑")
-    
+
     @staticmethod
     def file(message: str):
         """Log file operations."""
         Logger.info(message, "📄")
-    
+
     @staticmethod
     def batch(message: str, batch_num: int = None, total: int = None):
         """Log batch processing."""
         if batch_num and total:
-            print(f"{Logger.CYAN}BATCH:   {Logger.RESET} 📦 [Batch {batch_num}/{total}] {message}")
-        else:
-            print(f"{Logger.CYAN}BATCH:   {Logger.RESET} 📦 {message}")
-    
+            message = f"[Batch {batch_num}/{total}] {message}"
+        Logger._emit(logging.INFO, "BATCH", Logger.CYAN, "📦", message)
+
     @staticmethod
     def ai(message: str):
         """Log AI/model operations."""
         Logger.info(message, "🤖")
-    
+
     @staticmethod
     def web(message: str):
         """Log web/network operations."""
         Logger.info(message, "🌐")
 
 
+class AuditLog:
+    """
+    Append-only text file (like the per-translation logs) written from a worker
+    thread. write() only buffers; chunks written while a flush is running are
+    joined into the next one, so a busy run costs one file append per flush.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._buffer = []
+        self._task = None
+
+    def write(self, text):
+        self._buffer.append(text)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        while self._buffer:
+            data = "".join(self._buffer)
+            self._buffer = []
+            try:
+                await asyncio.to_thread(self._append, data)
+            except Exception as e:
+                Logger.warning(f"Log write error ({self.path}): {e}")
+
+    def _append(self, data):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    async def aclose(self):
+        """Wait until everything written so far is on disk."""
+        if self._task is not None:
+            await self._task
+
+
 # Convenience instance for importing
 log = Logger()
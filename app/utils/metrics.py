@@ -0,0 +1,92 @@
+"""
+Prometheus metrics for every stage of the pipeline, served on /metrics.
+"""
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram
+
+# Wide enough for a 100ms IMDb lookup and a multi-minute translation
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+STAGE_SECONDS = Histogram(
+    "stremio_ai_subs_stage_seconds",
+    "Wall-clock time of each pipeline stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "stremio_ai_subs_stage_errors_total",
+    "Pipeline stages that raised an error",
+    ["stage"],
+)
+
+OLLAMA_TOKENS = Counter(
+    "stremio_ai_subs_ollama_tokens_total",
+    "Tokens processed by Ollama",
+    ["kind"],  # prompt or generated
+)
+OLLAMA_TOKENS_PER_SECOND = Histogram(
+    "stremio_ai_subs_ollama_tokens_per_second",
+    "Generation speed of each Ollama call",
+    buckets=(5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500),
+)
+OLLAMA_PHASE_SECONDS = Histogram(
+    "stremio_ai_subs_ollama_phase_seconds",
+    "Time of each Ollama call spent loading the model, evaluating the prompt and generating",
+    ["phase"],  # load, prompt_eval or generation
+    buckets=LATENCY_BUCKETS,
+)
+BATCH_VALIDATION_FAILURES = Counter(
+    "stremio_ai_subs_batch_validation_failures_total",
+    "Items missing or empty in a batch answer",
+)
+SINGLE_LINE_FALLBACKS = Counter(
+    "stremio_ai_subs_single_line_fallbacks_total",
+    "Lines translated one by one after the batch attempts failed",
+)
+UPLOADS = Counter(
+    "stremio_ai_subs_uploads_total",
+    "Upload attempts by outcome",
+    ["reason"],
+)
+
+UPSTREAM_RETRIES = Counter(
+    "stremio_ai_subs_upstream_retries_total",
+    "Requests to third-party APIs retried, by cause",
+    ["service", "reason"],  # reason: HTTP status, network or token
+)
+CACHE_LOOKUPS = Counter(
+    "stremio_ai_subs_cache_lookups_total",
+    "Lookups of the in-process caches by outcome",
+    ["cache", "result"],  # result: hit, local (answered from related entries), stale, miss
+)
+
+JOB_QUEUE_DEPTH = Gauge("stremio_ai_subs_job_queue_depth", "Jobs waiting for a worker")
+UPLOAD_QUEUE_DEPTH = Gauge("stremio_ai_subs_upload_queue_depth", "Uploads waiting for a browser context")
+
+
+@contextmanager
+def track(stage):
+    """Time the enclosed block as one run of stage, counting it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def observe_ollama(response):
+    """Record the token counts and generation speed reported in an Ollama chat response."""
+    prompt_tokens = response.get("prompt_eval_count") or 0
+    generated = response.get("eval_count") or 0
+    OLLAMA_TOKENS.labels("prompt").inc(prompt_tokens)
+    OLLAMA_TOKENS.labels("generated").inc(generated)
+    eval_ns = response.get("eval_duration") or 0
+    if generated and eval_ns:
+        OLLAMA_TOKENS_PER_SECOND.observe(generated / (eval_ns / 1e9))
+    for phase, key in (("load", "load_duration"), ("prompt_eval", "prompt_eval_duration"), ("generation", "eval_duration")):
+        if response.get(key):
+            OLLAMA_PHASE_SECONDS.labels(phase).observe(response.get(key) / 1e9)
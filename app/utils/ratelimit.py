@@ -0,0 +1,69 @@
+"""
+Client-side pacing for rate-limited APIs.
+"""
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+
+MAX_BACKOFF = 60.0
+
+
+class TokenBucket:
+    """
+    Allows rate requests per second with bursts of up to capacity.
+    acquire() waits for a token instead of failing, in arrival order, and
+    pause() holds every caller back, e.g. until the server's limit resets.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.waiting = 0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        self.waiting += 1
+        try:
+            # asyncio.Lock wakes waiters first in, first out
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self._paused_until:
+                        await asyncio.sleep(self._paused_until - now)
+                        continue
+                    self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+    def pause(self, seconds):
+        """Hand out no tokens for the next seconds, and start empty afterwards."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._updated = self._paused_until
+        self.tokens = 0.0
+
+
+def retry_delay(response, attempt, base=1.0):
+    """
+    Seconds to wait before retrying: the Retry-After header when the server sent one
+    (in seconds or as an HTTP date), otherwise exponential backoff with jitter.
+    """
+    header = response.headers.get("retry-after") if response is not None else None
+    if header:
+        try:
+            return min(MAX_BACKOFF, max(0.0, float(header)))
+        except ValueError:
+            pass
+        try:
+            return min(MAX_BACKOFF, max(0.0, parsedate_to_datetime(header).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            pass
+    return min(MAX_BACKOFF, base * 2 ** attempt) * random.uniform(0.75, 1.25)
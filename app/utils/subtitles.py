@@ -0,0 +1,246 @@
+"""
+Single-pass subtitle parsing (SRT, WebVTT, ASS) into compact blocks, and an incremental SRT writer.
+"""
+import io
+import re
+from app.utils.logger import log
+
+# 00:00:01,000 --> 00:00:02,500, milliseconds optional (anything after the end time, like positions, is ignored)
+SRT_TIMING_RE = re.compile(
+    r'(\d+):(\d{1,2}):(\d{1,2})(?:[,.](\d{1,3}))?\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})(?:[,.](\d{1,3}))?'
+)
+# WebVTT allows the hours to be omitted: 01:02.500 --> 01:04.000 align:start
+VTT_TIMING_RE = re.compile(
+    r'(?:(\d+):)?(\d{1,2}):(\d{1,2})\.(\d{1,3})\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})\.(\d{1,3})'
+)
+# ASS times use centiseconds: 0:01:02.50
+ASS_TIME_RE = re.compile(r'(\d+):(\d{1,2}):(\d{1,2})\.(\d{1,3})')
+# ASS override tags such as {\i1} or {\pos(10,20)}
+ASS_TAG_RE = re.compile(r'\{[^}]*\}')
+
+
+class SubtitleBlock:
+    """
+    One cue: index, timing in integer milliseconds, source text and its translation.
+    SRT cues also keep their timing line as written (positions included), which is
+    what gets written back.
+    """
+
+    __slots__ = ("index", "start_ms", "end_ms", "text", "translated", "timing")
+
+    def __init__(self, index, start_ms, end_ms, text, translated=None, timing=None):
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+        self.translated = translated
+        self.timing = timing
+
+    @property
+    def time(self):
+        if self.timing is not None:
+            return self.timing
+        return f"{format_timestamp(self.start_ms)} --> {format_timestamp(self.end_ms)}"
+
+    def __repr__(self):
+        return f"SubtitleBlock({self.index}, {self.time!r}, {self.text!r})"
+
+
+def _to_ms(hours, minutes, seconds, fraction):
+    # '5' after the separator means 500ms, not 5ms
+    fraction = fraction or "0"
+    if len(fraction) < 3:
+        fraction = fraction.ljust(3, "0")
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(fraction)
+
+
+def format_timestamp(ms):
+    return f"{ms // 3_600_000:02d}:{ms // 60_000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+
+def _iter_str_lines(text):
+    # Slices one line at a time instead of copying the whole text (StringIO) or splitting it into a list
+    if "\n" not in text and "\r" in text:
+        # Old Mac line endings
+        text = text.replace("\r", "\n")
+    find = text.find
+    start = 0
+    end = find("\n")
+    while end != -1:
+        yield text[start:end]
+        start = end + 1
+        end = find("\n", start)
+    if start < len(text):
+        yield text[start:]
+
+
+def _lines(source):
+    """Iterate the lines of a string or a text file without splitting it into a list."""
+    if isinstance(source, str):
+        # A trailing \r from \r\n endings is removed by the callers' strip()
+        return _iter_str_lines(source)
+    return source
+
+
+def iter_srt(source):
+    """
+    Yield SubtitleBlocks from SRT content in a single pass.
+    A header is a number on its own line immediately followed by a timing line,
+    so numbers inside the dialogue are kept as text. Timing lines are kept
+    verbatim. A '-->' line whose times cannot be read still starts a cue (timed
+    at the end of the previous one) rather than being merged into the previous
+    cue's dialogue, and is written back unchanged.
+    """
+    block = None
+    text_lines = []
+    candidate = None
+    match_timing = SRT_TIMING_RE.match
+
+    for raw in _lines(source):
+        line = raw.strip()
+        if line.startswith('\ufeff'):
+            line = line.lstrip('\ufeff')
+
+        if candidate is not None:
+            if '-->' in line:
+                if block is not None:
+                    block.text = "\n".join(text_lines)
+                    yield block
+                match = match_timing(line)
+                if match:
+                    g = match.groups()
+                    start_ms, end_ms = _to_ms(*g[0:4]), _to_ms(*g[4:8])
+                else:
+                    log.warning(f"Unreadable SRT timing line of cue {candidate} kept as is: {line}")
+                    start_ms = end_ms = block.end_ms if block is not None else 0
+                block = SubtitleBlock(int(candidate), start_ms, end_ms, "", timing=line)
+                text_lines = []
+                candidate = None
+                continue
+            # The number was part of the dialogue
+            if block is not None:
+                text_lines.append(candidate)
+            candidate = None
+
+        if line.isdigit():
+            candidate = line
+            continue
+
+        # Empty lines inside a block are ignored to avoid noise
+        if block is not None and line:
+            text_lines.append(line)
+
+    if block is not None:
+        if candidate is not None:
+            text_lines.append(candidate)
+        block.text = "\n".join(text_lines)
+        yield block
+
+
+def iter_vtt(source):
+    """Yield SubtitleBlocks from WebVTT content, skipping the header, NOTE, STYLE and REGION blocks."""
+    index = 0
+    block = None
+    text_lines = []
+    skipping = False
+
+    for raw in _lines(source):
+        line = raw.strip().replace('\ufeff', '')
+
+        if not line:
+            if block is not None:
+                block.text = "\n".join(text_lines)
+                yield block
+                block = None
+            skipping = False
+            continue
+        if skipping:
+            continue
+        if block is not None:
+            text_lines.append(line)
+            continue
+
+        match = VTT_TIMING_RE.match(line)
+        if match:
+            g = match.groups()
+            index += 1
+            block = SubtitleBlock(index, _to_ms(*g[0:4]), _to_ms(*g[4:8]), "")
+            text_lines = []
+        elif line.startswith(("WEBVTT", "NOTE", "STYLE", "REGION")):
+            skipping = True
+        # Anything else is a cue identifier, the index is renumbered anyway
+
+    if block is not None:
+        block.text = "\n".join(text_lines)
+        yield block
+
+
+def iter_ass(source):
+    """Yield SubtitleBlocks from the Dialogue lines of an ASS/SSA [Events] section."""
+    index = 0
+    fields = None
+    in_events = False
+
+    for raw in _lines(source):
+        line = raw.strip().replace('\ufeff', '')
+        if line.startswith("["):
+            in_events = line.lower() == "[events]"
+            continue
+        if not in_events:
+            continue
+        if line.startswith("Format:"):
+            fields = [f.strip().lower() for f in line[len("Format:"):].split(",")]
+            continue
+        if not line.startswith("Dialogue:") or not fields:
+            continue
+
+        # Text is the last field and may itself contain commas
+        values = line[len("Dialogue:"):].split(",", len(fields) - 1)
+        if len(values) != len(fields):
+            continue
+        row = dict(zip(fields, values))
+        start = ASS_TIME_RE.match(row.get("start", "").strip())
+        end = ASS_TIME_RE.match(row.get("end", "").strip())
+        if not start or not end:
+            continue
+        text = ASS_TAG_RE.sub("", row.get("text", "")).replace("\\N", "\n").replace("\\n", "\n").strip()
+        if not text:
+            continue
+        index += 1
+        yield SubtitleBlock(index, _to_ms(*start.groups()), _to_ms(*end.groups()), text)
+
+
+def iter_blocks(content):
+    """Detect the format of content (SRT, WebVTT or ASS) and yield its blocks."""
+    head = content[:2048].lstrip('\ufeff \r\n\t')
+    if head.startswith("WEBVTT"):
+        return iter_vtt(content)
+    if "[Script Info]" in head or "[Events]" in head:
+        return iter_ass(content)
+    return iter_srt(content)
+
+
+class SrtWriter:
+    """Writes blocks to a text stream one at a time, so output can be streamed as it is produced."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def write(self, block):
+        if self.count:
+            self.stream.write("\n\n")
+        text = block.translated if block.translated is not None else block.text
+        self.stream.write(f"{block.index}\n{block.time}\n{text}")
+        self.count += 1
+
+    def write_all(self, blocks):
+        for block in blocks:
+            self.write(block)
+
+
+def format_srt(blocks):
+    """Render blocks as SRT text, using the translation when there is one."""
+    buffer = io.StringIO()
+    SrtWriter(buffer).write_all(blocks)
+    return buffer.getvalue()
@@ -0,0 +1,106 @@
+"""
+Accuracy and speed of app.utils.encoding.decode_subtitle on generated SRT
+fixtures in the encodings subtitle files are found in, against decoding the
+body as UTF-8 with replacement (what a client without a charset header does)
+and against charset_normalizer on the whole body when it is installed.
+Fixtures repeat one line per language, so they say more about accuracy than
+about the detector's speed on varied text.
+
+    python -m benchmarks.bench_encoding --blocks 800 --rounds 5
+"""
+import argparse
+import json
+import time
+
+from app.utils.encoding import decode_subtitle
+
+# (name, text in its language, encoding the fixture is written in)
+FIXTURES = (
+    ("english_ascii", "I don't know what you mean. Let's go!", "ascii"),
+    ("english_cp1252", "“I’m not going,” she said… It’s over — for good.", "cp1252"),
+    ("french_cp1252", "Ça va très bien, merci. Où est la clé de l'hôtel ? Déjà vu, à bientôt.", "cp1252"),
+    ("spanish_cp1252", "¿Dónde está el niño? ¡Mañana será otro día, señor!", "cp1252"),
+    ("german_cp1252", "Schöne Grüße aus München, wir müssen über die Brücke fahren.", "cp1252"),
+    ("polish_cp1250", "Zażółć gęślą jaźń. Dziękuję bardzo, to jest naprawdę ważne.", "cp1250"),
+    ("czech_cp1250", "Příliš žluťoučký kůň úpěl ďábelské ódy. Děkuji, že jste přišli.", "cp1250"),
+    ("russian_cp1251", "Привет, как дела? Я не знаю, что ты имеешь в виду. Пойдём домой.", "cp1251"),
+    ("russian_koi8r", "Привет, как дела? Я не знаю, что ты имеешь в виду. Пойдём домой.", "koi8-r"),
+    ("greek_cp1253", "Γεια σου, τι κάνεις; Δεν ξέρω τι εννοείς. Πάμε σπίτι.", "cp1253"),
+    ("turkish_cp1254", "Günaydın, nasılsınız? Şimdi gitmemiz gerekiyor, çok geç oldu.", "cp1254"),
+    ("hebrew_cp1255", "שלום, מה שלומך? אני לא יודע למה אתה מתכוון.", "cp1255"),
+    ("arabic_cp1256", "مرحبا، كيف حالك؟ لا أعرف ماذا تقصد. لنذهب إلى البيت.", "cp1256"),
+    ("french_utf8", "Ça va très bien, merci. Où est la clé de l'hôtel ?", "utf-8"),
+    ("russian_utf8_bom", "Привет, как дела? Я не знаю, что ты имеешь в виду.", "utf-8-sig"),
+    ("japanese_utf8", "こんにちは、元気ですか？何を言っているのか分かりません。", "utf-8"),
+    ("spanish_utf16_bom", "¿Dónde está el niño? ¡Mañana será otro día, señor!", "utf-16"),
+    ("russian_utf16le_no_bom", "Привет, как дела? Я не знаю, что ты имеешь в виду.", "utf-16-le"),
+)
+
+
+def make_srt(line, blocks):
+    parts = []
+    for n in range(1, blocks + 1):
+        start = n * 3
+        parts.append(
+            f"{n}\n00:{start // 60 % 60:02d}:{start % 60:02d},000 --> 00:{start // 60 % 60:02d}:{start % 60:02d},900\n"
+            f"{line}\n- {line[:24]}"
+        )
+    return "\n\n".join(parts) + "\n"
+
+
+def utf8_replace(data):
+    return data.decode("utf-8", errors="replace"), "utf-8"
+
+
+def charset_normalizer_full(data):
+    from charset_normalizer import from_bytes
+
+    best = from_bytes(data).best()
+    if best is None:
+        return data.decode("utf-8", errors="replace"), "utf-8"
+    return str(best), best.encoding
+
+
+def run(name, decoder, fixtures, rounds):
+    correct = []
+    elapsed = 0.0
+    for fixture, text, data, _ in fixtures:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            decoded, encoding = decoder(data)
+        elapsed += (time.perf_counter() - start) / rounds
+        if decoded.lstrip("\ufeff") == text:
+            correct.append(fixture)
+    return {
+        "decoder": name,
+        "fixtures": len(fixtures),
+        "correct": len(correct),
+        "wrong": sorted({f[0] for f in fixtures} - set(correct)),
+        "ms_per_file": round(elapsed / len(fixtures) * 1000, 2),
+        "mb_per_second": round(sum(len(f[2]) for f in fixtures) / elapsed / 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=800, help="subtitle blocks per fixture")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    fixtures = []
+    for name, line, encoding in FIXTURES:
+        text = make_srt(line, args.blocks)
+        fixtures.append((name, text, text.encode(encoding), encoding))
+
+    decoders = [("decode_subtitle", decode_subtitle), ("utf8_replace", utf8_replace)]
+    try:
+        import charset_normalizer  # noqa: F401
+        decoders.append(("charset_normalizer", charset_normalizer_full))
+    except ImportError:
+        pass
+    for name, decoder in decoders:
+        print(json.dumps(run(name, decoder, fixtures, args.rounds), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Concurrent-request throughput of blocking calls vs the pooled async HttpClient.
+
+Starts a local stub server that answers after a fixed latency and fires N
+concurrent "handlers" at it from one event loop, the way FastAPI runs them.
+'blocking' reproduces the old code path (a synchronous HTTP call inside an
+async function), 'pooled' uses app.utils.http.HttpClient.
+
+    python -m benchmarks.bench_http_client --requests 200 --concurrency 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils.http import HttpClient
+
+
+def start_stub_server(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps({"data": [{"id": "1", "attributes": {}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def measure_loop_lag(stop):
+    # Worst delay seen by a 10ms ticker, i.e. how long the event loop was blocked
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def run(mode, url, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    client = HttpClient(max_per_host=concurrency)
+    # Started up front like the app lifespan does, so client setup is not measured
+    await client.start()
+
+    async def blocking_handler():
+        async with semaphore:
+            with urllib.request.urlopen(url) as response:
+                json.loads(response.read())
+
+    async def pooled_handler():
+        async with semaphore:
+            response = await client.get(url)
+            response.json()
+
+    handler = blocking_handler if mode == "blocking" else pooled_handler
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    lag = await lag_task
+    await client.close()
+    return {
+        "mode": mode,
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "max_loop_lag_ms": round(lag * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub server latency in seconds")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency)
+    url = f"http://127.0.0.1:{server.server_address[1]}/subtitles"
+    try:
+        for mode in ("blocking", "pooled"):
+            print(json.dumps(asyncio.run(run(mode, url, args.requests, args.concurrency))))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
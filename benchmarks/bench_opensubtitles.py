@@ -0,0 +1,100 @@
+"""
+A burst of download-link requests against the local fake OpenSubtitles API,
+with client-side pacing (the token bucket and Retry-After retries) and without
+it (no pacing, no retries, like the client before). Reports how many requests
+got a link, their latency and how many 429s the server had to send.
+
+    python -m benchmarks.bench_opensubtitles --requests 40 --rate 5 --quota 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_api(rate, quota, token_ttl):
+    from benchmarks.fake_opensubtitles import create_app
+
+    app = create_app(rate, quota, token_ttl)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, app, f"http://127.0.0.1:{port}"
+
+
+async def run(mode, requests, server_rate, app):
+    # Imported late so the client picks up the environment set in main()
+    from app.services.opensubtitles import OpenSubtitlesClient, QuotaExceededError
+
+    before = dict(app.state.stats)
+    async with httpx.AsyncClient(timeout=30) as http:
+        if mode == "paced":
+            client = OpenSubtitlesClient(http, rate=server_rate)
+        else:
+            client = OpenSubtitlesClient(http, rate=10_000, max_retries=0)
+        # Log in up front so the burst only measures download links
+        await client.login()
+        await asyncio.sleep(1)
+
+        async def one(file_id):
+            start = time.perf_counter()
+            try:
+                link = await client.download_url(file_id)
+            except QuotaExceededError:
+                link = None
+            return link is not None, time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(n + 1) for n in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(seconds for ok, seconds in results if ok)
+    return {
+        "mode": mode,
+        "requests": requests,
+        "ok": len(latencies),
+        "failed": requests - len(latencies),
+        "seconds": round(elapsed, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1) if latencies else None,
+        "server_429s": app.state.stats["rate_limited"] - before["rate_limited"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--rate", type=int, default=5, help="requests per second the fake API allows")
+    parser.add_argument("--quota", type=int, default=1000)
+    parser.add_argument("--token-ttl", type=float, default=3600)
+    args = parser.parse_args()
+
+    server, app, url = start_fake_api(args.rate, args.quota, args.token_ttl)
+    os.environ["OPENSUBTITLES_BASE_URL"] = url
+    os.environ.setdefault("OPENSUBTITLES_API_KEY", "bench")
+    os.environ.setdefault("OPENSUBTITLES_USERNAME", "bench")
+    os.environ.setdefault("OPENSUBTITLES_PASSWORD", "bench")
+    try:
+        for mode in ("unpaced", "paced"):
+            print(json.dumps(asyncio.run(run(mode, args.requests, args.rate, app))))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
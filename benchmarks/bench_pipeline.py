@@ -0,0 +1,223 @@
+"""
+End-to-end throughput of the /api/process pipeline, fully offline.
+
+Starts the fake Ollama, OpenSubtitles and IMDb servers, then runs the app once
+per concurrency level, each time in a fresh process and working directory (so
+no cache or translation memory carries over between levels). Every simulated
+user follows the frontend: search a title, search its subtitles, queue the
+translation and follow the job stream until it finishes. Uploads are not part
+of the run (no imdb_id is sent). With --languages every file is translated to
+each of them in one job.
+
+Prints one JSON line per level (blocks/s, p50/p95 request latency, LLM calls
+per block, peak RSS) and writes them all to --output for comparing runs.
+
+    python -m benchmarks.bench_pipeline --levels 1,2,4 --requests 8 --latency 0.2 --malformed-rate 0.05
+    python -m benchmarks.bench_pipeline --levels 2 --languages spa,pob,fra
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app):
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))] if values else None
+
+
+async def run_level(concurrency, requests, offset, languages=None):
+    # Runs in the worker process, the environment points the app at the fake servers
+    import app.main as main
+
+    latencies = []
+    blocks = 0
+    llm_calls = 0
+    failed = 0
+    timing = {"prompt_eval_seconds": 0.0, "generation_seconds": 0.0}
+
+    async with main.app.router.lifespan_context(main.app):
+        while not main.warmup.done:
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def user(n):
+                nonlocal blocks, llm_calls, failed
+                async with semaphore:
+                    start = time.perf_counter()
+                    titles = (await client.get("/api/search_media", params={"query": f"bench title {offset + n}"})).json()
+                    title = titles[0]
+                    subtitles = (await client.get("/api/search_subtitles", params={"imdb_id": title["imdb_id"]})).json()
+                    subtitle = subtitles[0]
+                    job = (await client.post("/api/process", json={
+                        "file_id": subtitle["file_id"],
+                        "file_name": subtitle["file_name"],
+                        "title": title["title"],
+                        "languages": languages,
+                    })).json()
+                    # The stream ends when the job does
+                    await client.get(f"/api/jobs/{job['job_id']}/stream")
+                    latencies.append(time.perf_counter() - start)
+                    state = (await client.get(f"/api/jobs/{job['job_id']}")).json()
+                    result = state.get("result") or {}
+                    # One entry per language when several were asked for
+                    stats = [r.get("stats") for r in result.get("languages") or [result]]
+                    if state["status"] != "done" or not all(stats):
+                        failed += 1
+                        return
+                    for language_stats in stats:
+                        blocks += language_stats["blocks"]
+                        llm_calls += language_stats["llm_calls"]
+                        for key in timing:
+                            timing[key] += language_stats["ollama"][key]
+
+            start = time.perf_counter()
+            await asyncio.gather(*(user(n) for n in range(requests)))
+            elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "languages": len(languages) if languages else 1,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "blocks": blocks,
+        "blocks_per_second": round(blocks / elapsed, 2),
+        "p50_latency_s": round(statistics.median(latencies), 3) if latencies else None,
+        "p95_latency_s": round(percentile(latencies, 0.95), 3) if latencies else None,
+        "llm_calls": llm_calls,
+        "llm_calls_per_block": round(llm_calls / blocks, 4) if blocks else None,
+        "ollama_prompt_eval_seconds": round(timing["prompt_eval_seconds"], 3),
+        "ollama_generation_seconds": round(timing["generation_seconds"], 3),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_worker_process(level, args, urls):
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    # The app serves static/ relative to its working directory
+    os.symlink(os.path.join(REPO_ROOT, "static"), os.path.join(work_dir, "static"))
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_ROOT,
+        "OLLAMA_HOSTS": f"{urls['ollama']}|{args.ollama_parallel}",
+        "OPENSUBTITLES_BASE_URL": urls["opensubtitles"],
+        "OPENSUBTITLES_API_KEY": "bench",
+        "OPENSUBTITLES_USERNAME": "bench",
+        "OPENSUBTITLES_PASSWORD": "bench",
+        "OPENSUBTITLES_RATE": "50",
+        "IMDB_SUGGESTION_URL": urls["imdb"],
+        "STREMIO_EMAIL": "",
+        "STREMIO_PASSWORD": "",
+        "JOB_WORKERS": str(level),
+        "JOB_QUEUE_MAX": str(max(100, args.requests)),
+        "LOG_SINK": "file",
+        "LOG_LEVEL": "INFO",
+    }
+    command = [
+        sys.executable, "-m", "benchmarks.bench_pipeline", "--worker",
+        "--concurrency", str(level), "--requests", str(args.requests), "--offset", str(level * 100_000),
+    ]
+    if args.languages:
+        command += ["--languages", args.languages]
+    try:
+        done = subprocess.run(command, cwd=work_dir, env=env, capture_output=True, text=True)
+        if done.returncode != 0:
+            raise RuntimeError(f"worker for level {level} failed:\n{done.stderr[-3000:]}")
+        return json.loads(done.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4", help="comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=8, help="requests per level")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake Ollama seconds per call")
+    parser.add_argument("--token-latency", type=float, default=0.001, help="fake Ollama seconds per generated token")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    parser.add_argument("--ollama-parallel", type=int, default=4, help="calls the fake Ollama serves at once")
+    parser.add_argument("--srt-blocks", type=int, default=None, help="blocks per file (default: varied fixture sizes)")
+    parser.add_argument("--languages", help="comma separated ISO 639-2 codes to translate every file to")
+    parser.add_argument("--output", help="write every result to this JSON file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--concurrency", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--offset", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        languages = args.languages.split(",") if args.languages else None
+        print(json.dumps(asyncio.run(run_level(args.concurrency, args.requests, args.offset, languages))))
+        return
+
+    from benchmarks.fake_imdb import create_app as create_imdb
+    from benchmarks.fake_ollama import create_app as create_ollama
+    from benchmarks.fake_opensubtitles import create_app as create_opensubtitles
+
+    fakes = {
+        "ollama": create_ollama(args.latency, args.token_latency, failure_rate=args.failure_rate,
+                                malformed_rate=args.malformed_rate, parallel=args.ollama_parallel, seed=1),
+        "opensubtitles": create_opensubtitles(rate=50, quota=100_000, srt_blocks=args.srt_blocks),
+        "imdb": create_imdb(),
+    }
+    servers = {}
+    urls = {}
+    for name, app in fakes.items():
+        servers[name], urls[name] = start_server(app)
+
+    results = []
+    try:
+        for level in (int(level) for level in args.levels.split(",")):
+            before = dict(fakes["ollama"].state.stats)
+            result = run_worker_process(level, args, urls)
+            after = fakes["ollama"].state.stats
+            result["ollama_failures"] = after["failed"] - before["failed"]
+            result["ollama_malformed"] = after["malformed"] - before["malformed"]
+            result["ollama_cached_prompt_tokens"] = after["cached_prompt_tokens"] - before["cached_prompt_tokens"]
+            results.append(result)
+            print(json.dumps(result))
+    finally:
+        for server in servers.values():
+            server.should_exit = True
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k not in ("worker", "concurrency", "offset")},
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Time and peak memory of the streaming subtitle parser against the previous
+list-of-dicts parser, on a generated multi-episode SRT.
+
+    python -m benchmarks.bench_srt_parser --episodes 20 --blocks 1000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from app.utils.subtitles import iter_srt, format_srt
+
+
+def legacy_parse(content):
+    # TranslatorService._parse_srt before the streaming parser, kept for comparison
+    content = content.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [l.strip() for l in content.split('\n')]
+    blocks = []
+    current_block = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        clean_line = line.strip().replace('﻿', '')
+        is_header = False
+        if clean_line.isdigit() and (i + 1 < len(lines)):
+            if '-->' in lines[i + 1]:
+                is_header = True
+        if is_header:
+            if current_block:
+                current_block['original_text'] = "\n".join(current_block['text_lines'])
+                del current_block['text_lines']
+                blocks.append(current_block)
+            current_block = {'index': clean_line, 'time': lines[i + 1], 'text_lines': []}
+            i += 2
+            continue
+        if current_block is not None:
+            if line:
+                current_block['text_lines'].append(line)
+        i += 1
+    if current_block:
+        current_block['original_text'] = "\n".join(current_block['text_lines'])
+        del current_block['text_lines']
+        blocks.append(current_block)
+    return blocks
+
+
+def legacy_reconstruct(blocks):
+    output = []
+    for b in blocks:
+        text = b.get('translated_text', b['original_text'])
+        output.append(f"{b['index']}\n{b['time']}\n{text}")
+    return "\n\n".join(output)
+
+
+def make_srt(episodes, blocks_per_episode):
+    # Episodes concatenated with restarting indexes, like a season pack merged into one file
+    parts = []
+    for episode in range(episodes):
+        for n in range(1, blocks_per_episode + 1):
+            ms = n * 2500
+            start = f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+            ms += 2000
+            end = f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+            parts.append(f"{n}\r\n{start} --> {end}\r\nEpisode {episode} line {n}, <i>with some dialogue</i>\r\n- And a reply.\r\n")
+    return "\r\n".join(parts)
+
+
+def measure(name, fn, content):
+    # Timed and traced in separate runs, tracemalloc slows allocation-heavy code down several times
+    start = time.perf_counter()
+    count = fn(content)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"parser": name, "blocks": count, "seconds": round(elapsed, 4), "peak_mb": round(peak / 1024 / 1024, 2)}
+
+
+def run_legacy(content):
+    blocks = legacy_parse(content)
+    legacy_reconstruct(blocks)
+    return len(blocks)
+
+
+def run_streaming(content):
+    blocks = list(iter_srt(content))
+    format_srt(blocks)
+    return len(blocks)
+
+
+def run_streaming_count(content):
+    # Pure streaming: blocks are consumed one at a time and never held together
+    return sum(1 for _ in iter_srt(content))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--blocks", type=int, default=1000, help="blocks per episode")
+    args = parser.parse_args()
+
+    content = make_srt(args.episodes, args.blocks)
+    print(json.dumps({"input_mb": round(len(content) / 1024 / 1024, 2)}))
+    for name, fn in (("legacy", run_legacy), ("streaming", run_streaming), ("streaming_count", run_streaming_count)):
+        print(json.dumps(measure(name, fn, content)))
+
+
+if __name__ == "__main__":
+    main()
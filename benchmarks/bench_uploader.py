@@ -0,0 +1,97 @@
+"""
+Upload latency of StremioUploader against the local fake Stremio site.
+
+Needs the Playwright Chromium build (playwright install chromium).
+
+    python -m benchmarks.bench_uploader --uploads 10 --latency 0.2 --failure-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+import uvicorn
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_site(latency, failure_rate):
+    from benchmarks.fake_stremio import create_app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(latency, failure_rate), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def run(uploads, work_dir):
+    # Imported late so the uploader picks up the environment set in main()
+    from app.services.uploader import StremioUploader
+
+    srt_path = os.path.join(work_dir, "bench.srt")
+    with open(srt_path, "w", encoding="utf-8") as f:
+        f.write("1\n00:00:01,000 --> 00:00:02,000\nHola\n")
+
+    uploader = StremioUploader()
+    start = time.perf_counter()
+    await uploader.start()
+    startup = time.perf_counter() - start
+
+    async def one(n):
+        t0 = time.perf_counter()
+        result = await uploader.upload_subtitle(srt_path, f"tt{1000000 + n}")
+        return time.perf_counter() - t0, result.reason
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(n) for n in range(uploads)))
+    elapsed = time.perf_counter() - start
+    await uploader.close()
+
+    latencies = sorted(r[0] for r in results)
+    reasons = {}
+    for _, reason in results:
+        reasons[reason] = reasons.get(reason, 0) + 1
+    return {
+        "uploads": uploads,
+        "browser_startup_s": round(startup, 3),
+        "total_s": round(elapsed, 3),
+        "p50_s": round(statistics.median(latencies), 3),
+        "p95_s": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3),
+        "reasons": reasons,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake site latency for the upload POST")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_site(args.latency, args.failure_rate)
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ.update({
+            "STREMIO_BASE_URL": base_url,
+            "STREMIO_EMAIL": "bench@example.com",
+            "STREMIO_PASSWORD": "bench",
+            "STREMIO_SESSION_PATH": os.path.join(work_dir, "session.json"),
+        })
+        try:
+            print(json.dumps(asyncio.run(run(args.uploads, work_dir))))
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
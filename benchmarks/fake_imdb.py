@@ -0,0 +1,59 @@
+"""
+Local stand-in for the IMDb suggestion endpoint (/{first letter}/{query}.json).
+
+Answers every query with up to 8 made-up titles whose ids depend only on the
+query, so the same search always finds the same titles.
+
+    python -m benchmarks.fake_imdb --port 8302 --latency 0.05
+"""
+import argparse
+import asyncio
+import zlib
+
+import uvicorn
+from fastapi import FastAPI
+
+PAGE_SIZE = 8
+
+
+def create_app(latency=0.05):
+    app = FastAPI()
+    app.state.stats = {"requests": 0}
+
+    @app.get("/{first}/{query}.json")
+    async def suggestion(first: str, query: str):
+        app.state.stats["requests"] += 1
+        await asyncio.sleep(latency)
+        base = zlib.crc32(query.encode()) % 9_000_000 + 1_000_000
+        kinds = ("feature", "TV series")
+        return {
+            "d": [
+                {
+                    "id": f"tt{base + n:07d}",
+                    "l": f"{query.title()} {n + 1}" if n else query.title(),
+                    "y": 1990 + (base + n) % 35,
+                    "q": kinds[n % 2],
+                    "i": {"imageUrl": f"https://example.invalid/{base + n}.jpg"},
+                }
+                for n in range(PAGE_SIZE)
+            ],
+            "q": query,
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8302)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
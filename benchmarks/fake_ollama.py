@@ -0,0 +1,172 @@
+"""
+Local stand-in for an Ollama server running one model.
+
+Answers /api/chat like a model that follows the ITEM_N prompt: every item
+comes back "translated". Calls take a fixed latency plus a per-token
+generation time, only --parallel of them run at once (OLLAMA_NUM_PARALLEL),
+and a share of them fail with a 500 or come back malformed (items missing or
+without their ITEM_N prefix). A system prompt seen recently is not evaluated
+again, like Ollama's prompt cache. /api/show returns model details and
+model_info, as the health probe expects. When a model name is given, other
+models are answered with a 404 like a model that was never pulled.
+
+    python -m benchmarks.fake_ollama --port 11435 --latency 0.3 --token-latency 0.002 --failure-rate 0.02 --malformed-rate 0.05
+"""
+import argparse
+import asyncio
+import random
+import re
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+ITEM_RE = re.compile(r'^ITEM_(\d+):\s*(.*)$', re.MULTILINE)
+# System prompts kept "evaluated", per server
+PROMPT_CACHE_SIZE = 16
+
+
+def count_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def translate(text):
+    # Recognisably different from the source, tags and [BR] kept in place
+    return " ".join(f"{word}-es" if word.isalpha() else word for word in text.split(" "))
+
+
+def create_app(latency=0.3, token_latency=0.002, prompt_token_latency=0.0002, failure_rate=0.0,
+               malformed_rate=0.0, parallel=4, load_seconds=1.0, seed=None, model=None):
+    app = FastAPI()
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(parallel)
+    prompt_cache = OrderedDict()
+    state = {"loaded": False}
+    app.state.stats = {"chat": 0, "failed": 0, "malformed": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "generated_tokens": 0}
+
+    def now():
+        return datetime.now(timezone.utc).isoformat()
+
+    def unknown_model(body):
+        if model and body.get("model") != model:
+            return JSONResponse({"error": f"model '{body.get('model')}' not found"}, status_code=404)
+        return None
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        stats = app.state.stats
+        stats["chat"] += 1
+        missing = unknown_model(body)
+        if missing is not None:
+            return missing
+        async with slots:
+            load = 0.0
+            if not state["loaded"]:
+                load = load_seconds
+                state["loaded"] = True
+                await asyncio.sleep(load)
+
+            if rng.random() < failure_rate:
+                stats["failed"] += 1
+                await asyncio.sleep(latency)
+                return JSONResponse({"error": "model runner has unexpectedly stopped"}, status_code=500)
+
+            messages = body.get("messages", [])
+            system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+            user = messages[-1]["content"] if messages else ""
+            prompt_tokens = count_tokens(system) + count_tokens(user)
+            evaluated = prompt_tokens
+            if system in prompt_cache:
+                prompt_cache.move_to_end(system)
+                evaluated -= count_tokens(system)
+                stats["cached_prompt_tokens"] += count_tokens(system)
+            else:
+                prompt_cache[system] = True
+                if len(prompt_cache) > PROMPT_CACHE_SIZE:
+                    prompt_cache.popitem(last=False)
+
+            items = ITEM_RE.findall(user)
+            lines = [f"ITEM_{n}: {translate(text)}" for n, text in items]
+            if lines and rng.random() < malformed_rate:
+                stats["malformed"] += 1
+                if len(lines) > 1:
+                    # Drop about a third of the items
+                    lines = [line for line in lines if rng.random() > 0.33] or lines[:1]
+                else:
+                    lines = ["Here is the translation:", lines[0].split(": ", 1)[1]]
+            content = "\n".join(lines) if lines else translate(user)
+
+            generated = count_tokens(content)
+            prompt_seconds = evaluated * prompt_token_latency
+            generation_seconds = latency + generated * token_latency
+            await asyncio.sleep(prompt_seconds + generation_seconds)
+
+        stats["prompt_tokens"] += evaluated
+        stats["generated_tokens"] += generated
+        return {
+            "model": body.get("model"),
+            "created_at": now(),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((load + prompt_seconds + generation_seconds) * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": int(prompt_seconds * 1e9),
+            "eval_count": generated,
+            "eval_duration": int(generation_seconds * 1e9),
+        }
+
+    @app.post("/api/show")
+    async def show(request: Request):
+        body = await request.json()
+        missing = unknown_model(body)
+        if missing is not None:
+            return missing
+        return {
+            "modelfile": f"FROM {body.get('model')}",
+            "parameters": "temperature 0.1",
+            "template": "{{ .Prompt }}",
+            "details": {"format": "gguf", "family": "llama", "parameter_size": "3.2B", "quantization_level": "Q4_K_M"},
+            "model_info": {"general.architecture": "llama", "llama.context_length": 131072},
+            "modified_at": now(),
+        }
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": []}
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-fake"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return app.state.stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds added to every call")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="seconds per generated token")
+    parser.add_argument("--prompt-token-latency", type=float, default=0.0002, help="seconds per evaluated prompt token")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--parallel", type=int, default=4, help="calls served at once")
+    parser.add_argument("--load-seconds", type=float, default=1.0, help="model load time of the first call")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency, args.token_latency, args.prompt_token_latency, args.failure_rate,
+                   args.malformed_rate, args.parallel, args.load_seconds),
+        host="127.0.0.1", port=args.port, log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Local stand-in for the OpenSubtitles REST API.
+
+Implements /login, /subtitles, /download and the file links it hands out,
+with the behaviour the client has to cope with: a per-second rate limit
+answered with 429 + Retry-After, login tokens that expire, a daily
+download quota answered with 406, and search results split into pages.
+
+    python -m benchmarks.fake_opensubtitles --port 8301 --rate 5 --quota 100 --token-ttl 3600
+"""
+import argparse
+import base64
+import json
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from benchmarks.srt_fixtures import fixture_for, make_fixture
+
+EPISODES_PER_SEASON = 10
+# Results per search page, like the real API
+PAGE_SIZE = 60
+
+
+def make_token(ttl):
+    # Unsigned JWT, the client only reads the expiry
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+    return f"{encode({'alg': 'none'})}.{encode({'exp': int(time.time() + ttl), 'jti': uuid.uuid4().hex})}.x"
+
+
+def create_app(rate=5, quota=100, token_ttl=3600, srt_blocks=None, episodes=EPISODES_PER_SEASON, page_size=PAGE_SIZE):
+    app = FastAPI()
+    app.state.tokens = {}
+    app.state.window = [0, 0]  # [second, requests in it]
+    app.state.downloads = 0
+    app.state.stats = {"requests": 0, "rate_limited": 0, "unauthorized": 0, "quota_exceeded": 0}
+    # File links point back at this server
+    base_url = {}
+
+    @app.middleware("http")
+    async def rate_limit(request: Request, call_next):
+        if request.url.path.startswith("/files/"):
+            return await call_next(request)
+        app.state.stats["requests"] += 1
+        second = int(time.time())
+        if app.state.window[0] != second:
+            app.state.window = [second, 0]
+        app.state.window[1] += 1
+        if app.state.window[1] > rate:
+            app.state.stats["rate_limited"] += 1
+            return JSONResponse({"message": "Throttle limit reached"}, status_code=429, headers={"Retry-After": "1"})
+        base_url.setdefault("url", str(request.base_url).rstrip("/"))
+        return await call_next(request)
+
+    def authorized(request):
+        token = request.headers.get("authorization", "").removeprefix("Bearer ")
+        expires = app.state.tokens.get(token)
+        return expires is not None and expires > time.time()
+
+    @app.post("/login")
+    async def login():
+        token = make_token(token_ttl)
+        app.state.tokens[token] = time.time() + token_ttl
+        return {
+            "token": token,
+            "user": {"allowed_downloads": quota, "remaining_downloads": quota - app.state.downloads},
+            "status": 200,
+        }
+
+    @app.get("/subtitles")
+    async def subtitles(request: Request):
+        params = request.query_params
+        season = int(params.get("season_number", 1))
+        if params.get("parent_imdb_id"):
+            wanted = [int(params["episode_number"])] if params.get("episode_number") else range(1, episodes + 1)
+            found = [(season, e) for e in wanted if 1 <= e <= episodes]
+        else:
+            found = [(None, None)]
+        data = []
+        for n, (s, e) in enumerate(found):
+            file_id = zlib.crc32(f"{params.get('imdb_id')}|{params.get('parent_imdb_id')}|{s}|{e}".encode()) % 10_000_000
+            data.append({
+                "id": str(file_id),
+                "attributes": {
+                    "language": "en",
+                    "download_count": 1000 - n,
+                    "files": [{"file_id": file_id, "file_name": f"Show.S{s or 1:02d}E{e or 1:02d}.srt"}],
+                    "feature_details": {"season_number": s, "episode_number": e, "movie_name": "Fake", "year": 2020},
+                },
+            })
+        page = int(params.get("page", 1))
+        total_pages = max(1, -(-len(data) // page_size))
+        return {
+            "data": data[(page - 1) * page_size:page * page_size],
+            "total_count": len(data),
+            "total_pages": total_pages,
+            "page": page,
+        }
+
+    @app.post("/download")
+    async def download(request: Request):
+        if not authorized(request):
+            app.state.stats["unauthorized"] += 1
+            return JSONResponse({"message": "You cannot consume this service"}, status_code=401)
+        reset = datetime.fromtimestamp(time.time() + 3600, timezone.utc).isoformat().replace("+00:00", "Z")
+        if app.state.downloads >= quota:
+            app.state.stats["quota_exceeded"] += 1
+            return JSONResponse(
+                {"message": f"You have downloaded your allowed {quota} subtitles", "remaining": 0, "reset_time_utc": reset},
+                status_code=406,
+            )
+        app.state.downloads += 1
+        file_id = (await request.json())["file_id"]
+        return {
+            "link": f"{base_url.get('url', '')}/files/{file_id}.srt",
+            "remaining": quota - app.state.downloads,
+            "reset_time_utc": reset,
+        }
+
+    @app.get("/files/{file_id}.srt")
+    async def file(file_id: int):
+        # A fixed size when asked for, otherwise the varied sizes of the fixture corpus
+        content = make_fixture(srt_blocks, seed=file_id) if srt_blocks else fixture_for(file_id)
+        return PlainTextResponse(content)
+
+    @app.get("/stats")
+    async def stats():
+        return {**app.state.stats, "downloads": app.state.downloads}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8301)
+    parser.add_argument("--rate", type=int, default=5, help="requests per second before 429")
+    parser.add_argument("--quota", type=int, default=100, help="downloads before 406")
+    parser.add_argument("--token-ttl", type=float, default=3600)
+    parser.add_argument("--srt-blocks", type=int, default=None, help="blocks per file (default: varied fixture sizes)")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.rate, args.quota, args.token_ttl, srt_blocks=args.srt_blocks),
+        host="127.0.0.1", port=args.port, log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
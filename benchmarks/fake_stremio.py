@@ -0,0 +1,131 @@
+"""
+Local stand-in for the Stremio Community Subtitles site.
+
+Serves the login and upload forms with the field names the uploader fills,
+answers the upload POST after a configurable latency and renders a success
+or error flash message, so StremioUploader can be exercised offline. The
+upload page also POSTs an analytics beacon on submit, which answers first.
+
+    python -m benchmarks.fake_stremio --port 8300 --latency 0.2 --failure-rate 0.1
+"""
+import argparse
+import asyncio
+import random
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><body>
+<form method="post" action="/login">
+    <input type="email" name="email">
+    <input type="password" name="password">
+    <button type="submit">Login</button>
+</form>
+</body></html>"""
+
+UPLOAD_PAGE = """<!DOCTYPE html>
+<html><body>
+{flash}
+<form method="post" action="/content/upload" enctype="multipart/form-data">
+    <input type="text" name="content_id" id="content_id">
+    <select id="content_type" name="content_type">
+        <option value="movie">Movie</option>
+        <option value="series">Series</option>
+    </select>
+    <input type="number" name="season_number" id="season_number">
+    <input type="number" name="episode_number" id="episode_number">
+    <select id="language" name="language">
+        <option value="eng">English</option>
+        <option value="spa">Spanish</option>
+        <option value="por">Portuguese</option>
+    </select>
+    <input type="file" id="subtitle_file" name="subtitle_file">
+    <button type="submit">Upload</button>
+</form>
+<script>
+// Submitting also POSTs an analytics beacon, as many sites do
+document.querySelector("form").addEventListener("submit", () => {{
+    fetch("/api/telemetry", {{method: "POST", body: "upload"}});
+}});
+</script>
+</body></html>"""
+
+SUCCESS_PAGE = """<!DOCTYPE html>
+<html><body><div class="alert alert-success">Subtitle uploaded successfully</div></body></html>"""
+
+
+def create_app(latency=0.2, failure_rate=0.0, password=None):
+    app = FastAPI()
+    app.state.sessions = set()
+    app.state.uploads = []
+
+    def logged_in(request):
+        return request.cookies.get("session") in app.state.sessions
+
+    @app.get("/login", response_class=HTMLResponse)
+    async def login_form():
+        return LOGIN_PAGE
+
+    @app.post("/login")
+    async def login(request: Request):
+        form = await request.form()
+        if password is not None and form.get("password") != password:
+            return HTMLResponse(LOGIN_PAGE, status_code=401)
+        session = uuid.uuid4().hex
+        app.state.sessions.add(session)
+        response = RedirectResponse("/", status_code=303)
+        response.set_cookie("session", session)
+        return response
+
+    @app.get("/", response_class=HTMLResponse)
+    async def home():
+        return "<html><body>Home</body></html>"
+
+    @app.get("/content/upload")
+    async def upload_form(request: Request):
+        if not logged_in(request):
+            return RedirectResponse("/login", status_code=303)
+        return HTMLResponse(UPLOAD_PAGE.format(flash=""))
+
+    @app.post("/content/upload")
+    async def upload(request: Request):
+        if not logged_in(request):
+            return RedirectResponse("/login", status_code=303)
+        form = await request.form()
+        await asyncio.sleep(latency)
+        upload_file = form.get("subtitle_file")
+        if not form.get("content_id") or upload_file is None or random.random() < failure_rate:
+            flash = '<div class="alert alert-danger">Upload rejected</div>'
+            return HTMLResponse(UPLOAD_PAGE.format(flash=flash), status_code=200)
+        app.state.uploads.append({
+            "content_id": form.get("content_id"),
+            "language": form.get("language"),
+            "size": len(await upload_file.read()),
+        })
+        return RedirectResponse("/content/uploaded", status_code=303)
+
+    @app.post("/api/telemetry")
+    async def telemetry():
+        return Response(status_code=204)
+
+    @app.get("/content/uploaded", response_class=HTMLResponse)
+    async def uploaded():
+        return SUCCESS_PAGE
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8300)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.failure_rate), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
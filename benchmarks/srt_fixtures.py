@@ -0,0 +1,93 @@
+"""
+Generated SRT corpus for the offline benchmarks.
+
+Files are built from dialogue templates with a seeded random generator, so the
+same seed always gives the same file. Like real subtitles they mix short and
+two-line cues, italics and a share of lines that repeat within and across
+files ("(sighs)", "What?").
+
+    python -m benchmarks.srt_fixtures --size episode --seed 1 > episode.srt
+"""
+import argparse
+import random
+
+# Blocks per fixture size
+SIZES = {"short": 120, "episode": 450, "long_episode": 800, "movie": 1400}
+
+NAMES = ("Walter", "Jesse", "Skyler", "Hank", "Marie", "Saul", "Mike", "Gus", "Lydia", "Todd", "Jane", "Andrea")
+THINGS = (
+    "the car", "the money", "the lab", "the phone", "the house", "the truck", "the warehouse", "the gun",
+    "the keys", "the documents", "the boat", "the briefcase", "the report", "the photos", "the tapes",
+)
+PLACES = ("the office", "the desert", "Albuquerque", "the hospital", "the motel", "the border", "the airport", "downtown")
+TEMPLATES = (
+    "{name}, where did you put {thing}?",
+    "I told you to stay away from {place}.",
+    "We need to get {thing} out of here before {name} finds out.",
+    "You think {name} doesn't know about {thing}?",
+    "Meet me at {place} in twenty minutes.",
+    "I'm not going back to {place}, not after what happened.",
+    "Did {name} say anything about {thing}?",
+    "This has nothing to do with {name}.",
+    "If anyone asks, we were at {place} all night.",
+    "Just give me {thing} and nobody gets hurt.",
+    "How long have you known about {place}?",
+    "{name}, listen to me. Listen!",
+    "I can't believe you brought {thing} here.",
+    "Call {name} and tell him we're on our way.",
+    "Nobody goes near {thing} until I say so.",
+    "What were you doing at {place}?",
+)
+# Short cues that come back again and again, in every file
+COMMON = (
+    "(sighs)", "What?", "Yeah.", "No.", "Okay.", "Thank you.", "I don't know.", "Come on.",
+    "(phone ringing)", "♪ ♪", "Hey.", "Let's go.", "Are you okay?", "(door closes)", "Wait.",
+)
+
+
+def make_line(rng):
+    template = rng.choice(TEMPLATES)
+    return template.format(name=rng.choice(NAMES), thing=rng.choice(THINGS), place=rng.choice(PLACES))
+
+
+def make_fixture(blocks, seed=0):
+    """An SRT file of blocks cues, identical for the same seed."""
+    rng = random.Random(seed)
+    parts = []
+    ms = 1000
+    for n in range(1, blocks + 1):
+        roll = rng.random()
+        if roll < 0.2:
+            text = rng.choice(COMMON)
+        elif roll < 0.45:
+            text = f"{make_line(rng)}\n{make_line(rng)}"
+        elif roll < 0.5:
+            text = f"<i>{make_line(rng)}</i>"
+        else:
+            text = make_line(rng)
+        duration = rng.randint(900, 4000)
+        parts.append(f"{n}\n{format_ms(ms)} --> {format_ms(ms + duration)}\n{text}")
+        ms += duration + rng.randint(100, 2500)
+    return "\n\n".join(parts) + "\n"
+
+
+def format_ms(ms):
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+
+def fixture_for(file_id):
+    """The fixture a fake API serves for file_id: sizes cycle through SIZES, the text depends on the id."""
+    blocks = list(SIZES.values())[file_id % len(SIZES)]
+    return make_fixture(blocks, seed=file_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=SIZES, default="episode")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(make_fixture(SIZES[args.size], args.seed), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+import app.services.jobs as jobs
+from app.services.jobs import JobQueue
+
+
+def make_queue(tmp_path, handler, **kwargs):
+    queue = JobQueue({"work": handler}, path=str(tmp_path / "jobs.db"), workers=1, **kwargs)
+    writes = []
+    write = queue._write
+
+    def counting_write(rows):
+        writes.append(rows)
+        write(rows)
+
+    queue._write = counting_write
+    return queue, writes
+
+
+async def wait_finished(queue, job_id):
+    while not (await queue.get(job_id)).finished:
+        await asyncio.sleep(0.01)
+    return await queue.get(job_id)
+
+
+def test_progress_writes_are_coalesced(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_PROGRESS_SAVE_INTERVAL", 0.05)
+
+    async def handler(job):
+        job.set_stage("translating")
+        for n in range(1, 201):
+            job.set_progress(n, 200)
+            if n % 50 == 0:
+                await asyncio.sleep(0.06)
+        return {"ok": True}
+
+    async def run():
+        queue, writes = make_queue(tmp_path, handler)
+        await queue.start()
+        job = await queue.submit("work", {})
+        finished = await wait_finished(queue, job.id)
+        await queue.stop()
+        return finished, writes
+
+    job, writes = asyncio.run(run())
+    assert job.status == "done" and job.result == {"ok": True}
+    assert (job.done, job.total) == (200, 200)
+    # submit, running, stage, a few progress writes and the final state, not one per update
+    assert len(writes) < 12
+
+
+def test_progress_waiting_for_its_interval_is_written_on_stop(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_PROGRESS_SAVE_INTERVAL", 60)
+
+    async def handler(job):
+        job.set_progress(3, 10)
+        await asyncio.sleep(60)
+
+    async def run():
+        queue, _ = make_queue(tmp_path, handler)
+        await queue.start()
+        job = await queue.submit("work", {})
+        while job.done != 3:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job.id
+
+    job_id = asyncio.run(run())
+    reopened, _ = make_queue(tmp_path, None)
+    job = asyncio.run(reopened.get(job_id))
+    assert (job.status, job.done, job.total) == ("running", 3, 10)
+
+
+def test_old_finished_jobs_are_pruned(tmp_path):
+    async def handler(job):
+        return {}
+
+    async def run():
+        queue, _ = make_queue(tmp_path, handler, max_age_days=1)
+        await queue.start()
+        old = await queue.submit("work", {})
+        recent = await queue.submit("work", {})
+        await wait_finished(queue, old.id)
+        await wait_finished(queue, recent.id)
+        await queue.stop()
+        aged = await queue.get(old.id)
+        aged.updated_at = time.time() - 2 * 86400
+        queue._write([queue._row(aged)])
+        return queue, old.id, recent.id
+
+    queue, old_id, recent_id = asyncio.run(run())
+    assert queue._prune() == 1
+    assert asyncio.run(queue.get(old_id)) is None
+    assert asyncio.run(queue.get(recent_id)) is not None
+
+
+def test_endpoints_do_not_touch_sqlite_on_the_event_loop(tmp_path):
+    async def handler(job):
+        return {}
+
+    async def run():
+        queue, _ = make_queue(tmp_path, handler)
+        loop_thread = threading.current_thread()
+        on_loop = []
+        for name in ("_write", "_query"):
+            original = getattr(queue, name)
+
+            def watched(*args, original=original, name=name):
+                if threading.current_thread() is loop_thread:
+                    on_loop.append(name)
+                return original(*args)
+
+            setattr(queue, name, watched)
+
+        await queue.start()
+        job = await queue.submit("work", {})
+        await wait_finished(queue, job.id)
+        listed = await queue.list()
+        retried = await queue.retry(job.id)
+        await wait_finished(queue, retried.id)
+        await queue.stop()
+        return on_loop, listed, job.id
+
+    on_loop, listed, job_id = asyncio.run(run())
+    assert on_loop == []
+    assert [(job.id, job.status) for job in listed] == [(job_id, "done")]
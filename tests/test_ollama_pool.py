@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import pytest
+from ollama import ResponseError
+
+from app.services.ollama_pool import NoHealthyBackendError, OllamaPool
+from benchmarks.bench_pipeline import free_port, start_server
+from benchmarks.fake_ollama import create_app
+
+MODEL = "llama3.2:latest"
+REQUEST = {"model": MODEL, "messages": [{"role": "user", "content": "ITEM_1: Hello"}]}
+
+
+@pytest.fixture(scope="module")
+def good():
+    app = create_app(latency=0, token_latency=0, prompt_token_latency=0, load_seconds=0, model=MODEL)
+    server, url = start_server(app)
+    yield app, url
+    server.should_exit = True
+
+
+@pytest.fixture(scope="module")
+def failing():
+    app = create_app(latency=0, load_seconds=0, failure_rate=1.0, model=MODEL)
+    server, url = start_server(app)
+    yield app, url
+    server.should_exit = True
+
+
+@pytest.fixture
+def down():
+    # Nothing listens there
+    return f"http://127.0.0.1:{free_port()}"
+
+
+def hosts(*urls):
+    return ",".join(f"{url}|2" for url in urls)
+
+
+def test_pick_prefers_least_loaded_healthy_backend():
+    pool = OllamaPool(MODEL, hosts=hosts("http://a", "http://b", "http://c"))
+    a, b, c = pool.backends
+    a.inflight, b.inflight, c.inflight = 2, 1, 0
+    c.healthy = False
+    assert pool._pick(set()) is b
+    assert pool._pick({b}) is a
+    # With every healthy backend excluded the unhealthy one is still tried
+    assert pool._pick({a, b}) is c
+    assert pool._pick({a, b, c}) is None
+
+
+def test_chat_fails_over_on_server_error(good, failing):
+    async def run():
+        pool = OllamaPool(MODEL, hosts=hosts(failing[1], good[1]))
+        response = await pool.chat(**REQUEST)
+        return pool, response
+
+    pool, response = asyncio.run(run())
+    assert response["message"]["content"] == "ITEM_1: Hello-es"
+    assert [b.healthy for b in pool.backends] == [False, True]
+    assert "500" in pool.backends[0].last_error
+
+
+def test_chat_fails_over_on_connection_error(good, down):
+    async def run():
+        pool = OllamaPool(MODEL, hosts=hosts(down, good[1]))
+        await pool.chat(**REQUEST)
+        return pool
+
+    pool = asyncio.run(run())
+    assert [b.healthy for b in pool.backends] == [False, True]
+
+
+def test_chat_raises_when_every_backend_fails(failing, down):
+    async def run():
+        pool = OllamaPool(MODEL, hosts=hosts(failing[1], down))
+        with pytest.raises((ResponseError, ConnectionError)):
+            await pool.chat(**REQUEST)
+        return pool
+
+    pool = asyncio.run(run())
+    assert not any(b.healthy for b in pool.backends)
+
+
+def test_client_error_does_not_mark_backend_unhealthy(good):
+    app, url = good
+    other = create_app(latency=0, load_seconds=0, model=MODEL)
+    server, other_url = start_server(other)
+    try:
+        async def run():
+            pool = OllamaPool(MODEL, hosts=hosts(url, other_url))
+            with pytest.raises(ResponseError) as error:
+                await pool.chat(**{**REQUEST, "model": "missing"})
+            return pool, error.value
+
+        pool, error = asyncio.run(run())
+    finally:
+        server.should_exit = True
+    assert error.status_code == 404
+    assert all(b.healthy for b in pool.backends)
+    # A refused request is not sent to the other backend
+    assert other.state.stats["chat"] == 0
+
+
+def test_bad_answer_does_not_mark_backend_unhealthy():
+    class BrokenClient:
+        async def chat(self, **kwargs):
+            raise ValueError("invalid JSON in the answer")
+
+    async def run():
+        pool = OllamaPool(MODEL, hosts=hosts("http://a"))
+        pool.backends[0].client = BrokenClient()
+        with pytest.raises(ValueError):
+            await pool.chat(**REQUEST)
+        return pool
+
+    assert asyncio.run(run()).backends[0].healthy
+
+
+def test_ensure_available_probes_and_recovers(good, down):
+    async def run():
+        pool = OllamaPool(MODEL, hosts=hosts(down, good[1]))
+        # As left behind by a failed call, without the health monitor running
+        for backend in pool.backends:
+            backend.healthy = False
+            backend.last_check = time.time()
+        await pool.ensure_available()
+        return pool
+
+    pool = asyncio.run(run())
+    assert [b.healthy for b in pool.backends] == [False, True]
+    assert all(b.last_check for b in pool.backends)
+
+
+def test_ensure_available_raises_when_nothing_answers(down):
+    async def run():
+        pool = OllamaPool(MODEL, hosts=hosts(down))
+        pool.backends[0].healthy = False
+        await pool.ensure_available()
+
+    with pytest.raises(NoHealthyBackendError):
+        asyncio.run(run())
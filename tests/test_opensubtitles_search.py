@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+import app.services.opensubtitles as opensubtitles
+from app.services.opensubtitles import OpenSubtitlesClient
+from app.utils.http import HttpClient
+from benchmarks.bench_pipeline import start_server
+from benchmarks.fake_opensubtitles import create_app
+
+
+@pytest.fixture(scope="module")
+def fake_api():
+    server, url = start_server(create_app(rate=1000, episodes=25, page_size=10))
+    yield url
+    server.should_exit = True
+
+
+def search(fake_api, monkeypatch, **kwargs):
+    monkeypatch.setattr(opensubtitles, "BASE_URL", fake_api)
+    monkeypatch.setattr(opensubtitles, "API_KEY", "test-key")
+
+    async def run():
+        http = HttpClient()
+        await http.start()
+        try:
+            return await OpenSubtitlesClient(http).search(parent_imdb_id="tt1", season_number=1, **kwargs)
+        finally:
+            await http.close()
+
+    return asyncio.run(run())
+
+
+def test_first_page_only_by_default(fake_api, monkeypatch):
+    assert len(search(fake_api, monkeypatch)) == 10
+
+
+def test_all_pages_reads_every_episode(fake_api, monkeypatch):
+    results = search(fake_api, monkeypatch, all_pages=True)
+    assert sorted(r["episode_number"] for r in results) == list(range(1, 26))
+
+
+def test_all_pages_stops_at_the_page_limit(fake_api, monkeypatch):
+    monkeypatch.setattr(opensubtitles, "SEARCH_MAX_PAGES", 2)
+    assert len(search(fake_api, monkeypatch, all_pages=True)) == 20
+
+
+def test_search_one_episode(fake_api, monkeypatch):
+    results = search(fake_api, monkeypatch, episode_number=17)
+    assert [r["episode_number"] for r in results] == [17]
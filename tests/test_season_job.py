@@ -0,0 +1,66 @@
+import asyncio
+import importlib
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def main(tmp_path_factory):
+    # The app opens its stores under cache/ and serves static/ relative to the working directory
+    workdir = tmp_path_factory.mktemp("app")
+    (workdir / "static").mkdir()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        yield importlib.import_module("app.main")
+    finally:
+        os.chdir(cwd)
+
+
+class FakeJob:
+    def __init__(self, payload):
+        self.payload = payload
+        self.result = None
+
+    def set_stage(self, stage):
+        pass
+
+    def set_progress(self, done, total):
+        pass
+
+    def publish(self, event, data):
+        pass
+
+
+def test_explicit_episodes_are_uploaded_as_series_of_the_season(main, monkeypatch):
+    processed = []
+
+    async def process_file(request, set_stage, **kwargs):
+        processed.append(request)
+        return {"status": "success", "message": "ok"}
+
+    async def ensure_available():
+        pass
+
+    monkeypatch.setattr(main, "process_file", process_file)
+    monkeypatch.setattr(main.translator.pool, "ensure_available", ensure_available)
+    payload = {
+        "imdb_id": "tt0903747",
+        "title": "Breaking Bad",
+        "year": 2008,
+        "season_number": 2,
+        "languages": ["spa"],
+        "episodes": [
+            {"file_id": 1, "file_name": "S02E01.srt", "episode_number": 1},
+            {"file_id": 2, "file_name": "S02E02.srt", "episode_number": 2, "year": "2009", "season_number": 3},
+        ],
+    }
+
+    result = asyncio.run(main.run_season_job(FakeJob(payload)))
+
+    assert result["status"] == "success"
+    assert [(r.content_type, r.imdb_id, r.title, r.year, r.season_number, r.languages) for r in processed] == [
+        ("series", "tt0903747", "Breaking Bad", 2008, 2, ["spa"]),
+        ("series", "tt0903747", "Breaking Bad", "2009", 3, ["spa"]),
+    ]
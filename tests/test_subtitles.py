@@ -0,0 +1,43 @@
+from app.utils.subtitles import iter_blocks, iter_srt, format_srt
+
+
+def test_srt_timing_without_milliseconds_starts_a_cue():
+    content = "1\n00:00:01,000 --> 00:00:02,500\nFirst\n\n2\n00:00:03 --> 00:00:04\nSecond\n"
+    blocks = list(iter_srt(content))
+    assert [(b.index, b.start_ms, b.end_ms, b.text) for b in blocks] == [
+        (1, 1000, 2500, "First"),
+        (2, 3000, 4000, "Second"),
+    ]
+
+
+def test_first_cue_without_milliseconds_is_kept():
+    blocks = list(iter_srt("1\n00:00:01 --> 00:00:02\nFirst\n\n2\n00:00:03,5 --> 00:00:04,250\nSecond\n"))
+    assert [(b.start_ms, b.end_ms, b.text) for b in blocks] == [(1000, 2000, "First"), (3500, 4250, "Second")]
+
+
+def test_unreadable_timing_line_still_starts_a_cue():
+    blocks = list(iter_srt("1\n00:00:01,000 --> 00:00:02,000\nFirst\n\n2\n0:3 --> 0:4\nSecond\n"))
+    assert [b.text for b in blocks] == ["First", "Second"]
+    assert blocks[1].start_ms == blocks[1].end_ms == 2000
+
+
+def test_numbers_in_dialogue_are_text():
+    blocks = list(iter_srt("1\n00:00:01,000 --> 00:00:02,000\nCount with me\n42\n"))
+    assert blocks[0].text == "Count with me\n42"
+
+
+def test_format_srt_round_trip():
+    content = "1\n00:00:01,000 --> 00:00:02,500\nFirst\n\n2\n00:00:03,000 --> 00:00:04,000\nSecond"
+    assert format_srt(iter_blocks(content)) == content
+
+
+def test_srt_positions_are_kept():
+    content = "1\n00:00:01,000 --> 00:00:02,000 X1:100 X2:600 Y1:50 Y2:80\nTop of the screen"
+    blocks = list(iter_srt(content))
+    assert (blocks[0].start_ms, blocks[0].end_ms) == (1000, 2000)
+    assert format_srt(blocks) == content
+
+
+def test_unreadable_timing_line_is_written_back_unchanged():
+    content = "1\n00:00:01,000 --> 00:00:02,000\nFirst\n\n2\n0:3 --> 0:4\nSecond"
+    assert format_srt(iter_srt(content)) == content
@@ -0,0 +1,89 @@
+import asyncio
+import re
+
+import pytest
+from ollama import ResponseError
+
+from app.services.translator import IncompleteTranslationError, TextDedup, TranslationStats, TranslatorService
+
+
+class EchoingClient:
+    """Translates every line except "Okay", which it sends back unchanged."""
+
+    async def show(self, model):
+        return {}
+
+    async def chat(self, model, messages, **kwargs):
+        items = re.findall(r'ITEM_(\d+): (.*)', messages[-1]["content"])
+        lines = [f"ITEM_{n}: {text if text == 'Okay' else 'ES ' + text}" for n, text in items]
+        return {"message": {"content": "\n".join(lines)}}
+
+
+@pytest.fixture
+def translator(tmp_path, monkeypatch):
+    # The stores live under cache/ relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    service = TranslatorService()
+    service.pool.backends[0].client = EchoingClient()
+    return service
+
+
+def test_echoed_batch_lines_are_kept_but_not_remembered(translator):
+    srt = "1\n00:00:01,000 --> 00:00:02,000\nOkay\n\n2\n00:00:03,000 --> 00:00:04,000\nHello there\n"
+    result = asyncio.run(translator.translate_srt(srt))
+
+    assert "Okay" in result and "ES Hello there" in result
+    language, model = translator.target_language, translator.model_ollama
+    remembered = translator.memory.lookup_many(["Okay", "Hello there"], language, model)
+    assert remembered == {"Hello there": "ES Hello there"}
+
+
+def test_failed_file_releases_the_texts_it_claimed(translator):
+    srt = "1\n00:00:01,000 --> 00:00:02,000\nPreviously on the show\n"
+    dedup = TextDedup()
+
+    def broken_progress(done, total):
+        raise RuntimeError("progress callback failed")
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await translator.translate_srt(srt, on_progress=broken_progress, dedup=dedup)
+        # A second file sharing the text must not wait for the failed one
+        return await asyncio.wait_for(translator.translate_srt(srt, dedup=dedup), timeout=5)
+
+    assert "ES Previously on the show" in asyncio.run(run())
+
+
+class RefusingClient(EchoingClient):
+    """Answers 400 to every request containing "Refused line", like a prompt the server rejects."""
+
+    async def chat(self, model, messages, **kwargs):
+        if "Refused line" in messages[-1]["content"]:
+            raise ResponseError("invalid request", 400)
+        return await super().chat(model, messages, **kwargs)
+
+
+class UnreachableClient(EchoingClient):
+    async def chat(self, model, messages, **kwargs):
+        raise ConnectionError("Failed to connect to Ollama")
+
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\nRefused line\n\n2\n00:00:03,000 --> 00:00:04,000\nHello there\n"
+
+
+def test_refused_line_keeps_its_source_text(translator):
+    translator.pool.backends[0].client = RefusingClient()
+    stats = TranslationStats()
+
+    result = asyncio.run(translator.translate_srt(SRT, stats=stats))
+
+    assert "Refused line" in result and "ES Hello there" in result
+    assert (stats.kept_source, stats.failed) == (1, 0)
+
+
+def test_unreachable_ollama_leaves_the_file_to_resume(translator):
+    translator.pool.backends[0].client = UnreachableClient()
+
+    with pytest.raises(IncompleteTranslationError):
+        asyncio.run(translator.translate_srt(SRT))
+    assert translator.checkpoints.runs()
@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from playwright.async_api import async_playwright
+
+import app.services.uploader as uploader_module
+from app.services.uploader import StremioUploader, is_form_response
+from benchmarks.bench_pipeline import start_server
+from benchmarks.fake_stremio import create_app
+
+
+def response(method, url):
+    return SimpleNamespace(request=SimpleNamespace(method=method), url=url)
+
+
+def test_only_the_form_post_is_the_upload_response():
+    action = "https://subs.example/content/upload"
+    assert is_form_response(response("POST", action), action)
+    assert is_form_response(response("POST", action + "?lang=spa"), action)
+    assert not is_form_response(response("POST", "https://subs.example/api/telemetry"), action)
+    assert not is_form_response(response("GET", action), action)
+
+
+def chromium_available():
+    async def launch():
+        playwright = await async_playwright().start()
+        try:
+            browser = await playwright.chromium.launch()
+            await browser.close()
+        finally:
+            await playwright.stop()
+
+    try:
+        asyncio.run(launch())
+        return True
+    except Exception:
+        return False
+
+
+@pytest.mark.skipif(not chromium_available(), reason="Chromium is not installed (playwright install chromium)")
+def test_upload_to_fake_site_waits_for_the_form_response(monkeypatch, tmp_path):
+    site = create_app(latency=0.3)
+    server, url = start_server(site)
+    monkeypatch.setattr(uploader_module, "STREMIO_BASE_URL", url)
+    monkeypatch.setattr(uploader_module, "STREMIO_EMAIL", "user@example.com")
+    monkeypatch.setattr(uploader_module, "STREMIO_PASSWORD", "secret")
+    monkeypatch.setattr(uploader_module, "STREMIO_SESSION_PATH", str(tmp_path / "session.json"))
+    monkeypatch.setattr(uploader_module, "UPLOAD_CONTEXTS", 1)
+    srt = tmp_path / "ES_Movie.srt"
+    srt.write_text("1\n00:00:01,000 --> 00:00:02,000\nHola\n", encoding="utf-8")
+
+    async def run():
+        uploader = StremioUploader()
+        try:
+            return await uploader.upload_subtitle(str(srt), "tt0000001", language="spa")
+        finally:
+            await uploader.close()
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        server.should_exit = True
+    assert result.ok, result.reason
+    assert site.state.uploads == [{"content_id": "tt0000001", "language": "spa", "size": srt.stat().st_size}]
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+import app.services.uploader as uploader_module
+from app.services.uploader import StremioUploader, UploadResult
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def close(self):
+        if not self.browser.connected:
+            raise RuntimeError("browser has been closed")
+
+
+class FakeBrowser:
+    def __init__(self, fail_contexts=0):
+        self.connected = True
+        self.fail_contexts = fail_contexts
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        if not self.connected or self.fail_contexts:
+            self.fail_contexts = max(0, self.fail_contexts - 1)
+            raise RuntimeError("cannot create context")
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launches = []
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser()
+        self.launches.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def uploader(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploader_module, "STREMIO_EMAIL", "user@example.com")
+    monkeypatch.setattr(uploader_module, "STREMIO_PASSWORD", "secret")
+    monkeypatch.setattr(uploader_module, "STREMIO_SESSION_PATH", str(tmp_path / "session.json"))
+    monkeypatch.setattr(uploader_module, "UPLOAD_CONTEXTS", 1)
+    instance = StremioUploader()
+    instance._playwright = FakePlaywright()
+    return instance
+
+
+def test_worker_restarts_after_browser_crash(uploader, monkeypatch):
+    async def scenario():
+        async def upload(context, *args):
+            if not context.browser.connected:
+                raise RuntimeError("Target closed")
+            return UploadResult(True, UploadResult.UPLOADED)
+
+        uploader._upload = upload
+        monkeypatch.setattr(asyncio, "sleep", _no_sleep)
+        assert await uploader.upload_subtitle("a.srt", "tt1")
+
+        # Chromium crashes: the upload in flight fails, the worker dies creating a new context
+        uploader._browser.connected = False
+        first = await uploader.upload_subtitle("a.srt", "tt1")
+        assert first.reason == UploadResult.ERROR
+
+        # The next upload relaunches the browser and is served by the restarted worker
+        second = await uploader.upload_subtitle("a.srt", "tt1")
+        assert second, second
+        assert len(uploader._playwright.chromium.launches) == 2
+        await uploader.close()
+
+    asyncio.run(scenario())
+
+
+def test_caller_times_out_when_no_worker_answers(uploader, monkeypatch):
+    monkeypatch.setattr(uploader_module, "UPLOAD_WAIT_TIMEOUT", 0.2)
+
+    async def scenario():
+        async def upload(context, *args):
+            await asyncio.sleep(10)
+
+        uploader._upload = upload
+        result = await uploader.upload_subtitle("a.srt", "tt1")
+        assert result.reason == UploadResult.TIMEOUT
+        await uploader.close()
+
+    asyncio.run(scenario())
+
+
+def test_corrupt_session_file_is_ignored(uploader):
+    with open(uploader_module.STREMIO_SESSION_PATH, "w") as f:
+        f.write('{"cookies": [')
+
+    async def scenario():
+        uploader._browser = FakeBrowser()
+        context = await uploader._new_context()
+        assert isinstance(context, FakeContext)
+
+    asyncio.run(scenario())
+
+
+_real_sleep = asyncio.sleep
+
+
+async def _no_sleep(delay, *args, **kwargs):
+    await _real_sleep(0)